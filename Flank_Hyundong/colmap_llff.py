@@ -1,9 +1,16 @@
 import os
+import sys
 import glob
 import math
+import pathlib
 import numpy as np
 from PIL import Image
 
+# ✅ 상위 폴더의 utils 모듈 사용
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))
+from utils.dataset import DEFAULT_SHARD_SIZE, DatasetWriter
+from utils.registered_images import DEFAULT_MANIFEST_PATH, load_registered_manifest, registered_paths
+
 def compute_focal_from_image(image_path, fov_deg=60):
     """
     이미지 파일의 가로 길이와 주어진 FOV를 기반으로 focal length를 계산합니다.
@@ -59,47 +66,50 @@ def pose_spherical(theta, phi, radius):
     c2w = fix @ c2w
     return c2w
 
-def main(image_dir, output_filename="llff_data.npz", fov_deg=60, phi=-30, radius=4.0):
+def main(image_dir, output_filename="llff_data", fov_deg=60, phi=-30, radius=4.0, manifest_path=None,
+         shard_size=DEFAULT_SHARD_SIZE):
     """
     이미지 폴더 내의 이미지를 읽고,  
       - 첫 번째 이미지에서 focal을 계산 (모든 이미지에 동일)
       - 각 이미지에 대해 4x4 카메라-투-월드 pose를 생성한 후  
-    이 정보를 npz 파일로 저장합니다.
+    이 정보를 데이터셋 폴더(utils/dataset.py)에 읽는 대로 바로 기록합니다.
     
-    저장되는 npz 파일의 키는 아래와 같습니다:
-      - images: (N, H, W, C) numpy 배열, N개의 이미지
-      - poses: (N, 4, 4) numpy 배열, 각 이미지에 대응하는 pose 행렬
-      - focal: float, 첫 번째 이미지에서 계산한 focal 값
+    저장되는 폴더의 내용은 아래와 같습니다:
+      - images_00000.npy ...: (n, H, W, C) 이미지 shard (shard_size장씩)
+      - poses.npy: (N, 4, 4) numpy 배열, 각 이미지에 대응하는 pose 행렬
+      - index.json: 이미지 수, H/W, focal(첫 번째 이미지에서 계산한 값), 이미지 이름, shard 목록
+
+    읽기: Dataset(output_filename) → data[i], data.poses, data.focal (이미지는 memmap, 전체를 불러오지 않음)
+
+    manifest_path가 주어지면 sparse 단계에서 등록된 이미지만 (폴더 스캔 없이) 읽습니다.
     """
-    image_paths = sorted(glob.glob(os.path.join(image_dir, "*.png")))
+    if manifest_path is not None:
+        image_paths = [str(p) for p in registered_paths(load_registered_manifest(manifest_path), image_dir)]
+    else:
+        image_paths = sorted(glob.glob(os.path.join(image_dir, "*.png")))
     if len(image_paths) == 0:
         raise ValueError("지정된 폴더에서 이미지를 찾을 수 없습니다.")
     
-    images_list = []
-    poses_list = []
     num_images = len(image_paths)
     
     # 첫 번째 이미지로부터 focal을 계산 (모든 이미지에 동일하다고 가정)
     focal, width, height = compute_focal_from_image(image_paths[0], fov_deg)
+    image_shape = np.array(Image.open(image_paths[0])).shape
     
-    for i, img_path in enumerate(image_paths):
-        # 이미지 로드 및 numpy array 변환
-        im = Image.open(img_path)
-        im_np = np.array(im)
-        images_list.append(im_np)
-        
-        # 이미지별로 균등하게 분포하는 각도 계산 (원형 배치)
-        theta = 360.0 * i / num_images
-        c2w = pose_spherical(theta, phi, radius)
-        poses_list.append(c2w)
-    
-    images_arr = np.stack(images_list, axis=0)   # (N, H, W, C)
-    poses_arr = np.stack(poses_list, axis=0)       # (N, 4, 4)
+    with DatasetWriter(output_filename, num_images, image_shape, shard_size=shard_size) as writer:
+        for i, img_path in enumerate(image_paths):
+            # 이미지 로드 후 바로 shard에 기록 (리스트에 모으지 않음)
+            im_np = np.array(Image.open(img_path))
+            
+            # 이미지별로 균등하게 분포하는 각도 계산 (원형 배치)
+            theta = 360.0 * i / num_images
+            c2w = pose_spherical(theta, phi, radius)
+            writer.add(im_np, c2w, os.path.basename(img_path))
+        writer.meta["focal"] = focal
     
-    # npz 파일에 저장: images, poses, focal (focal은 단일 값)
-    np.savez(output_filename, images=images_arr, poses=poses_arr, focal=focal)
-    print(f"Saved npz file: {output_filename}")
+    print(f"Saved dataset: {output_filename} ({num_images} images)")
 
 if __name__ == "__main__":
     image_dir = "./images_small"  # 이미지 폴더 경로 (원하는 폴더로 수정)
-    main(image_dir)
+    manifest_path = DEFAULT_MANIFEST_PATH if DEFAULT_MANIFEST_PATH.exists() else None  # sparse 단계 결과가 있으면 등록된 이미지만 사용
+    main(image_dir, manifest_path=manifest_path)
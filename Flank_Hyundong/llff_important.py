@@ -1,7 +1,13 @@
 import numpy as np
 import os
+import sys
+import pathlib
 from PIL import Image
-import pycolmap
+
+# ✅ 상위 폴더의 utils 모듈 사용
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))
+from utils.colmap_model import read_cameras
+from utils.llff import load_poses_bounds, write_poses_bounds
 
 # 경로 설정
 llff_pose_path = "Flank_Hyundong/images/poses_bounds.npy"
@@ -9,21 +15,14 @@ image_dir = "Flank_Hyundong/images"
 sparse_model_path = "output/sparse/sparse_0/0"  # COLMAP sparse 경로
 output_dir = "Flank_Hyundong"
 
-# 1️⃣ Load poses_bounds.npy
-poses_bounds = np.load(llff_pose_path)  # shape: [N, 3, 5]
-poses = poses_bounds[:, :, :4]          # [N, 3, 4]
-bounds = poses_bounds[:, :, 4]          # [N, 3] → near/far depth
-
-# 2️⃣ Convert to [N, 4, 4]
-def convert_to_4x4(poses_3x4):
-    poses_4x4 = []
-    for pose in poses_3x4:
-        mat = np.eye(4, dtype=np.float32)
-        mat[:3, :4] = pose
-        poses_4x4.append(mat)
-    return np.stack(poses_4x4, axis=0)  # [N, 4, 4]
+# 0️⃣ poses_bounds.npy가 없으면 sparse 모델에서 바로 생성 (near/far = 3D 점 깊이 0.1 / 99.9 백분위수)
+if not os.path.exists(llff_pose_path):
+    write_poses_bounds(sparse_model_path, llff_pose_path)
 
-poses_4x4 = convert_to_4x4(poses)
+# 1️⃣ Load poses_bounds.npy  # shape: [N, 17] = 3x5 (pose + hwf) + near/far
+# 2️⃣ Convert to [N, 4, 4] (OpenGL camera-to-world)
+poses_4x4, hwf, bounds = load_poses_bounds(llff_pose_path)  # bounds: [N, 2] → near/far depth
+poses_4x4 = poses_4x4.astype(np.float32)
 
 # 3️⃣ Get image resolution
 sample_img = sorted([f for f in os.listdir(image_dir) if f.endswith(".png")])[0]
@@ -33,9 +32,8 @@ W, H = img.size
 print(f"📐 Image resolution: {W} x {H}")
 
 # 4️⃣ Get focal length from COLMAP
-recon = pycolmap.Reconstruction(sparse_model_path)
-camera = next(iter(recon.cameras.values()))
-focal = camera.params[0]
+camera = read_cameras(os.path.join(sparse_model_path, "cameras.bin"))[0]
+focal = camera["params"][0]
 print(f"📸 Focal length from COLMAP: {focal}")
 
 # 5️⃣ Save results
@@ -1,4 +1,8 @@
-import numpy as np
-poses = np.load("llff_data.npz", allow_pickle=True)
-poses_loaded = poses["focal_lengths"]
-print(poses_loaded)
\ No newline at end of file
+import sys
+import pathlib
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))
+from utils.dataset import Dataset
+
+data = Dataset("llff_data")  # colmap_llff.main이 만든 데이터셋 폴더 (이미지는 memmap)
+print(len(data), data.height, data.width, data.focal)
+print(data.poses.shape)
@@ -0,0 +1,229 @@
+import os
+import re
+import shutil
+import pathlib
+import cv2
+import numpy as np
+import pycolmap
+from utils.benchmark import measure, append_history, load_history, find_regressions, print_regressions, HISTORY_PATH
+from utils.video import resize_folder, save_video_pyramid
+from utils.matcher import match_pairs
+from utils.pairs import sequential_pairs, write_pairs_file
+from utils.colmap_model import read_cameras, read_images
+from utils.pose import cam_to_world
+
+# 📌 벤치마크 장면 (저장소에 포함된 데이터)
+sfm_scenes = {
+    "lego": pathlib.Path("lego_test/train"),  # 합성 이미지 100장
+    "flank": pathlib.Path("Flank_Hyundong/images"),  # 실제 촬영 이미지
+}
+nerf_scene = pathlib.Path("nerf_data")  # images + sparse/0 (완성된 COLMAP 모델)
+work_dir = pathlib.Path("benchmark") / "work"  # 매 실행마다 새로 만드는 작업 폴더
+
+# ✅ 고정된 벤치마크 설정 (바꾸면 history 비교 대상이 달라짐)
+config = {
+    "video_fps": 30,
+    "video_target_frames": 50,
+    "video_mode": "seek",
+    "video_workers": 4,
+    "resize_spec": 0.25,
+    "max_num_features": 2048,
+    "num_threads": os.cpu_count(),
+    "sequential_overlap": 5,
+    "max_ratio": 0.8,
+    "min_num_inliers": 15,
+    "nerf_image_width": 100,
+    "nerf_iters": 20,
+    "nerf_samples": 64,
+    "nerf_near": 2.0,
+    "nerf_far": 6.0,
+}
+
+
+def natural_key(name):
+    """r_2.png < r_10.png 순서로 정렬"""
+    return [int(t) if t.isdigit() else t for t in re.split(r"(\d+)", str(name))]
+
+
+def scene_images(scene_dir):
+    return sorted((p for p in scene_dir.iterdir() if p.suffix.lower() in (".png", ".jpg")), key=natural_key)
+
+
+# ✅ 0️⃣ 이미지 → 비디오 (저장소에 영상이 없으므로 lego 프레임으로 만든 고정 입력)
+def make_video(image_paths, video_path, fps):
+    first = cv2.imread(str(image_paths[0]))
+    writer = cv2.VideoWriter(str(video_path), cv2.VideoWriter_fourcc(*"mp4v"), fps, (first.shape[1], first.shape[0]))
+    for path in image_paths:
+        writer.write(cv2.imread(str(path)))
+    writer.release()
+    return video_path
+
+
+# ✅ 3️⃣~5️⃣ SIFT → 매칭 → mapping
+def run_sift(scene_dir, db_path):
+    reader_options = pycolmap.ImageReaderOptions()
+    reader_options.camera_model = "SIMPLE_RADIAL"
+    pycolmap.import_images(database_path=str(db_path), image_path=str(scene_dir), options=reader_options)
+    pycolmap.extract_features(
+        database_path=str(db_path),
+        image_path=str(scene_dir),
+        camera_model="SIMPLE_RADIAL",
+        sift_options=pycolmap.SiftExtractionOptions(num_threads=config["num_threads"], max_num_features=config["max_num_features"]),
+        device=pycolmap.Device("cpu")
+    )
+
+
+def run_matching(db_path, names):
+    pairs = sequential_pairs(names, config["sequential_overlap"])
+    match_pairs(db_path, pairs, max_ratio=config["max_ratio"], num_threads=config["num_threads"])
+    pairs_path = write_pairs_file(pairs, str(db_path) + ".pairs.txt")
+    pycolmap.verify_matches(str(db_path), pairs_path,
+                            options=pycolmap.TwoViewGeometryOptions(min_num_inliers=config["min_num_inliers"]))
+    return len(pairs)
+
+
+def run_mapping(scene_dir, db_path, sparse_path):
+    sparse_path.mkdir(parents=True, exist_ok=True)
+    options = pycolmap.IncrementalPipelineOptions()
+    options.num_threads = config["num_threads"]
+    reconstructions = pycolmap.incremental_mapping(database_path=str(db_path), image_path=str(scene_dir),
+                                                   output_path=str(sparse_path), options=options)
+    return max((r.num_reg_images() for r in reconstructions.values()), default=0)
+
+
+# ✅ 6️⃣ 포즈 추출 (world-to-camera → NeRF용 OpenGL camera-to-world)
+def export_poses(model_path, output_file):
+    images = read_images(model_path / "images.bin")
+    names = images["name"]
+    c2w = cam_to_world(images["quat"], images["translation"], order="wxyz", opengl=True)
+    np.savez(output_file, names=np.array(names), poses=c2w)
+    return names, c2w
+
+
+def load_nerf_images(image_dir, names, width):
+    """가로 width 픽셀로 축소 (비율 유지), RGB float32 [0, 1]"""
+    images = []
+    for name in names:
+        image = cv2.cvtColor(cv2.imread(str(image_dir / name)), cv2.COLOR_BGR2RGB)
+        height = round(image.shape[0] * width / image.shape[1])
+        images.append(cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA))
+    return np.stack(images).astype(np.float32) / 255.
+
+
+# ✅ 7️⃣ NeRF 학습 N회 + 전체 이미지 렌더링
+def run_nerf(images, poses, focal):
+    import tensorflow as tf  # NeRF 단계에서만 필요
+    from utils.nerf import get_rays, init_model, render_rays, train_step
+    from utils.occupancy import OccupancyGrid
+    from utils.colmap_model import read_points3D
+    from utils.rays import RayBank
+
+    H, W = images.shape[1:3]
+    model = init_model()
+    optimizer = tf.keras.optimizers.Adam(5e-4)
+    rng = np.random.default_rng(0)
+
+    def train():
+        for _ in range(config["nerf_iters"]):
+            img_i = rng.integers(len(images))
+            rays_o, rays_d = get_rays(H, W, focal, poses[img_i])
+            train_step(model, optimizer, images[img_i], rays_o, rays_d, config["nerf_near"], config["nerf_far"], config["nerf_samples"])
+
+    # ray bank: ray를 한 번만 계산하고 모든 이미지에서 무작위로 고른 H*W개 ray로 학습 (이미지당 학습과 같은 ray 수)
+    bank, bank_record = measure("ray_bank", nerf_scene.name, lambda: RayBank.build(images, poses, focal),
+                                count=len(images) * H * W, unit="rays")
+
+    def train_batched():
+        for _ in range(config["nerf_iters"]):
+            rays_o, rays_d, target = bank.batch(H * W, rng)
+            train_step(model, optimizer, target, rays_o, rays_d, config["nerf_near"], config["nerf_far"], config["nerf_samples"])
+
+    def render():
+        rays_o, rays_d = get_rays(H, W, focal, poses[0])
+        rgb, depth, acc = render_rays(model, rays_o, rays_d, config["nerf_near"], config["nerf_far"], config["nerf_samples"])
+        return rgb.numpy()
+
+    # coarse-to-fine: MLP 질의 수를 같게 (coarse nerf_samples/2 + fine nerf_samples/2) 두고 rays/s, PSNR 비교
+    def render_hierarchical():
+        rays_o, rays_d = get_rays(H, W, focal, poses[0])
+        half = config["nerf_samples"] // 2
+        rgb, depth, acc = render_rays(model, rays_o, rays_d, config["nerf_near"], config["nerf_far"], half, N_importance=half)
+        return rgb.numpy()
+
+    # occupancy grid: sparse 점군으로 초기화 (측정이 학습 상태에 좌우되지 않도록 density 갱신 없이), 빈 cell 샘플은 MLP 질의 생략
+    grid = OccupancyGrid.from_points(read_points3D(nerf_scene / "sparse" / "0" / "points3D.bin")["xyz"])
+
+    def render_occupancy():
+        rays_o, rays_d = get_rays(H, W, focal, poses[0])
+        rgb, depth, acc = render_rays(model, rays_o, rays_d, config["nerf_near"], config["nerf_far"], config["nerf_samples"],
+                                      occupancy=grid)
+        return rgb.numpy()
+
+    def sample_fraction():
+        """렌더링 샘플 중 network에 들어가는 비율 (1 / MLP 질의 감소 배수)"""
+        rays_o, rays_d = (r.numpy() for r in get_rays(H, W, focal, poses[0]))
+        z_vals = np.linspace(config["nerf_near"], config["nerf_far"], config["nerf_samples"])
+        return float(grid.occupied(rays_o[..., None, :] + rays_d[..., None, :] * z_vals[:, None]).mean())
+
+    def with_psnr(result_record):
+        rgb, record = result_record
+        record["meta"]["psnr"] = float(-10. * np.log10(np.mean(np.square(rgb - images[0]))))
+        return record
+
+    train()  # 그래프/커널 초기화 (warm-up, 측정 제외)
+    records = []
+    records.append(measure("nerf_train", nerf_scene.name, train, count=config["nerf_iters"] * H * W, unit="rays")[1])
+    records.append(bank_record)
+    records.append(measure("nerf_train_ray", nerf_scene.name, train_batched, count=config["nerf_iters"] * H * W, unit="rays")[1])
+    records.append(with_psnr(measure("nerf_render", nerf_scene.name, render, count=H * W, unit="rays")))
+    records.append(with_psnr(measure("nerf_render_fine", nerf_scene.name, render_hierarchical, count=H * W, unit="rays")))
+    records.append(with_psnr(measure("nerf_render_occ", nerf_scene.name, render_occupancy, count=H * W, unit="rays",
+                                     sample_fraction=sample_fraction())))
+    return records
+
+
+if __name__ == "__main__":
+    if work_dir.exists():
+        shutil.rmtree(work_dir)
+    work_dir.mkdir(parents=True)
+    records = []
+
+    # 1️⃣ 프레임 추출 / 2️⃣ 축소
+    lego_images = scene_images(sfm_scenes["lego"])
+    video_path = make_video(lego_images, work_dir / "lego.mp4", config["video_fps"])
+    _, record = measure("video_frames", "lego", lambda: save_video_pyramid(
+        str(video_path), {work_dir / "frames": 1.0}, target_frames=config["video_target_frames"],
+        mode=config["video_mode"], num_workers=config["video_workers"]), count=lambda num_frames: num_frames)
+    records.append(record)
+
+    for scene, scene_dir in sfm_scenes.items():
+        n = len(scene_images(scene_dir))
+        records.append(measure("resize", scene, lambda: resize_folder(scene_dir, work_dir / scene / "small", config["resize_spec"]),
+                               count=n)[1])
+
+    # 3️⃣ SIFT / 4️⃣ 매칭 / 5️⃣ mapping
+    for scene, scene_dir in sfm_scenes.items():
+        db_path = work_dir / scene / "database.db"
+        names = [p.name for p in scene_images(scene_dir)]
+        records.append(measure("sift", scene, lambda: run_sift(scene_dir, db_path), count=len(names))[1])
+        records.append(measure("matching", scene, lambda: run_matching(db_path, names), count=lambda n: n, unit="pairs")[1])
+        records.append(measure("mapping", scene, lambda: run_mapping(scene_dir, db_path, work_dir / scene / "sparse"),
+                               count=lambda n: n)[1])
+
+    # 6️⃣ 포즈 추출 (완성된 nerf_data 모델 사용)
+    (names, poses), record = measure("pose_export", nerf_scene.name,
+                                     lambda: export_poses(nerf_scene / "sparse" / "0", work_dir / "poses.npz"),
+                                     count=lambda result: len(result[0]))
+    records.append(record)
+
+    # 7️⃣ NeRF (축소 이미지, 해상도에 맞게 focal 조정)
+    camera = read_cameras(nerf_scene / "sparse" / "0" / "cameras.bin")[0]
+    focal = camera["params"][0] * config["nerf_image_width"] / camera["width"]
+    images = load_nerf_images(nerf_scene / "images", names, config["nerf_image_width"])
+    records += run_nerf(images, poses, focal)
+
+    # ✅ 결과 저장 + 직전 결과와 비교
+    history = load_history()
+    print_regressions(find_regressions(records, config, history))
+    run = append_history(records, config)
+    print(f"\n✅ Benchmark 완료 ({run['commit']}), 결과 저장: {HISTORY_PATH}")
@@ -0,0 +1 @@
+# ✅ 저장소 루트를 sys.path에 추가 (tests/에서 utils 모듈 import)
@@ -4,8 +4,10 @@ import pathlib
 import itertools
 import pandas as pd
 import pycolmap
-import multiprocessing
-import sqlite3
+from utils.feature_cache import FeatureCache, image_hashes, options_key
+from utils.scheduler import plan_core_budget, run_jobs
+from utils.colmap_stats import db_stats_many
+from utils.instrument import timed, log_metrics, export_chrome_trace, print_summary
 
 # 📌 COLMAP 관련 경로 설정
 image_dir = pathlib.Path("images")  # 배경이 제거된 이미지 폴더
@@ -18,6 +20,14 @@ log_dir.mkdir(parents=True, exist_ok=True)
 # ✅ CSV 파일 설정
 feature_csv = output_path / "feature_analysis.csv"
 
+# ✅ 특징점 캐시 (output 폴더가 삭제되어도 유지되도록 별도 폴더에 저장)
+feature_cache_path = pathlib.Path("feature_cache") / "features.db"
+max_num_features = 8192
+
+# ✅ 코어 예산 (None이면 전체 코어 사용) 및 동시에 기록할 DB 개수 제한
+total_cores = None
+max_open_dbs = 8
+
 # ✅ SIFT 변수 조합 (특이점 검출)
 # num_octaves_list = [6 + 1 * x for x in range(4)]
 # edge_threshold_list = [5 + 2 * x for x in range(6)]
@@ -28,25 +38,47 @@ edge_threshold_list = [15]
 peak_threshold_list = [0.0014]
 
 # ✅ 특이점 검출 실행 함수 (병렬 처리)
-def extract_features(i, num_octaves, edge_threshold, peak_threshold):
-    temp_db = output_path / f"database_{i}.db"
+@timed("feature.extract")
+def extract_features(i, num_octaves, edge_threshold, peak_threshold, hashes=None, num_threads=8, image_path=None, db_path=None):
+    # image_path/db_path를 주면 다른 이미지 폴더(예: 하이퍼파라미터 탐색용 부분 집합)에 대해 실행
+    image_path = image_path or image_dir
+    temp_db = pathlib.Path(db_path) if db_path else output_path / f"database_{i}.db"
     print(f"🔍 [{i+1}] Running SIFT extraction: num_octaves={num_octaves}, edge_threshold={edge_threshold}, peak_threshold={peak_threshold}")
 
     try:
-        # ✅ Feature Extraction 실행
-        pycolmap.extract_features(
-            database_path=str(temp_db),
-            image_path=str(image_dir),
-            camera_model="SIMPLE_RADIAL",
-            sift_options=pycolmap.SiftExtractionOptions(
-                num_threads=8,
-                max_num_features=8192,
-                peak_threshold=peak_threshold,
-                num_octaves=num_octaves,
-                edge_threshold=edge_threshold,
-            ),
-            device=pycolmap.Device("cpu")
-        )
+        if hashes is None:
+            hashes = image_hashes(image_path)
+        cache = FeatureCache(feature_cache_path)
+        key = options_key(max_num_features=max_num_features, peak_threshold=peak_threshold,
+                          num_octaves=num_octaves, edge_threshold=edge_threshold)
+        missing = cache.missing(hashes, key)
+
+        # ✅ 카메라/이미지 등록 후 캐시된 특징점 삽입
+        if temp_db.exists():
+            temp_db.unlink()
+        reader_options = pycolmap.ImageReaderOptions()
+        reader_options.camera_model = "SIMPLE_RADIAL"
+        pycolmap.import_images(database_path=str(temp_db), image_path=str(image_path), options=reader_options)
+        cached = cache.load_into(temp_db, hashes, key)
+        print(f"📦 [{i+1}] Feature cache: {cached} cached, {len(missing)} to extract")
+
+        # ✅ Feature Extraction 실행 (특징점이 이미 있는 이미지는 COLMAP이 건너뜀)
+        if missing:
+            pycolmap.extract_features(
+                database_path=str(temp_db),
+                image_path=str(image_path),
+                camera_model="SIMPLE_RADIAL",
+                sift_options=pycolmap.SiftExtractionOptions(
+                    num_threads=num_threads,
+                    max_num_features=max_num_features,
+                    peak_threshold=peak_threshold,
+                    num_octaves=num_octaves,
+                    edge_threshold=edge_threshold,
+                ),
+                device=pycolmap.Device("cpu")
+            )
+            cache.store_from(temp_db, hashes, key, missing)
+        log_metrics("feature.cache", config=i, cached=cached, extracted=len(missing))
 
     except Exception as e:
         print(f"❌ Error in feature extraction {i+1}: {e}")
@@ -63,39 +95,32 @@ if __name__ == "__main__":
     
     param_list = list(itertools.product(num_octaves_list, edge_threshold_list, peak_threshold_list))
 
-    # 병렬 처리 설정 (CPU 개수만큼 병렬 실행)
-    with multiprocessing.Pool(processes=multiprocessing.cpu_count()) as pool:
-        db_paths = pool.starmap(extract_features, [(i, *params) for i, params in enumerate(param_list)])
+    # ✅ 이미지 내용 해시는 한 번만 계산
+    hashes = image_hashes(image_dir)
 
-    # ✅ DB 존재 여부 확인 및 특이점 개수 평균 계산
-    itteration = 0
-    feature_data = []
+    # 병렬 처리 설정 (코어 예산을 프로세스 수 × pycolmap 스레드 수로 분배)
+    plan = plan_core_budget(len(param_list), len(hashes), total_cores=total_cores, max_open_dbs=max_open_dbs)
+    db_paths, job_stats = run_jobs(extract_features, [(i, *params, hashes) for i, params in enumerate(param_list)], plan)
+
+    # ✅ DB 존재 여부 확인
+    existing = [(db_path, params) for db_path, params in zip(db_paths, param_list) if os.path.exists(db_path)]
     for db_path in db_paths:
         if not os.path.exists(db_path):
             print(f"⚠️ Warning: Database {db_path} not found, skipping...")
-            continue
-
-        with sqlite3.connect(db_path) as conn:
-            cursor = conn.cursor()
-
-            # ✅ WAL 모드 활성화 (동시 접근 문제 해결)
-            cursor.execute("PRAGMA journal_mode=WAL;")
 
-            # ✅ 모든 keypoints 데이터 로드
-            df_keypoints = pd.read_sql_query("SELECT * FROM keypoints;", conn)
-
-            # ✅ keypoints 테이블의 rows 값들의 평균 계산
-            average_keypoints = df_keypoints["rows"].sum() / df_keypoints["image_id"].nunique()
-
-            # ✅ matches 테이블의 전체 매칭 개수 계산
-            df_matches = pd.read_sql_query("SELECT * FROM matches;", conn)
-            match_avg = df_matches.shape[0] if not df_matches.empty else 0
-
-        feature_data.append([db_path, param_list[itteration][0], param_list[itteration][1], param_list[itteration][2] , round(average_keypoints, 4)])
-        itteration += 1
-
-    # ✅ 특이점 & 매칭 개수 CSV 저장
-    feature_df = pd.DataFrame(feature_data, columns=["db_path", "num_octaves", "edge_threshold", "peak_threshold", "keypoint_avg"])
+    # ✅ 특이점 통계 계산 (집계 SQL만 사용, 모든 DB를 읽기 전용으로 병렬 조회)
+    stats = db_stats_many([db_path for db_path, _ in existing])
+    feature_data = []
+    for (db_path, params), st in zip(existing, stats):
+        log_metrics("feature.config", db_path=db_path, num_octaves=params[0], edge_threshold=params[1], peak_threshold=params[2],
+                    keypoint_avg=st["keypoint_avg"], keypoint_median=st["keypoint_median"])
+        feature_data.append([db_path, *params, round(st["keypoint_avg"], 4), st["keypoint_median"], st["keypoint_min"], st["keypoint_max"]])
+
+    # ✅ 특이점 개수 CSV 저장
+    feature_df = pd.DataFrame(feature_data, columns=["db_path", "num_octaves", "edge_threshold", "peak_threshold", "keypoint_avg",
+                                                     "keypoint_median", "keypoint_min", "keypoint_max"])
     feature_df.to_csv(feature_csv, index=False)
 
     print("✅ Feature extraction completed successfully!")
+    print_summary()
+    export_chrome_trace()
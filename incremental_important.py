@@ -0,0 +1,172 @@
+import pathlib
+import shutil
+import pandas as pd
+import pycolmap
+from utils.colmap_db import ColmapDatabase
+from utils.feature_cache import FeatureCache, image_hashes, options_key
+from utils.matcher import match_pairs
+from utils.pairs import global_descriptors, retrieval_pairs, sequential_pairs, write_pairs_file
+from utils.scheduler import plan_core_budget
+from utils.registered_images import write_registered_manifest
+from utils.instrument import timed, log_metrics, reconstruction_metrics, export_chrome_trace, print_summary
+
+# 📌 COLMAP 작업 경로 설정 (feature/matching/sparse 단계 결과를 그대로 이어서 사용)
+image_dir = pathlib.Path("images")  # 새 프레임이 추가된 이미지 폴더
+output_path = pathlib.Path("output")
+match_db_path = output_path / "match_db"
+sparse_output_path = output_path / "sparse"
+
+feature_csv = output_path / "feature_analysis.csv"
+matching_csv = match_db_path / "matching_analysis.csv"
+sparse_results_csv = sparse_output_path / "sparse_results.csv"
+registered_manifest_path = sparse_output_path / "registered_images.json"
+
+# ✅ 사용된 데이터베이스 (sparse_important.py와 동일)
+database_path = match_db_path / "matched_database_0.db"
+
+# ✅ 특징점 캐시 / 최대 특징점 수 (feature_important.py와 동일)
+feature_cache_path = pathlib.Path("feature_cache") / "features.db"
+max_num_features = 8192
+
+# ✅ 새 이미지 매칭 범위
+sequential_overlap = 10  # 시간 순서상 앞뒤로 매칭할 프레임 수
+retrieval_top_k = 5  # 새 이미지마다 전역 디스크립터로 찾을 기존 이미지 수
+
+# ✅ 코어 예산 (None이면 전체 코어 사용)
+total_cores = None
+
+
+# ✅ 이전 단계에서 선택된 설정 불러오기
+def load_best_configs():
+    features = pd.read_csv(feature_csv)
+    feature_row = features.loc[features["keypoint_avg"].idxmax()]
+
+    matching = pd.read_csv(matching_csv)
+    matching_row = matching[matching["db_path"].astype(str) == str(database_path)].iloc[0]
+
+    sparse = pd.read_csv(sparse_results_csv)
+    if "aborted" in sparse:
+        sparse = sparse[~sparse["aborted"]]
+    sparse_row = sparse.sort_values("num_images_registered").iloc[-1]
+    return feature_row, matching_row, sparse_row
+
+
+# ✅ 1️⃣ 새 이미지만 DB에 등록하고 특징점 추출
+@timed("incremental.extract")
+def extract_new_features(feature_row, num_threads):
+    with ColmapDatabase(database_path) as db:
+        known = set(db.images().values())
+    hashes = {name: digest for name, digest in image_hashes(image_dir).items() if name not in known}
+    new_names = sorted(hashes)
+    if not new_names:
+        return []
+
+    print(f"🆕 새 이미지 {len(new_names)}개 (기존 {len(known)}개)")
+
+    reader_options = pycolmap.ImageReaderOptions()
+    reader_options.camera_model = "SIMPLE_RADIAL"
+    pycolmap.import_images(database_path=str(database_path), image_path=str(image_dir),
+                           image_list=new_names, options=reader_options)
+
+    cache = FeatureCache(feature_cache_path)
+    key = options_key(max_num_features=max_num_features, peak_threshold=float(feature_row["peak_threshold"]),
+                      num_octaves=int(feature_row["num_octaves"]), edge_threshold=float(feature_row["edge_threshold"]))
+    missing = cache.missing(hashes, key)
+    cached = cache.load_into(database_path, hashes, key)
+    print(f"📦 Feature cache: {cached} cached, {len(missing)} to extract")
+
+    if missing:
+        pycolmap.extract_features(
+            database_path=str(database_path),
+            image_path=str(image_dir),
+            image_list=missing,
+            camera_model="SIMPLE_RADIAL",
+            sift_options=pycolmap.SiftExtractionOptions(
+                num_threads=num_threads,
+                max_num_features=max_num_features,
+                peak_threshold=float(feature_row["peak_threshold"]),
+                num_octaves=int(feature_row["num_octaves"]),
+                edge_threshold=float(feature_row["edge_threshold"]),
+            ),
+            device=pycolmap.Device("cpu")
+        )
+        cache.store_from(database_path, hashes, key, missing)
+
+    return new_names
+
+
+# ✅ 2️⃣ 새 이미지 ↔ (시간적 이웃 + 비슷해 보이는 기존 이미지) 매칭 후 기하 검증
+@timed("incremental.match")
+def match_new_images(new_names, matching_row, num_threads):
+    with ColmapDatabase(database_path) as db:
+        names = sorted(db.images().values())
+    new = set(new_names)
+
+    pairs = [p for p in sequential_pairs(names, sequential_overlap) if p[0] in new or p[1] in new]
+    existing = [name for name in names if name not in new]
+    descriptors = global_descriptors(image_dir, existing + new_names)
+    pairs += retrieval_pairs(new_names, existing + new_names, descriptors, top_k=retrieval_top_k, exclude=pairs)
+
+    match_pairs(database_path, pairs, max_ratio=float(matching_row["max_ratio"]), num_threads=num_threads)
+    pairs_path = write_pairs_file(pairs, str(database_path) + ".incremental_pairs.txt")
+    pycolmap.verify_matches(str(database_path), pairs_path,
+                            options=pycolmap.TwoViewGeometryOptions(min_num_inliers=int(matching_row["min_num_inliers"])))
+    print(f"🔗 새 이미지 매칭 완료: {len(pairs)} pairs")
+    return pairs
+
+
+# ✅ 3️⃣ 기존 모델에 새 이미지 등록 (local BA) → 전체 global BA
+@timed("incremental.register")
+def register_new_images(sparse_row, num_threads):
+    model_path = pathlib.Path(sparse_row["output_path"]) / "0"
+    work_path = pathlib.Path(sparse_row["output_path"]) / "incremental"
+    if work_path.exists():
+        shutil.rmtree(work_path)
+    work_path.mkdir(parents=True)
+
+    options = pycolmap.IncrementalPipelineOptions()
+    options.num_threads = num_threads
+    options.ba_local_max_num_iterations = 50
+    options.ba_global_max_num_iterations = 100
+    options.min_num_matches = int(sparse_row["min_num_matches"])
+    options.min_model_size = int(sparse_row["min_model_size"])
+    options.init_num_trials = int(sparse_row["init_num_trials"])
+    options.multiple_models = False
+
+    before = pycolmap.Reconstruction(str(model_path)).num_reg_images()
+    reconstructions = pycolmap.incremental_mapping(
+        database_path=str(database_path),
+        image_path=str(image_dir),
+        output_path=str(work_path),
+        options=options,
+        input_path=str(model_path),
+    )
+    reconstruction = max(reconstructions.values(), key=lambda r: r.num_reg_images())
+
+    ba_options = pycolmap.BundleAdjustmentOptions()
+    ba_options.solver_options.num_threads = num_threads
+    ba_options.solver_options.max_num_iterations = options.ba_global_max_num_iterations
+    pycolmap.bundle_adjustment(reconstruction, ba_options)
+
+    reconstruction.write(str(model_path))
+    write_registered_manifest(model_path, image_dir, registered_manifest_path, reconstruction)
+    log_metrics("incremental.model", model_path=model_path, num_before=before, **reconstruction_metrics(reconstruction))
+    shutil.rmtree(work_path)
+    print(f"✅ Incremental reconstruction 완료! {before} → {reconstruction.num_reg_images()}개 이미지 등록됨. 저장 경로: {model_path}")
+    return reconstruction
+
+
+if __name__ == "__main__":
+    feature_row, matching_row, sparse_row = load_best_configs()
+    with ColmapDatabase(database_path) as db:
+        num_images = len(db.images())
+    num_threads = plan_core_budget(1, num_images, total_cores=total_cores)["threads"]
+
+    new_names = extract_new_features(feature_row, num_threads)
+    if not new_names:
+        print("✅ 새 이미지가 없습니다. 기존 모델을 그대로 사용합니다.")
+    else:
+        match_new_images(new_names, matching_row, num_threads)
+        register_new_images(sparse_row, num_threads)
+    print_summary()
+    export_chrome_trace()
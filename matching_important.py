@@ -5,9 +5,16 @@ import itertools
 import pandas as pd
 import pycolmap
 import sqlite3
-import multiprocessing
+from utils.scheduler import plan_core_budget, run_jobs
+from utils.colmap_stats import db_stats
+from utils.colmap_db import ColmapDatabase
+from utils.pairs import global_descriptors, loop_closure_pairs, sequential_pairs, write_pairs_file
+from utils.matcher import match_pairs
+from utils.match_sweep import run_match_sweep, activate_config, overlay_table
+from utils.instrument import timed, log_metrics, export_chrome_trace, print_summary
 
 # 📌 COLMAP 관련 경로 설정
+image_dir = pathlib.Path("images")  # 특징점 추출에 사용한 이미지 폴더
 output_path = pathlib.Path("output")  # COLMAP 결과 저장 폴더
 match_db_path = output_path / "match_db"  # Feature Matching 결과 저장 폴더
 match_db_path.mkdir(parents=True, exist_ok=True)  # 폴더 생성
@@ -21,49 +28,145 @@ max_ratio_list = [0.6]  # ✅ 거리 비율 제한
 guided_matching_list = [True]  # ✅ 추가 매칭 수행 여부
 min_num_inliers_list = [15]  # ✅ 최소 inlier 개수
 
+# ✅ 매칭 방식
+#   exhaustive : 모든 이미지 쌍 매칭 (O(N²))
+#   sequential : 시간 순서(imageNNNN) 기준 sequential_overlap 프레임 이내 쌍 + 주기적 loop closure 후보
+matching_mode = "sequential"
+sequential_overlap = 10  # 앞뒤로 매칭할 프레임 수
+loop_closure_period = 10  # 몇 프레임마다 loop closure 후보를 찾을지
+loop_closure_top_k = 3  # 후보 프레임당 추가할 loop closure 쌍 수
+vocab_tree_path = None  # 지정하면 전역 디스크립터 대신 COLMAP vocabulary tree로 loop closure 검색
+
+# ✅ 매칭 스윕 방식
+#   copy  : config마다 최적 DB를 복사하고 매칭부터 다시 실행
+#   reuse : 가장 느슨한 max_ratio로 한 번만 매칭 → config마다 ratio 필터링 + 기하 검증만 다시 실행,
+#           결과는 DB 하나의 two_view_geometries_cfg{i} 테이블에 저장
+#           (guided_matching은 COLMAP 매칭 단계에서만 가능하므로 guided=True인 config는 copy로 실행)
+#   ⚠️ 기본값 guided_matching_list = [True]에서는 reuse 대상 config가 없어 모든 config가 copy로 실행됨
+#      (reuse를 쓰려면 guided_matching_list에 False를 넣을 것)
+#   ⚠️ reuse는 COLMAP SIFT 매처 대신 NumPy 매처(utils.matcher)로 후보 매칭을 계산하므로
+#      match_avg 등 매칭 수는 copy 모드나 이전 실행 결과와 직접 비교할 수 없음
+sweep_mode = "reuse"
+
+# ✅ 코어 예산 (None이면 전체 코어 사용) 및 동시에 기록할 DB 개수 제한
+total_cores = None
+max_open_dbs = 8
+
 # ✅ 1️⃣ **최적의 DB 찾기**
-df_features = pd.read_csv(feature_csv)
-best_db_path = df_features.loc[df_features["keypoint_avg"].idxmax(), "db_path"]
+def select_best_db():
+    df_features = pd.read_csv(feature_csv)
+    best_db_path = df_features.loc[df_features["keypoint_avg"].idxmax(), "db_path"]
+
+    if not os.path.exists(best_db_path):
+        raise FileNotFoundError(f"❌ 최적 DB 파일이 존재하지 않습니다: {best_db_path}")
+
+    print(f"✅ 최적 DB 선택 완료: {best_db_path}")
+    return best_db_path
+
+# ✅ 전역 디스크립터 기반 loop closure 매칭
+@timed("matching.loop_closure")
+def add_loop_closures(db_path, max_ratio, verification_options, num_threads, image_path=None):
+    """시간적으로 멀지만 비슷해 보이는 프레임 쌍을 NumPy로 매칭한 뒤 COLMAP으로 기하 검증"""
+    with ColmapDatabase(db_path) as db:
+        names = list(db.images().values())
 
-if not os.path.exists(best_db_path):
-    raise FileNotFoundError(f"❌ 최적 DB 파일이 존재하지 않습니다: {best_db_path}")
+    pairs = loop_closure_pairs(names, global_descriptors(image_path or image_dir, names), window=sequential_overlap,
+                               period=loop_closure_period, top_k=loop_closure_top_k)
+    if not pairs:
+        return
 
-print(f"✅ 최적 DB 선택 완료: {best_db_path}")
+    match_pairs(db_path, pairs, max_ratio=max_ratio, num_threads=num_threads)
+    pairs_path = write_pairs_file(pairs, str(db_path) + ".loop_pairs.txt")
+    pycolmap.verify_matches(str(db_path), pairs_path, options=verification_options)
+    print(f"🔁 Loop closure candidates verified: {len(pairs)} pairs")
 
 # ✅ 2️⃣ **특이점 매칭 실행 함수**
-def match_features(i, max_ratio, guided_matching, min_num_inliers):
-    temp_db = match_db_path / f"matched_database_{i}.db"  # 📌 output/match_db/ 내부에 저장
+@timed("matching.match")
+def match_features(i, max_ratio, guided_matching, min_num_inliers, source_db, num_threads=8, db_path=None, image_path=None):
+    # source_db: 특징점이 추출된 DB (복사해서 사용), db_path/image_path: 결과 DB 경로 / 이미지 폴더 변경
+    temp_db = pathlib.Path(db_path) if db_path else match_db_path / f"matched_database_{i}.db"  # 📌 output/match_db/ 내부에 저장
     print(f"🔍 [{i+1}] Matching Features: max_features={max_features}, max_ratio={max_ratio}, guided={guided_matching}, min_inliers={min_num_inliers}")
 
     try:
         # ✅ 기존 DB 파일을 복사하여 매칭 작업 수행
-        shutil.copy(best_db_path, temp_db)
-
-        # ✅ Feature Matching 실행 (Exhaustive Matching 사용)
-        pycolmap.match_exhaustive(
-            database_path=str(temp_db),
-            sift_options=pycolmap.SiftMatchingOptions(
-                num_threads=8,
-                max_ratio=max_ratio,  # ✅ 거리 비율 제한
-                guided_matching=guided_matching,  # ✅ 추가 매칭 여부
-            ),
-            matching_options=pycolmap.ExhaustiveMatchingOptions(),  # ✅ 기본 매칭 옵션 사용
-            verification_options=pycolmap.TwoViewGeometryOptions(
-                min_num_inliers=min_num_inliers  # ✅ 최소 inlier 개수 설정
-            ),
-            device=pycolmap.Device("cpu")
+        shutil.copy(source_db, temp_db)
+
+        sift_options = pycolmap.SiftMatchingOptions(
+            num_threads=num_threads,
+            max_ratio=max_ratio,  # ✅ 거리 비율 제한
+            guided_matching=guided_matching,  # ✅ 추가 매칭 여부
+        )
+        verification_options = pycolmap.TwoViewGeometryOptions(
+            min_num_inliers=min_num_inliers  # ✅ 최소 inlier 개수 설정
         )
 
-        # ✅ 매칭 결과 분석
-        with sqlite3.connect(temp_db) as conn:
-            df_matches = pd.read_sql_query("SELECT * FROM matches;", conn)
-            match_avg = df_matches.shape[0] if not df_matches.empty else 0
+        if matching_mode == "sequential":
+            # ✅ 시간 창 안의 프레임끼리만 매칭 (loop closure는 vocab tree가 있을 때 COLMAP이 처리)
+            pycolmap.match_sequential(
+                database_path=str(temp_db),
+                sift_options=sift_options,
+                matching_options=pycolmap.SequentialMatchingOptions(
+                    overlap=sequential_overlap,
+                    quadratic_overlap=False,
+                    loop_detection=vocab_tree_path is not None,
+                    loop_detection_period=loop_closure_period,
+                    loop_detection_num_images=loop_closure_top_k,
+                    vocab_tree_path=str(vocab_tree_path or ""),
+                ),
+                verification_options=verification_options,
+                device=pycolmap.Device("cpu")
+            )
+            if vocab_tree_path is None:
+                add_loop_closures(temp_db, max_ratio, verification_options, num_threads, image_path)
+        else:
+            # ✅ Feature Matching 실행 (Exhaustive Matching 사용)
+            pycolmap.match_exhaustive(
+                database_path=str(temp_db),
+                sift_options=sift_options,
+                matching_options=pycolmap.ExhaustiveMatchingOptions(),  # ✅ 기본 매칭 옵션 사용
+                verification_options=verification_options,
+                device=pycolmap.Device("cpu")
+            )
+
+        # ✅ 매칭 결과 분석 (집계 SQL만 사용)
+        stats = db_stats(temp_db)
+        match_avg = stats["match_pairs"]
+        inlier_pairs = stats["inlier_pairs"]
+        graph_density = stats["graph_density"]
 
     except Exception as e:
         print(f"❌ 매칭 실패: {e}")
-        match_avg = 0
-
-    return [temp_db, max_features, max_ratio, guided_matching, min_num_inliers, match_avg]
+        match_avg = inlier_pairs = 0
+        graph_density = 0.0
+
+    return [temp_db, max_features, max_ratio, guided_matching, min_num_inliers, match_avg, inlier_pairs, graph_density]
+
+# ✅ 한 번 매칭 후 config별 필터링 (reuse 모드)
+@timed("matching.match_reused")
+def match_features_reused(configs, source_db, num_threads):
+    """configs: [(i, (max_ratio, guided_matching, min_num_inliers)), ...] (guided_matching=False)"""
+    sweep_db = match_db_path / f"matched_database_{configs[0][0]}.db"
+    shutil.copy(source_db, sweep_db)
+
+    with ColmapDatabase(sweep_db) as db:
+        names = sorted(db.images().values())
+    if matching_mode == "sequential":
+        pairs = sequential_pairs(names, sequential_overlap)
+        pairs += loop_closure_pairs(names, global_descriptors(image_dir, names), window=sequential_overlap,
+                                    period=loop_closure_period, top_k=loop_closure_top_k)
+    else:
+        pairs = list(itertools.combinations(names, 2))
+    pairs_path = write_pairs_file(pairs, str(sweep_db) + ".pairs.txt")
+
+    stats = run_match_sweep(sweep_db, pairs, [(i, max_ratio, min_num_inliers) for i, (max_ratio, _, min_num_inliers) in configs],
+                            pairs_path, num_threads=num_threads)
+
+    # ✅ 첫 번째 config를 기본 테이블에 복원 (sparse 단계 호환)
+    activate_config(sweep_db, configs[0][0], configs[0][1][0])
+
+    return {i: [sweep_db, max_features, max_ratio, guided_matching, min_num_inliers, stats[i]["match_pairs"],
+                stats[i]["inlier_pairs"], stats[i]["graph_density"], overlay_table(i)]
+            for i, (max_ratio, guided_matching, min_num_inliers) in configs}
 
 # ✅ 3️⃣ **병렬 처리 실행**
 param_list = list(itertools.product(max_ratio_list, guided_matching_list, min_num_inliers_list))
@@ -73,12 +176,34 @@ if __name__ == "__main__":
     if match_db_path.exists():
         shutil.rmtree(match_db_path)
     match_db_path.mkdir(exist_ok=True)
-
-    with multiprocessing.Pool(processes=multiprocessing.cpu_count()) as pool:
-        results = pool.starmap(match_features, [(i, *params) for i, params in enumerate(param_list)])
+    best_db_path = select_best_db()
+
+    indexed = list(enumerate(param_list))
+    reused = [(i, params) for i, params in indexed if sweep_mode == "reuse" and not params[1]]
+    copied = [(i, params) for i, params in indexed if (i, params) not in reused]
+    if sweep_mode == "reuse":
+        print(f"📌 reuse (NumPy matcher): {len(reused)} configs, copy (COLMAP matcher): {len(copied)} configs")
+
+    # ✅ 코어 예산을 프로세스 수 × pycolmap 스레드 수로 분배
+    with sqlite3.connect(best_db_path) as conn:
+        num_images = conn.execute("SELECT COUNT(*) FROM images;").fetchone()[0]
+
+    results = {}
+    if copied:
+        plan = plan_core_budget(len(copied), num_images, total_cores=total_cores, max_open_dbs=max_open_dbs)
+        outputs, job_stats = run_jobs(match_features, [(i, *params, best_db_path) for i, params in copied], plan)
+        results.update({i: row + [""] for (i, _), row in zip(copied, outputs)})
+    if reused:
+        results.update(match_features_reused(reused, best_db_path, num_threads=plan_core_budget(1, num_images, total_cores=total_cores)["threads"]))
+    results = [results[i] for i, _ in indexed]
 
     # ✅ 4️⃣ **결과 CSV 저장**
-    matching_df = pd.DataFrame(results, columns=["db_path", "max_features", "max_ratio", "guided_matching", "min_num_inliers", "match_avg"])
+    matching_df = pd.DataFrame(results, columns=["db_path", "max_features", "max_ratio", "guided_matching", "min_num_inliers", "match_avg",
+                                                 "inlier_pairs", "graph_density", "overlay_table"])
     matching_df.to_csv(matching_csv, index=False)
+    for row in matching_df.to_dict("records"):
+        log_metrics("matching.config", **row)
 
     print("✅ Feature Matching 완료! 결과 CSV 저장됨.")
+    print_summary()
+    export_chrome_trace()
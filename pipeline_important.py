@@ -0,0 +1,97 @@
+import sys
+import pathlib
+import numpy as np
+import video_important as video_config
+from utils.video import save_video_pyramid, select_keyframes
+from utils.pipeline import Pipeline, Stage, python_stage
+from utils.instrument import export_chrome_trace, print_summary
+
+# 📌 경로 설정 (각 단계 스크립트와 동일)
+image_dir = pathlib.Path("images")
+small_image_dir = pathlib.Path("images_small")
+output_path = pathlib.Path("output")
+match_db_path = output_path / "match_db"
+sparse_output_path = output_path / "sparse"
+registered_manifest_path = sparse_output_path / "registered_images.json"
+nerf_data_path = output_path / "nerf_data.npz"
+poses_bounds_path = output_path / "poses_bounds.npy"  # LLFF 형식 포즈 + 이미지별 near/far
+
+# ✅ 동시에 실행할 단계 수 (선행 단계가 끝난 단계끼리만 동시에 실행)
+max_parallel_stages = 2
+
+
+# ✅ 1️⃣ 비디오 → 키프레임 원본 + 축소 이미지 (한 번의 디코딩으로 모든 해상도 저장)
+def extract_frames(video_path, levels, target_frames, sampling_mode, num_decode_workers, use_keyframe_selection, codec, level):
+    keyframes = select_keyframes(video_path, target_frames=target_frames, mode=sampling_mode) if use_keyframe_selection else None
+    save_video_pyramid(video_path, levels, target_frames=target_frames, codec=codec, level=level,
+                       mode=sampling_mode, num_workers=num_decode_workers, indices=keyframes)
+
+
+# ✅ 5️⃣ 등록된 이미지 + 포즈 → NeRF 학습용 npz (images, poses, focal, near, far) + poses_bounds.npy
+def export_nerf_data(manifest_path, image_dir, output_file, poses_bounds_file):
+    from utils.colmap_model import read_cameras
+    from utils.llff import write_poses_bounds
+    from utils.registered_images import load_registered_manifest
+    from utils.nerf_data_format import get_images, get_poses
+
+    manifest = load_registered_manifest(manifest_path)
+    names, poses = get_poses(manifest["sparse_model"])
+    images = get_images(names, dir=str(image_dir))
+    if len(images) != len(names):
+        # 읽지 못한 이미지가 빠지면 이후 모든 이미지가 다른 포즈와 짝지어지므로 저장하지 않음
+        raise ValueError(f"Loaded {len(images)} of {len(names)} registered images from {image_dir}; "
+                         f"images and poses would be misaligned")
+
+    # 축소 이미지 해상도에 맞게 focal 조정
+    camera = read_cameras(pathlib.Path(manifest["sparse_model"]) / "cameras.bin")[0]
+    focal = camera["params"][0] * images.shape[2] / camera["width"]
+
+    # 3D 점 깊이로 구한 near/far (고정된 near=2, far=6 대신 장면에 맞는 범위)
+    _, bounds = write_poses_bounds(manifest["sparse_model"], poses_bounds_file)
+    near, far = bounds[:, 15].min(), bounds[:, 16].max()
+    np.savez(output_file, images=images, poses=poses, focal=focal, near=near, far=far)
+    print(f"✅ Saved NeRF data: {output_file} ({len(images)} images)")
+
+
+stages = [
+    Stage("video", extract_frames,
+          inputs=[video_config.video_path, "video_important.py", "utils/video.py", "utils/image_writer.py"],
+          outputs=[image_dir, small_image_dir],
+          params={"video_path": video_config.video_path,
+                  "levels": {str(folder): spec for folder, spec in video_config.pyramid_levels.items()},
+                  "target_frames": video_config.target_frames,
+                  "sampling_mode": video_config.sampling_mode, "num_decode_workers": video_config.num_decode_workers,
+                  "use_keyframe_selection": video_config.use_keyframe_selection,
+                  "codec": video_config.image_codec, "level": video_config.image_codec_level}),
+    Stage("features", python_stage("feature_important.py"),
+          inputs=[image_dir, "feature_important.py", "utils/feature_cache.py", "utils/scheduler.py"],
+          outputs=[output_path / "feature_analysis.csv", output_path / "database_*.db"]),
+    Stage("matching", python_stage("matching_important.py"),
+          inputs=[output_path / "feature_analysis.csv", output_path / "database_*.db", "matching_important.py",
+                  "utils/matcher.py", "utils/match_sweep.py", "utils/pairs.py"],
+          outputs=[match_db_path]),
+    Stage("sparse", python_stage("sparse_important.py"),
+          inputs=[match_db_path / "matched_database_0.db", image_dir, "sparse_important.py", "utils/sparse_sweep.py"],
+          outputs=[sparse_output_path]),
+    Stage("nerf_export", export_nerf_data,
+          inputs=[registered_manifest_path, small_image_dir, "utils/nerf_data_format.py", "utils/llff.py"],
+          outputs=[nerf_data_path, poses_bounds_path],
+          params={"manifest_path": str(registered_manifest_path), "image_dir": str(small_image_dir),
+                  "output_file": str(nerf_data_path), "poses_bounds_file": str(poses_bounds_path)}),
+]
+
+if __name__ == "__main__":
+    # 사용법: python pipeline_important.py [단계 이름 ...] [--force 단계,단계]
+    args = sys.argv[1:]
+    force = set()
+    if "--force" in args:
+        k = args.index("--force")
+        force = set(args[k + 1].split(","))
+        args = args[:k] + args[k + 2:]
+
+    pipeline = Pipeline(stages, max_workers=max_parallel_stages)
+    ran = pipeline.run(targets=args or None, force=force)
+
+    print(f"\n✅ Pipeline 완료: 실행 {[n for n, r in ran.items() if r]}, 건너뜀 {[n for n, r in ran.items() if not r]}")
+    print_summary()
+    export_chrome_trace()
@@ -0,0 +1,99 @@
+import json
+import shutil
+import pathlib
+import pandas as pd
+from utils.search import Budget, cpu_time_used, random_configs, subsample_images, subset_sizes, successive_halving, tpe_search
+from utils.scheduler import plan_core_budget
+from feature_important import extract_features
+from matching_important import match_features
+from sparse_important import run_sparse_reconstruction
+
+# 📌 경로 설정
+image_dir = pathlib.Path("images")
+search_path = pathlib.Path("output") / "search"  # 부분 집합 / trial DB / 결과 저장 폴더
+search_csv = search_path / "search_results.csv"
+best_config_path = search_path / "best_config.json"
+
+# ✅ 탐색 공간 (기존 itertools.product grid와 같은 후보를 한 번에 탐색)
+search_space = {
+    "num_octaves": [6 + 1 * x for x in range(4)],
+    "edge_threshold": [5 + 2 * x for x in range(6)],
+    "peak_threshold": [0.005 - 0.0009 * x for x in range(5)],
+    "max_ratio": [0.6, 0.7, 0.8],
+    "guided_matching": [False, True],
+    "min_num_inliers": [15],
+    "min_num_matches": [15],
+    "min_model_size": [11, 15, 19],
+    "init_num_trials": [1000, 1500],
+}
+
+# ✅ 탐색 방식
+#   halving : 무작위로 고른 max_configs개를 작은 부분 집합에서 평가 → 상위 1/eta만 더 큰 부분 집합으로 승급
+#   tpe     : optuna TPE sampler로 config 제안 + successive halving pruner (optuna 필요)
+search_method = "halving"
+max_configs = 81
+tpe_trials = 60
+eta = 3
+min_subset_images = 12  # 가장 작은 부분 집합의 이미지 수 하한
+
+# ✅ 목표 함수
+#   registered_per_cpu_second : 등록된 이미지 수 / 사용한 CPU 시간
+#   registered_ratio          : 등록된 이미지 비율
+objective = "registered_per_cpu_second"
+
+# ✅ 예산 (None이면 제한 없음)
+wall_budget_seconds = 4 * 3600
+cpu_budget_seconds = None
+total_cores = None
+
+_trial_counter = [0]
+
+
+def evaluate(config, num_images):
+    """부분 집합(num_images장)에서 feature → matching → sparse 실행 후 목표 함수 값 반환"""
+    k = _trial_counter[0]
+    _trial_counter[0] += 1
+    trial_path = search_path / f"trial_{k}"
+    trial_path.mkdir(parents=True, exist_ok=True)
+    subset = subsample_images(image_dir, num_images, search_path / f"subset_{num_images}" / "images")
+    num_threads = plan_core_budget(1, num_images, total_cores=total_cores)["threads"]
+
+    start_cpu = cpu_time_used()
+    try:
+        db = extract_features(k, config["num_octaves"], config["edge_threshold"], config["peak_threshold"],
+                              num_threads=num_threads, image_path=subset, db_path=trial_path / "database.db")
+        matched_db = match_features(k, config["max_ratio"], config["guided_matching"], config["min_num_inliers"], db,
+                                    num_threads=num_threads, db_path=trial_path / "matched.db", image_path=subset)[0]
+        result = run_sparse_reconstruction(k, config["min_num_matches"], config["min_model_size"], config["init_num_trials"],
+                                           num_threads=num_threads, db_path=matched_db, image_path=subset, output_root=trial_path)
+    finally:
+        cpu = cpu_time_used() - start_cpu
+        shutil.rmtree(trial_path, ignore_errors=True)  # trial 결과는 점수만 남김
+
+    registered = result[4]
+    if objective == "registered_ratio":
+        return registered / num_images
+    return registered / max(cpu, 1e-6)
+
+
+if __name__ == "__main__":
+    search_path.mkdir(parents=True, exist_ok=True)
+    num_images = len([p for p in image_dir.iterdir() if p.suffix.lower() in (".png", ".jpg", ".jpeg")])
+    sizes = subset_sizes(num_images, eta=eta, min_images=min_subset_images)
+    budget = Budget(wall_seconds=wall_budget_seconds, cpu_seconds=cpu_budget_seconds)
+    print(f"🔎 {search_method} search, subsets {sizes}, objective={objective}")
+
+    if search_method == "tpe":
+        best, history = tpe_search(search_space, evaluate, sizes, n_trials=tpe_trials, budget=budget)
+    else:
+        best, history = successive_halving(random_configs(search_space, max_configs), evaluate, sizes, eta=eta, budget=budget)
+
+    # ✅ 결과 저장 (config별 점수 / 부분 집합 크기 / 시간)
+    rows = [{**entry["config"], "num_images": entry["num_images"], "score": entry["score"],
+             "wall_time": round(entry["wall_time"], 2), "cpu_time": round(entry["cpu_time"], 2)} for entry in history]
+    pd.DataFrame(rows).to_csv(search_csv, index=False)
+    with open(best_config_path, "w") as f:
+        json.dump(best, f, indent=1)
+
+    wall, cpu = budget.used()
+    print(f"\n✅ 탐색 완료 ({len(history)}회 평가, wall {wall:.0f}s, cpu {cpu:.0f}s). 최적 config: {best}")
@@ -1,21 +1,20 @@
-import os
 import shutil
 import pathlib
 import itertools
 import pandas as pd
+import sqlite3
 import pycolmap
+from utils.scheduler import plan_core_budget
+from utils.sparse_sweep import run_sweep, SweepStopped
+from utils.registered_images import write_registered_manifest
+from utils.instrument import timed, log_metrics, reconstruction_metrics, export_chrome_trace, print_summary
 
 # 📌 COLMAP 작업 경로 설정
 output_path = pathlib.Path("output")
 match_db_path = output_path / "match_db"
 sparse_output_path = output_path / "sparse"
-backup_image_dir = pathlib.Path("backup_images")
 image_dir = pathlib.Path("images")
-
-# ✅ sparse 폴더 초기화
-if sparse_output_path.exists():
-    shutil.rmtree(sparse_output_path)
-sparse_output_path.mkdir(exist_ok=True)
+registered_manifest_path = sparse_output_path / "registered_images.json"  # 등록된 이미지 목록
 
 # ✅ 사용된 데이터베이스
 database_path = match_db_path / "matched_database_0.db"
@@ -27,15 +26,23 @@ init_num_trials_list = [1000, 1500]
 
 param_list = list(itertools.product(min_num_matches_list, min_model_size_list, init_num_trials_list))
 
+# ✅ 병렬 스윕 설정
+total_cores = None  # None이면 전체 코어 사용
+abort_rungs = (60, 180, 540, 1620)  # 이 시점(초)마다 뒤처진 config 중단
+abort_eta = 3  # 각 시점에서 상위 1/eta만 계속 진행
+
 # ✅ Sparse Reconstruction 실행 함수
-def run_sparse_reconstruction(i, min_num_matches, min_model_size, init_num_trials):
-    exp_sparse_output_path = sparse_output_path / f"sparse_{i}"
-    exp_sparse_output_path.mkdir(exist_ok=True)
+@timed("sparse.reconstruction")
+def run_sparse_reconstruction(i, min_num_matches, min_model_size, init_num_trials, num_threads=8, progress_callback=None,
+                              db_path=None, image_path=None, output_root=None):
+    # db_path/image_path/output_root를 주면 다른 DB·이미지 폴더(예: 하이퍼파라미터 탐색용 부분 집합)에 대해 실행
+    exp_sparse_output_path = pathlib.Path(output_root or sparse_output_path) / f"sparse_{i}"
+    exp_sparse_output_path.mkdir(parents=True, exist_ok=True)
 
     print(f"\n🔍 [{i+1}] Sparse Reconstruction: min_matches={min_num_matches}, min_model_size={min_model_size}, init_trials={init_num_trials}")
 
     options = pycolmap.IncrementalPipelineOptions()
-    options.num_threads = 8
+    options.num_threads = num_threads
     options.ba_local_max_num_iterations = 50
     options.ba_global_max_num_iterations = 100
     options.min_num_matches = min_num_matches
@@ -43,58 +50,84 @@ def run_sparse_reconstruction(i, min_num_matches, min_model_size, init_num_trial
     options.init_num_trials = init_num_trials
     options.multiple_models = True
 
+    # ✅ 등록된 이미지 수를 진행 상황으로 보고 (조기 중단 판단용)
+    callbacks = {}
+    if progress_callback is not None:
+        registered = [0]
+
+        def on_register(n):
+            registered[0] += n
+            progress_callback(registered[0])
+
+        callbacks = {
+            "initial_image_pair_callback": lambda: on_register(2),
+            "next_image_callback": lambda: on_register(1),
+        }
+
     try:
         reconstruction = pycolmap.incremental_mapping(
-            database_path=str(database_path),
-            image_path=str(image_dir),
+            database_path=str(db_path or database_path),
+            image_path=str(image_path or image_dir),
             output_path=str(exp_sparse_output_path),
-            options=options
+            options=options,
+            **callbacks
         )
 
-        num_images_registered = max([reconstruction[i].num_reg_images() for i in reconstruction])
-        camera_bin_path = exp_sparse_output_path / "sparse/0/cameras.bin"
-        camera_bin_size = os.path.getsize(camera_bin_path) if camera_bin_path.exists() else 0
+        # ✅ 가장 큰 모델 기준 품질 지표 (재투영 오차, track 길이, 3D 점 수)
+        best_model = max(reconstruction.values(), key=lambda model: model.num_reg_images()) if reconstruction else None
+        metrics = reconstruction_metrics(best_model)
+        num_images_registered = metrics["num_reg_images"]
 
         for model_id, model in reconstruction.items():
             print(f"Model {model_id}: 등록된 이미지 개수 = {model.num_reg_images()}")
 
         print(f"✅ Reconstruction 완료! {num_images_registered}개 이미지 등록됨. 저장 경로: {exp_sparse_output_path}")
 
+    except SweepStopped:
+        raise  # 조기 중단은 실패가 아니므로 지표를 기록하지 않음
     except Exception as e:
         print(f"❌ Reconstruction 실패: {e}")
+        metrics = reconstruction_metrics(None)
         num_images_registered = 0
-        camera_bin_size = 0
-
-    return [exp_sparse_output_path, min_num_matches, min_model_size, init_num_trials, num_images_registered, camera_bin_size]
-
-# ✅ 실행 및 결과 저장
-results = []
-for i, params in enumerate(param_list):
-    results.append(run_sparse_reconstruction(i, *params))
-
-results_df = pd.DataFrame(results, columns=["output_path", "min_num_matches", "min_model_size", "init_num_trials", "num_images_registered", "camera_bin_size"])
-sparse_results_csv = sparse_output_path / "sparse_results.csv"
-results_df.to_csv(sparse_results_csv, index=False)
-print("\n✅ 모든 Sparse Reconstruction 실험 완료! 결과 CSV 저장됨.")
-
-# ✅ 이미지 백업
-backup_image_dir.mkdir(exist_ok=True)
-for img_file in image_dir.glob("*.png"):
-    shutil.move(str(img_file), backup_image_dir / img_file.name)
-
-# ✅ 최적 sparse 경로 선택 후 등록된 이미지 복원
-best_sparse = results_df.loc[results_df["num_images_registered"].idxmax(), "output_path"]
-best_sparse_path = pathlib.Path(best_sparse) / "0"
-
-recon = pycolmap.Reconstruction(str(best_sparse_path))
-registered_names = {recon.images[i].name for i in recon.images}
-
-restored = 0
-for name in registered_names:
-    src = backup_image_dir / name
-    dst = image_dir / name
-    if src.exists():
-        shutil.move(str(src), str(dst))
-        restored += 1
 
-print(f"\n📦 총 {restored}개의 등록된 이미지만 복원 완료.")
+    log_metrics("sparse.config", config=i, min_num_matches=min_num_matches, min_model_size=min_model_size,
+                init_num_trials=init_num_trials, **metrics)
+    return [exp_sparse_output_path, min_num_matches, min_model_size, init_num_trials, num_images_registered,
+            metrics["mean_reprojection_error"], metrics["mean_track_length"], metrics["num_points3D"]]
+
+if __name__ == "__main__":
+    # ✅ sparse 폴더 초기화
+    if sparse_output_path.exists():
+        shutil.rmtree(sparse_output_path)
+    sparse_output_path.mkdir(exist_ok=True)
+
+    # ✅ 실행 및 결과 저장 (프로세스 병렬 실행 + 뒤처진 config 조기 중단)
+    with sqlite3.connect(database_path) as conn:
+        num_images = conn.execute("SELECT COUNT(*) FROM images;").fetchone()[0]
+    plan = plan_core_budget(len(param_list), num_images, total_cores=total_cores)
+    outcomes = run_sweep(run_sparse_reconstruction, [(i, *params) for i, params in enumerate(param_list)], plan,
+                         rungs=abort_rungs, eta=abort_eta)
+
+    results = []
+    for (i, params), outcome in zip(enumerate(param_list), outcomes):
+        if outcome["status"] == "done":
+            row = outcome["result"]
+        else:
+            row = [sparse_output_path / f"sparse_{i}", *params, outcome["registered"] if outcome["status"] == "aborted" else 0,
+                   float("nan"), 0.0, 0]
+        results.append(row + [round(outcome["wall_time"], 2), outcome["status"] == "aborted"])
+
+    results_df = pd.DataFrame(results, columns=["output_path", "min_num_matches", "min_model_size", "init_num_trials", "num_images_registered",
+                                                "mean_reprojection_error", "mean_track_length", "num_points3D", "wall_time", "aborted"])
+    sparse_results_csv = sparse_output_path / "sparse_results.csv"
+    results_df.to_csv(sparse_results_csv, index=False)
+    print("\n✅ 모든 Sparse Reconstruction 실험 완료! 결과 CSV 저장됨.")
+
+    # ✅ 최적 sparse 경로 선택 후 등록된 이미지 목록(manifest) 저장 (이미지 파일은 이동하지 않음)
+    best_sparse = results_df[~results_df["aborted"]].sort_values("num_images_registered").iloc[-1]["output_path"]
+    best_sparse_path = pathlib.Path(best_sparse) / "0"
+
+    manifest = write_registered_manifest(best_sparse_path, image_dir, registered_manifest_path)
+    print(f"\n📦 등록된 이미지 {len(manifest['images'])}개 목록 저장: {registered_manifest_path}")
+    print_summary()
+    export_chrome_trace()
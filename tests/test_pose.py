@@ -0,0 +1,90 @@
+import math
+import numpy as np
+import pytest
+from utils.matrix import qvec_to_rotmat
+from utils.pose import OPENGL_FLIP, cam_from_world, cam_to_world, quat_to_rotmat, rotmat_to_quat
+
+# ✅ utils.pose의 xyzw / wxyz 경로가 기존 scalar 함수 및 축-각(Rodrigues) 공식과 같은 포즈를 만드는지 확인
+
+
+def axis_angle_rotmat(axis, angle):
+    """Rodrigues 공식으로 만든 회전 행렬 (쿼터니언을 거치지 않는 기준값)"""
+    x, y, z = axis
+    c, s = math.cos(angle), math.sin(angle)
+    C = 1 - c
+    return np.array([
+        [c + x * x * C, x * y * C - z * s, x * z * C + y * s],
+        [y * x * C + z * s, c + y * y * C, y * z * C - x * s],
+        [z * x * C - y * s, z * y * C + x * s, c + z * z * C],
+    ])
+
+
+@pytest.fixture
+def poses():
+    """무작위 축-각 회전 → (xyzw, wxyz, translation, 기준 회전 행렬)"""
+    rng = np.random.default_rng(0)
+    n = 64
+    axes = rng.normal(size=(n, 3))
+    axes /= np.linalg.norm(axes, axis=1, keepdims=True)
+    angles = rng.uniform(-math.pi, math.pi, n)
+
+    half = angles[:, None] / 2
+    xyzw = np.concatenate([axes * np.sin(half), np.cos(half)], axis=1)
+    wxyz = xyzw[:, [3, 0, 1, 2]]
+    t = rng.normal(size=(n, 3))
+    R = np.stack([axis_angle_rotmat(axis, angle) for axis, angle in zip(axes, angles)])
+    return xyzw, wxyz, t, R
+
+
+def test_quat_orders_agree(poses):
+    xyzw, wxyz, _, R = poses
+    assert np.allclose(quat_to_rotmat(xyzw, "xyzw"), R)
+    assert np.allclose(quat_to_rotmat(wxyz, "wxyz"), R)
+    for k in range(len(R)):
+        assert np.allclose(qvec_to_rotmat(wxyz[k]), R[k])
+
+
+def test_quat_is_normalized(poses):
+    xyzw, wxyz, _, R = poses
+    assert np.allclose(quat_to_rotmat(3.0 * xyzw, "xyzw"), R)
+    assert np.allclose(quat_to_rotmat(-wxyz, "wxyz"), R)  # q와 -q는 같은 회전
+
+
+def test_unknown_order():
+    with pytest.raises(ValueError):
+        quat_to_rotmat(np.array([[0., 0., 0., 1.]]), "zyxw")
+
+
+@pytest.mark.parametrize("order", ["xyzw", "wxyz"])
+def test_rotmat_to_quat_round_trip(poses, order):
+    xyzw, wxyz, _, R = poses
+    q = xyzw if order == "xyzw" else wxyz
+    back = rotmat_to_quat(R, order)
+    assert np.allclose(np.abs(np.sum(back * q, axis=1)), 1.0)
+    assert np.allclose(quat_to_rotmat(back, order), R)
+
+
+def test_cam_from_world(poses):
+    xyzw, wxyz, t, R = poses
+    w2c = cam_from_world(xyzw, t, "xyzw")
+    assert np.allclose(cam_from_world(wxyz, t, "wxyz"), w2c)
+    for k in range(len(R)):
+        expected = np.eye(4)
+        expected[:3, :3] = qvec_to_rotmat(wxyz[k])
+        expected[:3, 3] = t[k]
+        assert np.allclose(w2c[k], expected)
+
+
+@pytest.mark.parametrize("opengl", [False, True])
+def test_cam_to_world(poses, opengl):
+    xyzw, wxyz, t, R = poses
+    c2w = cam_to_world(xyzw, t, "xyzw", opengl=opengl)
+    assert np.allclose(cam_to_world(wxyz, t, "wxyz", opengl=opengl), c2w)
+
+    flip = OPENGL_FLIP if opengl else np.eye(4)
+    for k in range(len(R)):
+        expected = np.eye(4)
+        expected[:3, :3] = R[k].T
+        expected[:3, 3] = -R[k].T @ t[k]  # 카메라 중심
+        assert np.allclose(c2w[k], expected @ flip)
+    assert np.allclose(c2w @ flip, np.linalg.inv(cam_from_world(wxyz, t, "wxyz")))
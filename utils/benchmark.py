@@ -0,0 +1,106 @@
+import os
+import json
+import time
+import pathlib
+import platform
+import subprocess
+from utils.instrument import RssSampler, RSS_INTERVAL, current_rss
+
+# ✅ 벤치마크 결과 기록 (한 줄 = 한 단계 결과, 커밋 간 비교용)
+HISTORY_PATH = pathlib.Path("benchmark") / "history.jsonl"
+
+# ✅ 이전 결과보다 이 비율 이상 느려지면 회귀로 표시
+REGRESSION_THRESHOLD = 0.10
+
+
+def git_commit():
+    """현재 커밋 해시 (git이 없으면 "unknown", 수정 사항이 있으면 "+dirty")"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout.strip()
+        return commit + ("+dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def measure(stage, scene, fn, count=None, unit="images", **meta):
+    """fn()을 실행하며 wall time / 최대 RSS 측정
+
+    count: 처리량 계산에 쓸 개수 (함수면 fn의 반환값으로 호출), unit: 처리량 단위 (images, pairs, rays)
+    """
+    sampler = RssSampler(RSS_INTERVAL)
+    sampler.start()
+    rss_start = current_rss()
+    start = time.perf_counter()
+    try:
+        result = fn()
+    finally:
+        wall = time.perf_counter() - start
+        rss_peak = sampler.stop()
+
+    if callable(count):
+        count = count(result)
+    record = {
+        "stage": stage,
+        "scene": scene,
+        "wall_time": wall,
+        "count": count,
+        "unit": unit,
+        "throughput": count / wall if count and wall > 0 else None,
+        "rss_peak_mb": rss_peak / 2 ** 20,
+        "rss_delta_mb": (rss_peak - rss_start) / 2 ** 20,
+        "meta": meta,
+    }
+    rate = f"{record['throughput']:10.2f} {unit}/s" if record["throughput"] else " " * 10 + " -"
+    print(f"⏱️ {stage:<14} {scene:<8} wall {wall:8.2f}s  {rate}  peak RSS {record['rss_peak_mb']:8.1f} MB")
+    return result, record
+
+
+def load_history(path=HISTORY_PATH):
+    path = pathlib.Path(path)
+    if not path.exists():
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_history(records, config, path=HISTORY_PATH):
+    """이번 실행 결과를 커밋/시각/설정과 함께 history에 추가"""
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    run = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": platform.node(),
+        "cpu_count": os.cpu_count(),
+        "config": config,
+    }
+    with open(path, "a") as f:
+        for record in records:
+            f.write(json.dumps({**run, **record}, default=str) + "\n")
+    return run
+
+
+def find_regressions(records, config, history, threshold=REGRESSION_THRESHOLD):
+    """같은 설정/호스트의 직전 결과보다 threshold 이상 느려진 단계 목록"""
+    host = platform.node()
+    config = json.loads(json.dumps(config, default=str))
+    regressions = []
+    for record in records:
+        previous = [h for h in history if h["stage"] == record["stage"] and h["scene"] == record["scene"]
+                    and h["config"] == config and h["host"] == host]
+        if not previous:
+            continue
+        last = previous[-1]
+        if last["wall_time"] > 0 and record["wall_time"] > last["wall_time"] * (1 + threshold):
+            regressions.append((record, last))
+    return regressions
+
+
+def print_regressions(regressions):
+    if not regressions:
+        print("✅ No regressions against the previous run.")
+        return
+    for record, last in regressions:
+        print(f"⚠️ Regression: {record['stage']} / {record['scene']} {last['wall_time']:.2f}s ({last['commit']}) "
+              f"→ {record['wall_time']:.2f}s (+{100 * (record['wall_time'] / last['wall_time'] - 1):.0f}%)")
@@ -0,0 +1,171 @@
+import pathlib
+import sqlite3
+import numpy as np
+
+# ✅ COLMAP pair_id = image_id1 * MAX_IMAGE_ID + image_id2 (image_id1 < image_id2)
+MAX_IMAGE_ID = 2147483647
+
+# ✅ SQLite 한 쿼리에 넣을 수 있는 파라미터 수 제한
+_CHUNK = 900
+
+
+def image_ids_to_pair_id(image_id1, image_id2):
+    """이미지 id 쌍 → pair_id (배열 입력 가능, 작은 id가 앞으로 오도록 정렬)"""
+    image_id1 = np.asarray(image_id1, dtype=np.int64)
+    image_id2 = np.asarray(image_id2, dtype=np.int64)
+    return np.minimum(image_id1, image_id2) * MAX_IMAGE_ID + np.maximum(image_id1, image_id2)
+
+
+def pair_id_to_image_ids(pair_id):
+    """pair_id → (image_id1, image_id2) (배열 입력 가능)"""
+    pair_id = np.asarray(pair_id, dtype=np.int64)
+    return pair_id // MAX_IMAGE_ID, pair_id % MAX_IMAGE_ID
+
+
+def _blob(data, dtype, rows, cols):
+    """SQLite blob을 복사 없이 (rows, cols) 배열로 변환"""
+    if data is None or rows == 0:
+        return np.zeros((rows, cols), dtype=dtype)
+    return np.frombuffer(data, dtype=dtype).reshape(rows, cols)
+
+
+def _chunks(values):
+    values = [int(v) for v in values]
+    for start in range(0, len(values), _CHUNK):
+        yield values[start:start + _CHUNK]
+
+
+def _stack(rows):
+    """(pair_id, rows, data) 목록 → pair_id/image_id 배열 + 이어 붙인 (sum, 2) 매칭 배열"""
+    pair_ids = np.array([r[0] for r in rows], dtype=np.int64)
+    counts = np.array([r[1] for r in rows], dtype=np.int64)
+    offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    data = b"".join(r[2] for r in rows if r[2] is not None and r[1] > 0)
+    image_id1, image_id2 = pair_id_to_image_ids(pair_ids)
+    return {
+        "pair_ids": pair_ids,
+        "image_id1": image_id1,
+        "image_id2": image_id2,
+        "counts": counts,
+        "offsets": offsets,
+        "matches": np.frombuffer(data, dtype=np.uint32).reshape(-1, 2),
+    }
+
+
+class ColmapDatabase:
+    """COLMAP database.db를 NumPy 배열로 읽는 얇은 래퍼
+
+    keypoints/descriptors는 {image_id: 배열}, matches/two_view_geometries는
+    pair 단위 배열을 이어 붙인 형태(offsets로 pair별 구간 접근)로 반환합니다.
+    """
+
+    def __init__(self, path, readonly=True):
+        self.path = str(path)
+        if readonly:
+            uri = pathlib.Path(path).resolve().as_uri() + "?mode=ro"
+            self.conn = sqlite3.connect(uri, uri=True, timeout=60)
+        else:
+            self.conn = sqlite3.connect(self.path, timeout=60)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _select(self, sql, ids=None, column="image_id"):
+        """ids가 주어지면 column IN (...) 조건으로 나누어 조회"""
+        if ids is None:
+            return self.conn.execute(sql).fetchall()
+        rows = []
+        for chunk in _chunks(ids):
+            where = f"{column} IN ({','.join('?' * len(chunk))})"
+            rows.extend(self.conn.execute(sql.replace("{where}", where), chunk).fetchall())
+        return rows
+
+    def create_pair_indexes(self):
+        """image_id 기준 pair 조회용 expression index 생성 (readonly=False 필요)"""
+        with self.conn:
+            for table in ("matches", "two_view_geometries"):
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_image_id1 ON {table} (pair_id / {MAX_IMAGE_ID});")
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_image_id2 ON {table} (pair_id % {MAX_IMAGE_ID});")
+
+    def images(self):
+        """{image_id: name}"""
+        return dict(self.conn.execute("SELECT image_id, name FROM images ORDER BY image_id;").fetchall())
+
+    def keypoint_counts(self, image_ids=None):
+        """(image_ids, 특징점 개수) 배열"""
+        sql = "SELECT image_id, rows FROM keypoints" + ("" if image_ids is None else " WHERE {where}") + ";"
+        rows = self._select(sql, image_ids)
+        return np.array([r[0] for r in rows], dtype=np.int64), np.array([r[1] for r in rows], dtype=np.int64)
+
+    def keypoints(self, image_ids=None):
+        """{image_id: (N, 2|4|6) float32} (x, y, [affine shape])"""
+        sql = "SELECT image_id, rows, cols, data FROM keypoints" + ("" if image_ids is None else " WHERE {where}") + ";"
+        return {r[0]: _blob(r[3], np.float32, r[1], r[2]) for r in self._select(sql, image_ids)}
+
+    def descriptors(self, image_ids=None):
+        """{image_id: (N, 128) uint8}"""
+        sql = "SELECT image_id, rows, cols, data FROM descriptors" + ("" if image_ids is None else " WHERE {where}") + ";"
+        return {r[0]: _blob(r[3], np.uint8, r[1], r[2]) for r in self._select(sql, image_ids)}
+
+    def _pair_rows(self, table, columns, image_ids, both):
+        if image_ids is None:
+            return self.conn.execute(f"SELECT {columns} FROM {table} ORDER BY pair_id;").fetchall()
+
+        image_ids = sorted({int(i) for i in image_ids})
+        if both:
+            # 두 이미지가 모두 목록에 있는 pair만: 가능한 pair_id를 직접 만들어 기본 키로 조회
+            id1, id2 = np.triu_indices(len(image_ids), k=1)
+            ids = np.array(image_ids, dtype=np.int64)
+            pair_ids = image_ids_to_pair_id(ids[id1], ids[id2])
+            rows = self._select(f"SELECT {columns} FROM {table} WHERE {{where}};", pair_ids, column="pair_id")
+        else:
+            rows = {}
+            for expr in (f"pair_id / {MAX_IMAGE_ID}", f"pair_id % {MAX_IMAGE_ID}"):
+                for r in self._select(f"SELECT {columns} FROM {table} WHERE {{where}};", image_ids, column=expr):
+                    rows[r[0]] = r
+            rows = list(rows.values())
+        return sorted(rows, key=lambda r: r[0])
+
+    def pair_ids(self, table="matches"):
+        """테이블에 기록된 pair_id 배열 (blob은 읽지 않음)"""
+        rows = self.conn.execute(f"SELECT pair_id FROM {table};").fetchall()
+        return np.array([r[0] for r in rows], dtype=np.int64)
+
+    @staticmethod
+    def pair_id(image_id1, image_id2):
+        return int(image_ids_to_pair_id(image_id1, image_id2))
+
+    def write_matches(self, image_id1, image_id2, matches, table="matches"):
+        """(M, 2) 매칭을 COLMAP 형식으로 기록 (image_id1 > image_id2면 열 순서를 바꿔 저장, readonly=False 필요)"""
+        matches = np.asarray(matches, dtype=np.uint32).reshape(-1, 2)
+        if image_id1 > image_id2:
+            matches = matches[:, ::-1]
+        pair_id = self.pair_id(image_id1, image_id2)
+        self.conn.execute(f"INSERT OR REPLACE INTO {table} (pair_id, rows, cols, data) VALUES (?, ?, 2, ?);",
+                          (pair_id, len(matches), np.ascontiguousarray(matches).tobytes()))
+        return pair_id
+
+    def matches(self, image_ids=None, both=False):
+        """원시 매칭 (image_ids가 있으면 해당 이미지가 포함된 pair만, both=True면 두 이미지 모두 포함)
+
+        반환: {"pair_ids", "image_id1", "image_id2", "counts", "offsets", "matches" (sum, 2) uint32}
+        pair k의 매칭은 matches[offsets[k]:offsets[k + 1]]
+        """
+        return _stack(self._pair_rows("matches", "pair_id, rows, data", image_ids, both))
+
+    def two_view_geometries(self, image_ids=None, both=False):
+        """기하 검증된 inlier 매칭 + config, F/E/H 행렬 (matches()와 같은 형식에 추가 키 포함)"""
+        rows = self._pair_rows("two_view_geometries", "pair_id, rows, data, config, F, E, H", image_ids, both)
+        result = _stack(rows)
+        result["config"] = np.array([r[3] for r in rows], dtype=np.int64)
+        for k, key in enumerate(("F", "E", "H")):
+            result[key] = np.stack([_blob(r[4 + k], np.float64, 3, 3) if r[4 + k] else np.full((3, 3), np.nan)
+                                    for r in rows]) if rows else np.zeros((0, 3, 3))
+        return result
@@ -0,0 +1,168 @@
+import os
+import sys
+import mmap
+import time
+import struct
+import contextlib
+import numpy as np
+
+# ✅ pycolmap 없이 COLMAP sparse 모델(cameras.bin / images.bin / points3D.bin)을 NumPy 배열로 읽기
+#   - 이미지별 2D 점 목록 / 3D 점별 track은 요청할 때만 읽음 (기본은 건너뜀)
+#   - 쿼터니언은 파일에 저장된 그대로 (w, x, y, z) 순서 → utils.pose 함수에 order="wxyz"로 전달
+
+# model_id: (이름, 파라미터 수)
+CAMERA_MODELS = {
+    0: ("SIMPLE_PINHOLE", 3),
+    1: ("PINHOLE", 4),
+    2: ("SIMPLE_RADIAL", 4),
+    3: ("RADIAL", 5),
+    4: ("OPENCV", 8),
+    5: ("OPENCV_FISHEYE", 8),
+    6: ("FULL_OPENCV", 12),
+    7: ("FOV", 5),
+    8: ("SIMPLE_RADIAL_FISHEYE", 4),
+    9: ("RADIAL_FISHEYE", 5),
+    10: ("THIN_PRISM_FISHEYE", 12),
+    11: ("RAD_TAN_THIN_PRISM_FISHEYE", 16),
+}
+MAX_CAMERA_PARAMS = max(num_params for _, num_params in CAMERA_MODELS.values())
+
+CAMERA_DTYPE = np.dtype([("camera_id", np.int32), ("model_id", np.int32), ("width", np.uint64), ("height", np.uint64),
+                         ("num_params", np.int32), ("params", np.float64, MAX_CAMERA_PARAMS)])
+
+# images.bin 레코드 고정 부분: image_id, qw qx qy qz, tx ty tz, camera_id (64 bytes, 뒤에 이름 + 2D 점)
+_IMAGE_HEADER = np.dtype([("image_id", "<i4"), ("quat", "<f8", 4), ("translation", "<f8", 3), ("camera_id", "<i4")])
+POINT2D_DTYPE = np.dtype([("xy", "<f8", 2), ("point3D_id", "<i8")])
+
+# points3D.bin 레코드 고정 부분: point3D_id, xyz, rgb, error (43 bytes, 뒤에 track 길이 + (image_id, point2D_idx) 목록)
+_POINT_HEADER = np.dtype([("point3D_id", "<u8"), ("xyz", "<f8", 3), ("rgb", "u1", 3), ("error", "<f8")])
+TRACK_DTYPE = np.dtype([("image_id", "<i4"), ("point2D_idx", "<i4")])
+
+
+@contextlib.contextmanager
+def _mapped(path):
+    """파일 전체를 읽지 않고 mmap으로 열기 (건너뛰는 구간은 디스크에서 읽지 않음)"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer
+
+
+def _gather(buffer, offsets, dtype):
+    """여러 오프셋에 흩어진 고정 길이 레코드를 한 번에 모아 structured array로 변환"""
+    if len(offsets) == 0:
+        return np.zeros(0, dtype=dtype)
+    raw = np.frombuffer(buffer, dtype=np.uint8)
+    rows = raw[np.asarray(offsets, dtype=np.int64)[:, None] + np.arange(dtype.itemsize)]
+    return rows.view(dtype).reshape(-1).copy()
+
+
+def _concat_ranges(buffer, starts, counts, dtype):
+    """(시작 오프셋, 개수) 목록의 레코드를 이어 붙인 배열 + CSR 오프셋 (i번째 = data[offsets[i]:offsets[i + 1]])"""
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    data = np.empty(offsets[-1], dtype=dtype)
+    for i, (start, count) in enumerate(zip(starts, counts)):
+        data[offsets[i]:offsets[i + 1]] = np.frombuffer(buffer, dtype=dtype, count=count, offset=start)
+    return data, offsets
+
+
+def read_cameras(path):
+    """cameras.bin → CAMERA_DTYPE structured array (params는 num_params 이후 NaN)"""
+    with _mapped(path) as buffer:
+        (num_cameras,) = struct.unpack_from("<Q", buffer, 0)
+        cameras = np.zeros(num_cameras, dtype=CAMERA_DTYPE)
+        cameras["params"] = np.nan
+        offset = 8
+        for i in range(num_cameras):
+            camera_id, model_id, width, height = struct.unpack_from("<iiQQ", buffer, offset)
+            num_params = CAMERA_MODELS[model_id][1]
+            cameras[i]["camera_id"], cameras[i]["model_id"] = camera_id, model_id
+            cameras[i]["width"], cameras[i]["height"], cameras[i]["num_params"] = width, height, num_params
+            cameras[i]["params"][:num_params] = struct.unpack_from(f"<{num_params}d", buffer, offset + 24)
+            offset += 24 + 8 * num_params
+    return cameras
+
+
+def read_images(path, with_points2D=False):
+    """images.bin → {"image_id", "quat" (wxyz), "translation", "camera_id", "name"} (+ "points2D", "points2D_offsets")
+
+    2D 점 목록은 with_points2D=True일 때만 읽음 (points2D[points2D_offsets[i]:points2D_offsets[i + 1]] = i번째 이미지)
+    """
+    with _mapped(path) as buffer:
+        (num_images,) = struct.unpack_from("<Q", buffer, 0)
+        offsets, names, point_starts, point_counts = [], [], [], []
+        offset = 8
+        for _ in range(num_images):
+            offsets.append(offset)
+            name_end = buffer.find(b"\0", offset + _IMAGE_HEADER.itemsize)
+            names.append(buffer[offset + _IMAGE_HEADER.itemsize:name_end].decode("utf-8"))
+            (num_points2D,) = struct.unpack_from("<Q", buffer, name_end + 1)
+            point_starts.append(name_end + 9)
+            point_counts.append(num_points2D)
+            offset = name_end + 9 + POINT2D_DTYPE.itemsize * num_points2D
+
+        header = _gather(buffer, offsets, _IMAGE_HEADER)
+        images = {
+            "image_id": header["image_id"],
+            "quat": header["quat"],
+            "translation": header["translation"],
+            "camera_id": header["camera_id"],
+            "name": names,
+            "num_points2D": np.array(point_counts, dtype=np.int64),
+        }
+        if with_points2D:
+            images["points2D"], images["points2D_offsets"] = _concat_ranges(buffer, point_starts, point_counts, POINT2D_DTYPE)
+    return images
+
+
+def read_points3D(path, with_tracks=False):
+    """points3D.bin → {"point3D_id", "xyz", "rgb", "error", "track_length"} (+ "tracks", "track_offsets")
+
+    track은 with_tracks=True일 때만 읽음 (tracks[track_offsets[i]:track_offsets[i + 1]] = i번째 점의 (image_id, point2D_idx))
+    """
+    with _mapped(path) as buffer:
+        (num_points,) = struct.unpack_from("<Q", buffer, 0)
+        offsets = np.empty(num_points, dtype=np.int64)
+        lengths = np.empty(num_points, dtype=np.int64)
+        unpack_length = struct.Struct("<Q").unpack_from
+        offset, header_size, entry_size = 8, _POINT_HEADER.itemsize, TRACK_DTYPE.itemsize
+        for i in range(num_points):
+            (length,) = unpack_length(buffer, offset + header_size)
+            offsets[i], lengths[i] = offset, length
+            offset += header_size + 8 + entry_size * length
+
+        header = _gather(buffer, offsets, _POINT_HEADER)
+        points = {
+            "point3D_id": header["point3D_id"],
+            "xyz": header["xyz"],
+            "rgb": header["rgb"],
+            "error": header["error"],
+            "track_length": lengths,
+        }
+        if with_tracks:
+            points["tracks"], points["track_offsets"] = _concat_ranges(buffer, offsets + header_size + 8, lengths, TRACK_DTYPE)
+    return points
+
+
+def read_model(path, with_points2D=False, with_tracks=False, points3D=True):
+    """sparse 모델 폴더 → {"cameras", "images", "points3D"} (points3D=False면 points3D.bin을 읽지 않음)"""
+    model = {
+        "cameras": read_cameras(os.path.join(path, "cameras.bin")),
+        "images": read_images(os.path.join(path, "images.bin"), with_points2D),
+    }
+    if points3D:
+        model["points3D"] = read_points3D(os.path.join(path, "points3D.bin"), with_tracks)
+    return model
+
+
+if __name__ == "__main__":
+    # 사용법: python -m utils.colmap_model <sparse 모델 폴더>
+    model_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join("nerf_data", "sparse", "0")
+    start = time.perf_counter()
+    model = read_model(model_path)
+    elapsed = time.perf_counter() - start
+    print(f"✅ {model_path}: {len(model['cameras'])} cameras, {len(model['images']['name'])} images, "
+          f"{len(model['points3D']['xyz'])} points in {1000 * elapsed:.1f} ms")
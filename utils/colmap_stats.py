@@ -0,0 +1,98 @@
+import pathlib
+import sqlite3
+import concurrent.futures
+from utils.colmap_db import MAX_IMAGE_ID
+
+# ✅ 모든 통계는 집계 SQL로만 계산 (keypoint/descriptor/match blob은 읽지 않음)
+DB_STATS_SQL = {
+    "num_images": "SELECT COUNT(*) FROM images;",
+    "keypoints": "SELECT COUNT(*), AVG(rows), MIN(rows), MAX(rows), SUM(rows) FROM keypoints;",
+    "keypoint_median": """
+        SELECT AVG(rows) FROM (
+            SELECT rows FROM keypoints ORDER BY rows
+            LIMIT 2 - (SELECT COUNT(*) FROM keypoints) % 2
+            OFFSET (SELECT (COUNT(*) - 1) / 2 FROM keypoints));""",
+    "matches": "SELECT COUNT(*), COUNT(CASE WHEN rows > 0 THEN 1 END), SUM(rows) FROM matches;",
+    "two_view_geometries": "SELECT COUNT(CASE WHEN rows > 0 THEN 1 END), SUM(rows), AVG(CASE WHEN rows > 0 THEN rows END) FROM two_view_geometries;",
+}
+
+IMAGE_STATS_SQL = f"""
+    WITH verified AS (
+        SELECT pair_id / {MAX_IMAGE_ID} AS image_id1, pair_id % {MAX_IMAGE_ID} AS image_id2, rows
+        FROM two_view_geometries WHERE rows > 0
+    ), edges AS (
+        SELECT image_id1 AS image_id, rows FROM verified
+        UNION ALL
+        SELECT image_id2 AS image_id, rows FROM verified
+    )
+    SELECT i.image_id, i.name, COALESCE(k.rows, 0), COUNT(e.rows), COALESCE(SUM(e.rows), 0)
+    FROM images i
+    LEFT JOIN keypoints k ON k.image_id = i.image_id
+    LEFT JOIN edges e ON e.image_id = i.image_id
+    GROUP BY i.image_id
+    ORDER BY i.image_id;
+"""
+
+
+def connect_readonly(db_path):
+    """읽기 전용 SQLite 연결 (실행 중인 다른 프로세스의 기록과 충돌하지 않음)"""
+    uri = pathlib.Path(db_path).resolve().as_uri() + "?mode=ro"
+    return sqlite3.connect(uri, uri=True, timeout=60)
+
+
+def _fetch(conn, sql):
+    try:
+        return conn.execute(sql).fetchone()
+    except sqlite3.OperationalError:
+        # 테이블이 없는 DB (예: 매칭 전 단계)
+        return None
+
+
+def db_stats(db_path):
+    """DB 하나의 특징점/매칭/검증 통계 (dict)"""
+    with connect_readonly(db_path) as conn:
+        num_images = (_fetch(conn, DB_STATS_SQL["num_images"]) or (0,))[0]
+        kp_images, kp_mean, kp_min, kp_max, kp_total = _fetch(conn, DB_STATS_SQL["keypoints"]) or (0, None, None, None, None)
+        kp_median = (_fetch(conn, DB_STATS_SQL["keypoint_median"]) or (None,))[0]
+        num_pairs, num_match_pairs, num_matches = _fetch(conn, DB_STATS_SQL["matches"]) or (0, 0, None)
+        inlier_pairs, inlier_matches, inlier_mean = _fetch(conn, DB_STATS_SQL["two_view_geometries"]) or (0, None, None)
+    conn.close()
+
+    max_pairs = num_images * (num_images - 1) / 2
+    return {
+        "db_path": str(db_path),
+        "num_images": num_images,
+        "keypoint_images": kp_images,
+        "keypoint_total": kp_total or 0,
+        "keypoint_avg": kp_mean or 0.0,
+        "keypoint_median": kp_median or 0.0,
+        "keypoint_min": kp_min or 0,
+        "keypoint_max": kp_max or 0,
+        "match_pairs": num_pairs,
+        "match_pairs_nonempty": num_match_pairs,
+        "match_total": num_matches or 0,
+        "inlier_pairs": inlier_pairs,
+        "inlier_total": inlier_matches or 0,
+        "inlier_avg": inlier_mean or 0.0,
+        # 검증된 이미지 쌍 그래프의 밀도 (1.0 = 모든 쌍이 연결됨)
+        "graph_density": inlier_pairs / max_pairs if max_pairs > 0 else 0.0,
+    }
+
+
+def image_stats(db_path):
+    """이미지별 특징점 수, 검증된 이웃 이미지 수(degree), inlier 매칭 수 (dict 목록)"""
+    with connect_readonly(db_path) as conn:
+        try:
+            rows = conn.execute(IMAGE_STATS_SQL).fetchall()
+        except sqlite3.OperationalError:
+            rows = []
+    conn.close()
+
+    columns = ["image_id", "name", "keypoints", "verified_pairs", "inlier_matches"]
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def db_stats_many(db_paths, max_workers=8):
+    """여러 스윕 DB의 통계를 병렬 계산 (입력 순서 유지)"""
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(db_stats, db_paths))
@@ -0,0 +1,163 @@
+import os
+import json
+import pathlib
+import numpy as np
+
+# ✅ NeRF 학습용 데이터셋 폴더 (np.savez 하나 대신 이미지를 읽는 대로 바로 기록)
+#   index.json          : 이미지 수 / H, W, C / focal / 이미지 이름 / shard 목록
+#                         (writer 시작 시 삭제하고 마지막에 기록 → 있으면 완성된 데이터셋)
+#   images_00000.npy ... : shard_size장씩 나눈 (n, H, W, C) 이미지 (np.load(mmap_mode="r")로 바로 열림)
+#   poses.npy           : (N, 4, 4) camera-to-world
+INDEX_NAME = "index.json"
+POSES_NAME = "poses.npy"
+DEFAULT_SHARD_SIZE = 256
+
+
+def _shard_name(k):
+    return f"images_{k:05d}.npy"
+
+
+class DatasetWriter:
+    """이미지를 한 장씩 shard(.npy memmap)에 바로 기록 (전체 이미지를 메모리에 모으지 않음)
+
+    with DatasetWriter(path, num_images, (H, W, C)) as writer:
+        writer.add(image, pose, name)
+        writer.meta["focal"] = focal
+    """
+
+    def __init__(self, path, num_images, image_shape, shard_size=DEFAULT_SHARD_SIZE, dtype=np.uint8):
+        self.path = pathlib.Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.num_images = num_images
+        self.image_shape = tuple(image_shape)
+        self.shard_size = shard_size
+        self.dtype = np.dtype(dtype)
+        self.poses = np.zeros((num_images, 4, 4), dtype=np.float32)
+        self.names = []
+        self.meta = {}
+        self.count = 0
+        self._shard = None
+        self._shards = []
+
+        # 이전 실행의 index/poses를 먼저 지움 (shard를 덮어쓰는 도중 중단되면 이전 index가 새 데이터를 가리키게 됨)
+        for name in (INDEX_NAME, POSES_NAME):
+            (self.path / name).unlink(missing_ok=True)
+
+    def _open_shard(self):
+        k = len(self._shards)
+        size = min(self.shard_size, self.num_images - k * self.shard_size)
+        name = _shard_name(k)
+        self._shard = np.lib.format.open_memmap(str(self.path / name), mode="w+", dtype=self.dtype,
+                                                shape=(size,) + self.image_shape)
+        self._shards.append({"file": name, "start": k * self.shard_size, "count": size})
+
+    def _close_shard(self):
+        if self._shard is not None:
+            self._shard.flush()
+            self._shard = None
+
+    def add(self, image, pose=None, name=None):
+        if self.count >= self.num_images:
+            raise IndexError(f"Dataset already has {self.num_images} images")
+        image = np.asarray(image)
+        if image.shape != self.image_shape:
+            raise ValueError(f"Image {name or self.count}: shape {image.shape} differs from {self.image_shape}")
+
+        if self._shard is None:
+            self._open_shard()
+        self._shard[self.count - self._shards[-1]["start"]] = image
+        if pose is not None:
+            self.poses[self.count] = pose
+        self.names.append(name if name is not None else str(self.count))
+        self.count += 1
+        if self.count == self._shards[-1]["start"] + self._shards[-1]["count"]:
+            self._close_shard()
+
+    def close(self):
+        """poses.npy + index.json 기록 (임시 파일에 쓴 뒤 교체), 이전 실행의 남은 shard 삭제"""
+        self._close_shard()
+        if self.count != self.num_images:
+            raise ValueError(f"Expected {self.num_images} images, got {self.count}")
+
+        np.save(self.path / POSES_NAME, self.poses)
+        height, width = self.image_shape[:2]
+        index = {
+            "num_images": self.count,
+            "height": height,
+            "width": width,
+            "channels": self.image_shape[2] if len(self.image_shape) > 2 else 1,
+            "dtype": self.dtype.str,
+            "shard_size": self.shard_size,
+            "shards": self._shards,
+            "poses": POSES_NAME,
+            "names": self.names,
+            **self.meta,
+        }
+        tmp_path = self.path / (INDEX_NAME + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(index, f, indent=1, default=float)
+        os.replace(tmp_path, self.path / INDEX_NAME)
+
+        current = {shard["file"] for shard in self._shards}
+        for stale in self.path.glob("images_*.npy"):
+            if stale.name not in current:
+                stale.unlink()
+        return index
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._close_shard()
+
+
+class Dataset:
+    """DatasetWriter로 만든 폴더를 memmap으로 열기 (이미지는 인덱싱할 때만 디스크에서 읽음)
+
+    data = Dataset("llff_data"); data[3], data[[1, 5, 9]], data.poses, data.focal, data.height, data.width
+    """
+
+    def __init__(self, path, mmap_mode="r"):
+        self.path = pathlib.Path(path)
+        with open(self.path / INDEX_NAME) as f:
+            self.index = json.load(f)
+        self.shards = [np.load(self.path / shard["file"], mmap_mode=mmap_mode) for shard in self.index["shards"]]
+        self.dtype = np.dtype(self.index["dtype"])
+        self.image_shape = (self.shards[0].shape[1:] if self.shards
+                            else (self.index["height"], self.index["width"], self.index["channels"]))
+        self.starts = np.array([shard["start"] for shard in self.index["shards"]], dtype=np.int64)
+        self.poses = np.load(self.path / self.index["poses"])
+        self.names = self.index["names"]
+        self.height, self.width = self.index["height"], self.index["width"]
+        self.focal = self.index.get("focal")
+
+    def __len__(self):
+        return self.index["num_images"]
+
+    def _locate(self, i):
+        if not -len(self) <= i < len(self):
+            raise IndexError(f"Image index {i} out of range for {len(self)} images")
+        i %= len(self)
+        k = int(np.searchsorted(self.starts, i, side="right")) - 1
+        return k, i - self.starts[k]
+
+    def __getitem__(self, indices):
+        if isinstance(indices, slice):
+            indices = range(*indices.indices(len(self)))
+        if np.isscalar(indices):
+            k, j = self._locate(int(indices))
+            return self.shards[k][j]
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+        batch = np.empty((len(indices),) + tuple(self.image_shape), dtype=self.dtype)
+        for n, i in enumerate(indices):
+            k, j = self._locate(int(i))
+            batch[n] = self.shards[k][j]
+        return batch
+
+    @property
+    def images(self):
+        """모든 이미지를 하나의 배열로 (shard가 하나면 복사 없이 memmap 그대로)"""
+        return self.shards[0] if len(self.shards) == 1 else self[:]
@@ -0,0 +1,114 @@
+import os
+import json
+import pathlib
+import hashlib
+import sqlite3
+import concurrent.futures
+
+# ✅ COLMAP이 읽을 수 있는 이미지 확장자
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff"}
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS features (
+    image_hash TEXT NOT NULL,
+    options_key TEXT NOT NULL,
+    kp_rows INTEGER NOT NULL,
+    kp_cols INTEGER NOT NULL,
+    keypoints BLOB,
+    desc_rows INTEGER NOT NULL,
+    desc_cols INTEGER NOT NULL,
+    descriptors BLOB,
+    PRIMARY KEY (image_hash, options_key)
+);
+"""
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """파일 내용 해시 (이미지 이름이 아닌 내용 기준으로 캐시)"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def image_hashes(image_dir, max_workers=8):
+    """{COLMAP 이미지 이름(image_dir 기준 상대 경로): 내용 해시}"""
+    image_dir = pathlib.Path(image_dir)
+    paths = sorted(p for p in image_dir.rglob("*") if p.suffix.lower() in IMAGE_EXTENSIONS)
+    names = [p.relative_to(image_dir).as_posix() for p in paths]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(names, executor.map(file_hash, paths)))
+
+
+def options_key(**options):
+    """추출 옵션을 정렬된 JSON으로 직렬화한 키"""
+    return json.dumps(options, sort_keys=True)
+
+
+class FeatureCache:
+    """(이미지 내용 해시, 추출 옵션) → keypoints/descriptors blob 캐시 (SQLite)
+
+    COLMAP DB와 같은 blob 형식을 그대로 저장하므로 디코딩 없이 DB 간 복사만 합니다.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with sqlite3.connect(self.path, timeout=600) as conn:
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.executescript(CACHE_SCHEMA)
+
+    def missing(self, hashes, key):
+        """캐시에 없는 이미지 이름 목록"""
+        with sqlite3.connect(self.path, timeout=600) as conn:
+            cached = {row[0] for row in conn.execute("SELECT image_hash FROM features WHERE options_key = ?;", (key,))}
+        return [name for name, digest in hashes.items() if digest not in cached]
+
+    def _attach(self, db_path, hashes):
+        conn = sqlite3.connect(str(db_path), timeout=600)
+        conn.execute("ATTACH DATABASE ? AS cache;", (self.path,))
+        conn.execute("CREATE TEMP TABLE image_hashes (name TEXT PRIMARY KEY, image_hash TEXT NOT NULL);")
+        conn.executemany("INSERT INTO temp.image_hashes VALUES (?, ?);", hashes.items())
+        return conn
+
+    def load_into(self, db_path, hashes, key):
+        """캐시된 특징점을 COLMAP DB(images 테이블이 채워진 상태)에 삽입, 삽입한 이미지 수 반환"""
+        conn = self._attach(db_path, hashes)
+        try:
+            with conn:
+                cur = conn.execute("""
+                    INSERT OR REPLACE INTO keypoints (image_id, rows, cols, data)
+                    SELECT i.image_id, f.kp_rows, f.kp_cols, f.keypoints
+                    FROM images i
+                    JOIN temp.image_hashes h ON h.name = i.name
+                    JOIN cache.features f ON f.image_hash = h.image_hash AND f.options_key = ?;""", (key,))
+                inserted = cur.rowcount
+                conn.execute("""
+                    INSERT OR REPLACE INTO descriptors (image_id, rows, cols, data)
+                    SELECT i.image_id, f.desc_rows, f.desc_cols, f.descriptors
+                    FROM images i
+                    JOIN temp.image_hashes h ON h.name = i.name
+                    JOIN cache.features f ON f.image_hash = h.image_hash AND f.options_key = ?;""", (key,))
+        finally:
+            conn.close()
+        return inserted
+
+    def store_from(self, db_path, hashes, key, names=None):
+        """COLMAP DB에서 추출된 특징점을 캐시에 저장 (names가 없으면 전체)"""
+        if names is not None:
+            hashes = {name: hashes[name] for name in names}
+        conn = self._attach(db_path, hashes)
+        try:
+            with conn:
+                cur = conn.execute("""
+                    INSERT OR REPLACE INTO cache.features
+                    SELECT h.image_hash, ?, k.rows, k.cols, k.data, d.rows, d.cols, d.data
+                    FROM images i
+                    JOIN temp.image_hashes h ON h.name = i.name
+                    JOIN keypoints k ON k.image_id = i.image_id
+                    JOIN descriptors d ON d.image_id = i.image_id;""", (key,))
+                stored = cur.rowcount
+        finally:
+            conn.close()
+        return stored
@@ -0,0 +1,108 @@
+import os
+import json
+import pathlib
+import hashlib
+import concurrent.futures
+import cv2
+import numpy as np
+from utils.video import resize_to_level
+
+# ✅ 디코딩된 (N, H, W, C) uint8 배열 캐시 폴더 (.npy, mmap으로 바로 열림)
+DEFAULT_CACHE_DIR = pathlib.Path("image_cache")
+
+
+def cache_key(paths, spec=1, flags=cv2.IMREAD_COLOR):
+    """파일 목록 + 각 파일의 (mtime, 크기) + 축소 설정으로 만든 캐시 키 (파일이 바뀌면 키도 바뀜)"""
+    entries = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            entries.append([os.path.abspath(path), stat.st_mtime_ns, stat.st_size])
+        except FileNotFoundError:
+            entries.append([os.path.abspath(path), None, None])
+    payload = json.dumps({"files": entries, "spec": spec, "flags": flags}, sort_keys=True, default=list)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def _decode(path, spec, flags):
+    image = cv2.imread(str(path), flags)
+    if image is None:
+        return None
+    image = resize_to_level(image, spec)
+    return image[..., None] if image.ndim == 2 else image
+
+
+def load_images(paths, spec=1, flags=cv2.IMREAD_COLOR, num_workers=8, output_path=None):
+    """이미지를 스레드 풀로 디코딩하여 미리 할당한 (N, H, W, C) uint8 배열에 바로 채움
+
+    spec: 축소 배율 또는 (W, H) (utils.video.resize_to_level), output_path: 지정하면 .npy memmap에 직접 기록
+    반환: (배열, 읽지 못한 파일 목록) — 실패한 파일은 배열에서 빠짐
+    """
+    paths = [str(p) for p in paths]
+    if not paths:
+        return np.zeros((0, 0, 0, 3), dtype=np.uint8), []
+
+    # 첫 이미지로 크기를 정하고 배열을 한 번만 할당 (list append + np.array 복사 없음)
+    first_index, first = None, None
+    for first_index, path in enumerate(paths):
+        first = _decode(path, spec, flags)
+        if first is not None:
+            break
+    if first is None:
+        raise FileNotFoundError(f"None of the {len(paths)} images could be read (e.g. {paths[0]})")
+    shape = (len(paths),) + first.shape
+    if output_path is not None:
+        images = np.lib.format.open_memmap(str(output_path), mode="w+", dtype=np.uint8, shape=shape)
+    else:
+        images = np.empty(shape, dtype=np.uint8)
+    images[first_index] = first
+
+    def fill(i):
+        image = _decode(paths[i], spec, flags)
+        if image is None:
+            return False
+        if image.shape != first.shape:
+            raise ValueError(f"{paths[i]}: shape {image.shape} differs from {first.shape} ({paths[first_index]})")
+        images[i] = image  # cv2 디코딩은 GIL을 놓으므로 스레드로 병렬 처리됨
+        return True
+
+    ok = [False] * len(paths)
+    ok[first_index] = True
+    rest = list(range(first_index + 1, len(paths)))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
+        for i, loaded in zip(rest, executor.map(fill, rest)):
+            ok[i] = loaded
+
+    failed = [p for p, loaded in zip(paths, ok) if not loaded]
+    for path in failed:
+        print(f"fail to load: {path}")
+    if failed:
+        images = np.ascontiguousarray(images[np.array(ok)])
+    return images, failed
+
+
+def cached_images(paths, spec=1, flags=cv2.IMREAD_COLOR, cache_dir=DEFAULT_CACHE_DIR, num_workers=8, mmap_mode="r"):
+    """load_images + .npy 캐시: 파일 목록/mtime/설정이 같으면 디코딩 없이 memmap으로 바로 반환
+
+    모든 이미지를 읽은 경우에만 캐시를 남김 (임시 파일에 쓰고 os.replace로 교체)
+    """
+    paths = [str(p) for p in paths]
+    cache_dir = pathlib.Path(cache_dir)
+    cache_path = cache_dir / f"{cache_key(paths, spec, flags)}.npy"
+    if cache_path.exists():
+        return np.load(cache_path, mmap_mode=mmap_mode)
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(f"{cache_path.stem}.{os.getpid()}.tmp.npy")
+    try:
+        images, failed = load_images(paths, spec, flags, num_workers, output_path=tmp_path)
+        if failed:
+            return images
+        images.flush()
+        del images
+        os.replace(tmp_path, cache_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    print(f"💾 Cached {len(paths)} decoded images → {cache_path}")
+    return np.load(cache_path, mmap_mode=mmap_mode)
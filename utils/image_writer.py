@@ -0,0 +1,119 @@
+import os
+import json
+import hashlib
+import threading
+import concurrent.futures
+import cv2
+import numpy as np
+
+# ✅ 코덱별 확장자 및 기본 압축 수준
+#   png : 0~9 (zlib 압축 수준, 1이면 빠른 저장)
+#   jpg : 0~100 (JPEG 품질)
+#   npy : 압축 없이 원본 배열 저장 (가장 빠름)
+CODEC_EXTENSIONS = {"png": ".png", "jpg": ".jpg", "npy": ".npy"}
+DEFAULT_LEVELS = {"png": 1, "jpg": 95, "npy": None}
+
+MANIFEST_NAME = ".frames_manifest.json"
+
+
+def encode_params(codec, level=None):
+    """cv2.imwrite에 전달할 압축 옵션"""
+    if codec not in CODEC_EXTENSIONS:
+        raise ValueError(f"Unknown codec: {codec} (choose from {tuple(CODEC_EXTENSIONS)})")
+    level = DEFAULT_LEVELS[codec] if level is None else level
+    if codec == "png":
+        return [cv2.IMWRITE_PNG_COMPRESSION, int(level)]
+    if codec == "jpg":
+        return [cv2.IMWRITE_JPEG_QUALITY, int(level)]
+    return []
+
+
+def load_manifest(folder):
+    """이전 실행에서 기록한 {파일명: 해시} (없으면 빈 dict)"""
+    path = os.path.join(folder, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(folder, records, prune=True):
+    """이번 실행의 {파일명: 해시}를 기록하고, prune이면 이전 실행에만 있던 파일 삭제"""
+    if prune:
+        for name in sorted(set(load_manifest(folder)) - set(records)):
+            stale = os.path.join(folder, name)
+            if os.path.exists(stale):
+                os.remove(stale)
+                print(f"🗑️ Removed stale output: {stale}")
+
+    with open(os.path.join(folder, MANIFEST_NAME), "w") as f:
+        json.dump(dict(sorted(records.items())), f, indent=1)
+
+
+class ImageWriterPool:
+    """디코딩과 인코딩을 분리하는 비동기 이미지 저장 풀
+
+    max_pending개 이상의 이미지가 대기 중이면 submit()이 대기하므로 메모리 사용량이 제한됩니다.
+    같은 내용(해시)의 파일이 이미 있으면 인코딩을 건너뜁니다.
+    """
+
+    def __init__(self, codec="png", level=None, max_workers=4, max_pending=16, manifests=None):
+        self.codec = codec
+        self.extension = CODEC_EXTENSIONS[codec]
+        self.params = encode_params(codec, level)
+        self.manifests = manifests if manifests is not None else {}
+        self.records = {}
+        self.written = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        self._futures = []
+
+    def _digest(self, image):
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"{self.codec}{self.params}{image.shape}{image.dtype}".encode())
+        h.update(np.ascontiguousarray(image).data)
+        return h.hexdigest()
+
+    def _write(self, folder, name, image):
+        try:
+            path = os.path.join(folder, name)
+            digest = self._digest(image)
+            unchanged = os.path.exists(path) and self.manifests.get(folder, {}).get(name) == digest
+
+            if not unchanged:
+                if self.codec == "npy":
+                    np.save(path, image)
+                elif not cv2.imwrite(path, image, self.params):
+                    raise IOError(f"cv2.imwrite failed: {path}")
+
+            with self._lock:
+                self.records.setdefault(folder, {})[name] = digest
+                if unchanged:
+                    self.skipped += 1
+                else:
+                    self.written += 1
+            return path
+        finally:
+            self._slots.release()
+
+    def submit(self, folder, stem, image):
+        """folder/stem.<ext>로 저장 예약 (image는 저장이 끝날 때까지 수정하지 말 것)"""
+        self._slots.acquire()
+        future = self._executor.submit(self._write, folder, stem + self.extension, image)
+        self._futures.append(future)
+        return future
+
+    def close(self):
+        """대기 중인 저장이 모두 끝날 때까지 기다림 (실패한 저장이 있으면 예외 발생)"""
+        self._executor.shutdown(wait=True)
+        for future in self._futures:
+            future.result()
+        self._futures.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
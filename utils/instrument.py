@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import pathlib
+import resource
+import functools
+import threading
+import contextlib
+
+# ✅ 모든 단계 스크립트가 같은 파일에 기록 (실행 간 비교용)
+TRACE_PATH = pathlib.Path("log") / "pipeline_trace.jsonl"
+CHROME_TRACE_PATH = pathlib.Path("log") / "pipeline_trace.json"
+
+# ✅ 한 번의 실행(run)을 묶는 id: 자식 프로세스는 환경 변수로 같은 id를 물려받음
+RUN_ID = os.environ.setdefault("PIPELINE_RUN_ID", time.strftime("%Y%m%d-%H%M%S"))
+
+# ✅ RSS 샘플링 간격 (초)
+RSS_INTERVAL = 0.05
+
+_lock = threading.Lock()
+_page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss():
+    """현재 프로세스 RSS (bytes), /proc이 없으면 최대 RSS로 대체"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _page_size
+    except (OSError, IndexError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _cpu_seconds(who=resource.RUSAGE_SELF):
+    usage = resource.getrusage(who)
+    return usage.ru_utime + usage.ru_stime
+
+
+def record(event, path=None):
+    """이벤트 한 줄을 JSONL로 추가 (여러 프로세스가 동시에 써도 줄 단위로 기록)"""
+    path = pathlib.Path(path or TRACE_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    event = {"run": RUN_ID, "pid": os.getpid(), "tid": threading.get_ident(), **event}
+    line = json.dumps(event, default=str) + "\n"
+    with _lock, open(path, "a") as f:
+        f.write(line)
+    return event
+
+
+class RssSampler(threading.Thread):
+    """구간 동안 RSS를 주기적으로 샘플링하여 최대값 기록"""
+
+    def __init__(self, interval):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = current_rss()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.peak = max(self.peak, current_rss())
+        return self.peak
+
+
+@contextlib.contextmanager
+def stage(name, path=None, sample_rss=True, **meta):
+    """with stage("feature.extract", config=i) as info: ... → wall/CPU 시간, 최대 RSS를 기록
+
+    CPU 시간은 구간 안에서 종료(join)된 자식 프로세스(디코딩/기록 worker 등)를 포함하고,
+    RSS는 현재 프로세스만 측정합니다. info["metrics"]에 넣은 값도 같은 이벤트에 함께 기록됩니다.
+    """
+    info = {"metrics": {}}
+    sampler = RssSampler(RSS_INTERVAL) if sample_rss else None
+    if sampler:
+        sampler.start()
+    start_rss = current_rss()
+    start_wall, start_cpu, start_ts = time.perf_counter(), _cpu_seconds(), time.time()
+    start_child_cpu = _cpu_seconds(resource.RUSAGE_CHILDREN)
+    status = "ok"
+    try:
+        yield info
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        wall, cpu = time.perf_counter() - start_wall, _cpu_seconds() - start_cpu
+        child_cpu = _cpu_seconds(resource.RUSAGE_CHILDREN) - start_child_cpu
+        peak = sampler.stop() if sampler else current_rss()
+        record({
+            "type": "stage",
+            "name": name,
+            "status": status,
+            "start": start_ts,
+            "wall_time": wall,
+            "cpu_time": cpu + child_cpu,
+            "cpu_time_children": child_cpu,
+            "rss_start": start_rss,
+            "rss_peak": peak,
+            "meta": meta,
+            "metrics": info["metrics"],
+        }, path)
+
+
+def timed(name=None, **meta):
+    """함수 전체를 stage로 감싸는 데코레이터 (@timed() 또는 @timed("이름"))"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name or f"{fn.__module__}.{fn.__qualname__}", **meta):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def log_metrics(name, path=None, **metrics):
+    """config별 결과 지표 기록"""
+    return record({"type": "metrics", "name": name, "start": time.time(), "metrics": metrics}, path)
+
+
+def reconstruction_metrics(reconstruction):
+    """pycolmap.Reconstruction 품질 지표 (등록 이미지 수, 3D 점 수, 평균 재투영 오차, 평균 track 길이)"""
+    if reconstruction is None:
+        return {"num_reg_images": 0, "num_points3D": 0, "mean_reprojection_error": float("nan"),
+                "mean_track_length": 0.0, "mean_observations_per_image": 0.0}
+    return {
+        "num_reg_images": reconstruction.num_reg_images(),
+        "num_points3D": reconstruction.num_points3D(),
+        "mean_reprojection_error": reconstruction.compute_mean_reprojection_error(),
+        "mean_track_length": reconstruction.compute_mean_track_length(),
+        "mean_observations_per_image": reconstruction.compute_mean_observations_per_reg_image(),
+    }
+
+
+def load_events(path=None, run=None):
+    """JSONL 이벤트 목록 (run을 지정하면 해당 실행만)"""
+    path = pathlib.Path(path or TRACE_PATH)
+    if not path.exists():
+        return []
+    with open(path) as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    return [e for e in events if run is None or e["run"] == run]
+
+
+def export_chrome_trace(path=None, output_path=None, run=None):
+    """JSONL 이벤트 → Chrome trace 형식 (chrome://tracing, Perfetto에서 열기)"""
+    events = load_events(path, run)
+    trace = []
+    for e in events:
+        base = {"name": e["name"], "pid": e["pid"], "tid": e["tid"], "ts": e["start"] * 1e6, "cat": e["run"]}
+        if e["type"] == "stage":
+            trace.append({**base, "ph": "X", "dur": e["wall_time"] * 1e6,
+                          "args": {"cpu_time": e["cpu_time"], "rss_peak_mb": e["rss_peak"] / 2 ** 20,
+                                   "status": e["status"], **e["meta"], **e["metrics"]}})
+            trace.append({**base, "ph": "C", "name": "rss_peak_mb", "ts": (e["start"] + e["wall_time"]) * 1e6,
+                          "args": {"rss_peak_mb": e["rss_peak"] / 2 ** 20}})
+        else:
+            trace.append({**base, "ph": "i", "s": "p", "args": e["metrics"]})
+
+    output_path = pathlib.Path(output_path or CHROME_TRACE_PATH)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+    return output_path
+
+
+def print_summary(path=None, run=None):
+    """단계별 총 시간 / 최대 RSS 요약 출력"""
+    totals = {}
+    for e in load_events(path, run or RUN_ID):
+        if e["type"] != "stage":
+            continue
+        t = totals.setdefault(e["name"], {"count": 0, "wall_time": 0.0, "cpu_time": 0.0, "rss_peak": 0})
+        t["count"] += 1
+        t["wall_time"] += e["wall_time"]
+        t["cpu_time"] += e["cpu_time"]
+        t["rss_peak"] = max(t["rss_peak"], e["rss_peak"])
+
+    print(f"⏱️ Run {run or RUN_ID} (cpu: 자식 프로세스 포함, peak RSS: 부모 프로세스만)")
+    for name, t in sorted(totals.items(), key=lambda kv: -kv[1]["wall_time"]):
+        print(f"   {name:<32} x{t['count']:<3} wall {t['wall_time']:8.1f}s, cpu {t['cpu_time']:8.1f}s, "
+              f"peak RSS {t['rss_peak'] / 2 ** 20:8.1f} MB")
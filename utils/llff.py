@@ -0,0 +1,112 @@
+import os
+import numpy as np
+from utils.colmap_model import read_model
+from utils.pose import cam_to_world, quat_to_rotmat
+
+# ✅ LLFF poses_bounds.npy: 이미지마다 [3x5 (camera-to-world 3x4 + [H, W, focal]) 를 펼친 15개, near, far] → (N, 17)
+#   회전 열 순서는 LLFF 규약 [아래, 오른쪽, 뒤] (COLMAP [오른쪽, 아래, 앞]에서 변환)
+#   near/far는 각 이미지가 관측한 3D 점 깊이의 0.1 / 99.9 백분위수 (LLFF imgs2poses와 동일)
+DEFAULT_PERCENTILES = (0.1, 99.9)
+
+
+def observation_depths(model):
+    """모든 (이미지, 3D 점) 관측의 카메라 좌표계 깊이를 track 반복 없이 한 번에 계산
+
+    반환: (이미지 행 번호 배열, 깊이 배열) — 카메라 앞(깊이 > 0)에 있는 관측만
+    """
+    images, points = model["images"], model["points3D"]
+    if "tracks" not in points:
+        raise ValueError("observation_depths needs tracks: read_model(path, with_tracks=True)")
+
+    # image_id → images 배열 행 번호
+    lookup = np.full(int(images["image_id"].max(initial=0)) + 1, -1, dtype=np.int64)
+    lookup[images["image_id"]] = np.arange(len(images["image_id"]))
+    rows = lookup[points["tracks"]["image_id"]]
+    point_index = np.repeat(np.arange(len(points["xyz"])), points["track_length"])
+    valid = rows >= 0
+    rows, point_index = rows[valid], point_index[valid]
+
+    # 깊이 = R[2] · X + t[2] (회전 행렬 세 번째 행만 사용)
+    R_z = quat_to_rotmat(images["quat"], order="wxyz")[:, 2, :]
+    depths = np.einsum("ij,ij->i", R_z[rows], points["xyz"][point_index]) + images["translation"][rows, 2]
+    in_front = depths > 0
+    return rows[in_front], depths[in_front]
+
+
+def segment_percentiles(groups, values, num_groups, percentiles):
+    """그룹별 백분위수 (np.percentile의 linear 보간과 동일), 정렬 한 번으로 모든 그룹을 처리
+
+    반환: (num_groups, len(percentiles)) — 값이 없는 그룹은 NaN
+    """
+    order = np.lexsort((values, groups))
+    values = values[order]
+    counts = np.bincount(groups, minlength=num_groups)
+    starts = np.cumsum(counts) - counts
+
+    result = np.full((num_groups, len(percentiles)), np.nan)
+    has_values = counts > 0
+    starts, counts = starts[has_values], counts[has_values]
+    for k, q in enumerate(percentiles):
+        position = starts + q / 100 * (counts - 1)
+        lo = np.floor(position).astype(np.int64)
+        hi = np.minimum(lo + 1, starts + counts - 1)
+        frac = position - lo
+        result[has_values, k] = values[lo] + (values[hi] - values[lo]) * frac
+    return result
+
+
+def depth_bounds(model, percentiles=DEFAULT_PERCENTILES):
+    """이미지별 (near, far) — 관측한 점이 없는 이미지는 전체 관측의 백분위수 사용"""
+    rows, depths = observation_depths(model)
+    num_images = len(model["images"]["image_id"])
+    bounds = segment_percentiles(rows, depths, num_images, percentiles)
+    missing = np.isnan(bounds).any(axis=1)
+    if missing.any():
+        if len(depths) == 0:
+            raise ValueError("No 3D point lies in front of any camera; cannot compute near/far bounds")
+        bounds[missing] = np.percentile(depths, percentiles)
+    return bounds
+
+
+def poses_bounds(model, percentiles=DEFAULT_PERCENTILES):
+    """sparse 모델 → (이름 순 이미지 이름 목록, LLFF (N, 17) poses_bounds 배열)"""
+    images, cameras = model["images"], model["cameras"]
+    order = np.argsort(np.array(images["name"]), kind="stable")
+    names = [images["name"][i] for i in order]
+
+    c2w = cam_to_world(images["quat"], images["translation"], order="wxyz")[order, :3, :4]
+    # 열 순서 [오른쪽, 아래, 앞] → [아래, 오른쪽, 뒤]
+    c2w = np.concatenate([c2w[:, :, 1:2], c2w[:, :, 0:1], -c2w[:, :, 2:3], c2w[:, :, 3:4]], axis=2)
+
+    camera_lookup = np.zeros(int(cameras["camera_id"].max()) + 1, dtype=np.int64)
+    camera_lookup[cameras["camera_id"]] = np.arange(len(cameras))
+    camera_rows = camera_lookup[images["camera_id"][order]]
+    hwf = np.stack([cameras["height"][camera_rows].astype(np.float64), cameras["width"][camera_rows].astype(np.float64),
+                    cameras["params"][camera_rows, 0]], axis=1)[:, :, None]
+
+    bounds = depth_bounds(model, percentiles)[order]
+    poses = np.concatenate([c2w, hwf], axis=2).reshape(len(names), 15)
+    return names, np.concatenate([poses, bounds], axis=1)
+
+
+def write_poses_bounds(model_path, output_path, percentiles=DEFAULT_PERCENTILES):
+    """sparse 모델 폴더 → LLFF poses_bounds.npy 저장, (이미지 이름 목록, 배열) 반환"""
+    model = read_model(model_path, with_tracks=True)
+    names, array = poses_bounds(model, percentiles)
+    os.makedirs(os.path.dirname(str(output_path)) or ".", exist_ok=True)
+    np.save(output_path, array)
+    print(f"✅ Saved {output_path} ({len(names)} images, near {array[:, 15].min():.3f} / far {array[:, 16].max():.3f})")
+    return names, array
+
+
+def load_poses_bounds(path):
+    """LLFF poses_bounds.npy → (OpenGL camera-to-world (N, 4, 4), hwf (N, 3), bounds (N, 2))
+
+    NeRF load_llff_data와 같이 [아래, 오른쪽, 뒤] → [오른쪽, 위, 뒤] 로 변환
+    """
+    array = np.load(path)
+    poses = array[:, :15].reshape(-1, 3, 5)
+    c2w = np.zeros((len(array), 4, 4))
+    c2w[:, :3, :] = np.concatenate([poses[:, :, 1:2], -poses[:, :, 0:1], poses[:, :, 2:4]], axis=2)
+    c2w[:, 3, 3] = 1.0
+    return c2w, poses[:, :, 4], array[:, 15:17]
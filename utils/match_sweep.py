@@ -0,0 +1,107 @@
+import concurrent.futures
+import numpy as np
+import pycolmap
+from utils.colmap_db import ColmapDatabase
+from utils.colmap_stats import db_stats
+from utils.matcher import match_descriptors
+
+# ✅ 가장 느슨한 ratio로 한 번 계산한 후보 매칭 + 각 매칭의 ratio 값
+RAW_SCHEMA = """
+CREATE TABLE IF NOT EXISTS raw_matches (
+    pair_id INTEGER PRIMARY KEY NOT NULL,
+    rows INTEGER NOT NULL,
+    data BLOB,
+    ratios BLOB
+);
+"""
+
+
+def overlay_table(index):
+    """config별 검증 결과를 보관하는 테이블 이름"""
+    return f"two_view_geometries_cfg{index}"
+
+
+def compute_raw_matches(db_path, pairs, max_ratio, max_distance=0.7, cross_check=True, num_threads=8):
+    """이름 쌍 목록을 가장 느슨한 max_ratio로 한 번만 매칭하여 raw_matches에 저장"""
+    with ColmapDatabase(db_path, readonly=False) as db:
+        db.conn.executescript(RAW_SCHEMA)
+        ids = {name: image_id for image_id, name in db.images().items()}
+        pairs = [(ids[a], ids[b]) for a, b in pairs if a in ids and b in ids]
+        descriptors = db.descriptors(sorted({i for pair in pairs for i in pair}))
+
+        def run(pair):
+            a, b = pair
+            return pair, match_descriptors(descriptors[a], descriptors[b], max_ratio, max_distance, cross_check)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=num_threads) as executor:
+            for (a, b), (matches, ratios) in executor.map(run, pairs):
+                if a > b:
+                    matches = matches[:, ::-1]
+                db.conn.execute("INSERT OR REPLACE INTO raw_matches VALUES (?, ?, ?, ?);",
+                                (db.pair_id(a, b), len(matches), np.ascontiguousarray(matches).tobytes(), ratios.tobytes()))
+        db.conn.commit()
+
+    print(f"🔗 Raw matches computed once for {len(pairs)} pairs (max_ratio={max_ratio})")
+    return len(pairs)
+
+
+def filter_matches(db_path, max_ratio):
+    """raw_matches에서 ratio <= max_ratio인 매칭만 matches 테이블에 기록 (기존 matches/검증 결과는 삭제)"""
+    with ColmapDatabase(db_path, readonly=False) as db:
+        rows = db.conn.execute("SELECT pair_id, rows, data, ratios FROM raw_matches ORDER BY pair_id;").fetchall()
+        counts = np.array([r[1] for r in rows], dtype=np.int64)
+        matches = np.frombuffer(b"".join(r[2] for r in rows if r[1] > 0), dtype=np.uint32).reshape(-1, 2)
+        ratios = np.frombuffer(b"".join(r[3] for r in rows if r[1] > 0), dtype=np.float32)
+
+        # ✅ 모든 pair를 한 번에 필터링한 뒤 pair별 구간으로 다시 나눔
+        keep = ratios <= max_ratio
+        pair_index = np.repeat(np.arange(len(rows)), counts)
+        new_counts = np.bincount(pair_index[keep], minlength=len(rows))
+        kept = matches[keep]
+        offsets = np.concatenate([[0], np.cumsum(new_counts)])
+
+        with db.conn:
+            db.conn.execute("DELETE FROM matches;")
+            db.conn.execute("DELETE FROM two_view_geometries;")
+            db.conn.executemany(
+                "INSERT INTO matches (pair_id, rows, cols, data) VALUES (?, ?, 2, ?);",
+                ((r[0], int(new_counts[k]), kept[offsets[k]:offsets[k + 1]].tobytes()) for k, r in enumerate(rows)))
+    return int(keep.sum())
+
+
+def store_overlay(db_path, index):
+    """현재 two_view_geometries를 config 전용 테이블로 복사 (keypoint/descriptor는 복사하지 않음)"""
+    with ColmapDatabase(db_path, readonly=False) as db, db.conn:
+        db.conn.execute(f"DROP TABLE IF EXISTS {overlay_table(index)};")
+        db.conn.execute(f"CREATE TABLE {overlay_table(index)} AS SELECT * FROM two_view_geometries;")
+
+
+def activate_config(db_path, index, max_ratio):
+    """config의 matches/two_view_geometries를 기본 테이블로 복원 (sparse 단계에서 그대로 사용)"""
+    filter_matches(db_path, max_ratio)
+    with ColmapDatabase(db_path, readonly=False) as db, db.conn:
+        db.conn.execute(f"INSERT INTO two_view_geometries SELECT * FROM {overlay_table(index)};")
+    print(f"✅ Activated matching config {index} in {db_path}")
+
+
+def run_match_sweep(db_path, pairs, configs, pairs_path, num_threads=8, max_distance=0.7, cross_check=True):
+    """한 번 매칭하고 config마다 필터링 + 기하 검증만 다시 수행
+
+    후보 매칭은 COLMAP SIFT 매처가 아니라 utils.matcher.match_descriptors로 계산하므로
+    매칭 수는 pycolmap.match_* 로 만든 DB와 직접 비교할 수 없습니다.
+    configs: [(index, max_ratio, min_num_inliers), ...]
+    반환: {index: db_stats 결과}
+    """
+    loosest = max(max_ratio for _, max_ratio, _ in configs)
+    compute_raw_matches(db_path, pairs, loosest, max_distance, cross_check, num_threads)
+
+    results = {}
+    for index, max_ratio, min_num_inliers in configs:
+        kept = filter_matches(db_path, max_ratio)
+        options = pycolmap.TwoViewGeometryOptions(min_num_inliers=min_num_inliers)
+        pycolmap.verify_matches(str(db_path), str(pairs_path), options=options)
+        store_overlay(db_path, index)
+        results[index] = db_stats(db_path)
+        print(f"🔍 [{index+1}] max_ratio={max_ratio}, min_inliers={min_num_inliers}: "
+              f"{kept} matches, {results[index]['inlier_pairs']} verified pairs")
+    return results
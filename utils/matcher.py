@@ -0,0 +1,84 @@
+import concurrent.futures
+import numpy as np
+from utils.colmap_db import ColmapDatabase
+
+# ✅ 한 번에 비교할 디스크립터 행 수 (8192 x 8192 유사도 행렬 대신 2048행씩 계산)
+ROW_CHUNK = 2048
+
+
+def _normalize(desc):
+    desc = desc.astype(np.float32)
+    return desc / (np.linalg.norm(desc, axis=1, keepdims=True) + 1e-8)
+
+
+def match_descriptors(desc1, desc2, max_ratio=0.8, max_distance=0.7, cross_check=True):
+    """SIFT 디스크립터 최근접 이웃 매칭 (COLMAP과 같은 각도 거리 기준)
+
+    반환: (matches (M, 2) uint32, ratio (M,) float32 = 최근접 거리 / 두 번째 거리)
+    """
+    if len(desc1) == 0 or len(desc2) < 2:
+        return np.zeros((0, 2), dtype=np.uint32), np.zeros(0, dtype=np.float32)
+
+    a, b = _normalize(desc1), _normalize(desc2)
+    best_idx = np.empty(len(a), dtype=np.int64)
+    best_sim = np.empty(len(a), dtype=np.float32)
+    second_sim = np.empty(len(a), dtype=np.float32)
+    col_best_sim = np.full(len(b), -np.inf, dtype=np.float32)
+    col_best_idx = np.zeros(len(b), dtype=np.int64)
+
+    for start in range(0, len(a), ROW_CHUNK):
+        sim = a[start:start + ROW_CHUNK] @ b.T
+        top2 = np.argpartition(-sim, 1, axis=1)[:, :2]
+        top2_sim = np.take_along_axis(sim, top2, axis=1)
+        swap = top2_sim[:, 1] > top2_sim[:, 0]
+        top2[swap] = top2[swap][:, ::-1]
+        top2_sim[swap] = top2_sim[swap][:, ::-1]
+        best_idx[start:start + len(sim)] = top2[:, 0]
+        best_sim[start:start + len(sim)] = top2_sim[:, 0]
+        second_sim[start:start + len(sim)] = top2_sim[:, 1]
+
+        if cross_check:
+            rows = sim.argmax(axis=0)
+            row_sim = sim[rows, np.arange(sim.shape[1])]
+            better = row_sim > col_best_sim
+            col_best_sim[better] = row_sim[better]
+            col_best_idx[better] = rows[better] + start
+
+    best_dist = np.arccos(np.clip(best_sim, -1.0, 1.0))
+    second_dist = np.arccos(np.clip(second_sim, -1.0, 1.0))
+    ratio = best_dist / np.maximum(second_dist, 1e-8)
+
+    valid = (best_dist <= max_distance) & (ratio <= max_ratio)
+    if cross_check:
+        valid &= col_best_idx[best_idx] == np.arange(len(a))
+
+    idx1 = np.flatnonzero(valid)
+    matches = np.stack([idx1, best_idx[idx1]], axis=1).astype(np.uint32)
+    return matches, ratio[idx1].astype(np.float32)
+
+
+def match_pairs(db_path, pairs, max_ratio=0.8, max_distance=0.7, cross_check=True, num_threads=8, overwrite=False):
+    """이름 쌍 목록을 NumPy로 매칭하여 matches 테이블에 기록 (반환: {pair_id: ratio 배열})
+
+    overwrite=False면 이미 매칭이 있는 pair는 건너뜁니다.
+    """
+    with ColmapDatabase(db_path, readonly=False) as db:
+        ids = {name: image_id for image_id, name in db.images().items()}
+        pairs = [(ids[a], ids[b]) for a, b in pairs if a in ids and b in ids]
+        if not overwrite:
+            existing = set(db.pair_ids().tolist())
+            pairs = [(a, b) for a, b in pairs if db.pair_id(a, b) not in existing]
+        descriptors = db.descriptors(sorted({i for pair in pairs for i in pair}))
+
+        def run(pair):
+            a, b = pair
+            return pair, match_descriptors(descriptors[a], descriptors[b], max_ratio, max_distance, cross_check)
+
+        ratios = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=num_threads) as executor:
+            for (a, b), (matches, ratio) in executor.map(run, pairs):
+                ratios[db.write_matches(a, b, matches)] = ratio
+        db.conn.commit()
+
+    print(f"🔗 Matched {len(ratios)} image pairs with NumPy matcher")
+    return ratios
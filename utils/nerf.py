@@ -0,0 +1,213 @@
+import numpy as np
+import tensorflow as tf
+
+# ✅ 노트북(megumin_nerf_*.ipynb)의 TinyNeRF 구현을 모듈로 옮긴 것
+#    positional encoding 주파수 개수
+L_EMBED = 6
+
+
+def posenc(x, L_embed=L_EMBED):
+    """x → [x, sin(2^i x), cos(2^i x), ...] (i < L_embed)"""
+    rets = [x]
+    for i in range(L_embed):
+        for fn in [tf.sin, tf.cos]:
+            rets.append(fn(2.**i * x))
+    return tf.concat(rets, -1)
+
+
+def init_model(D=8, W=256, L_embed=L_EMBED):
+    """D층 MLP (4층마다 입력 skip connection), 출력 (r, g, b, sigma)"""
+    relu = tf.keras.layers.ReLU()
+    dense = lambda W=W, act=relu: tf.keras.layers.Dense(W, activation=act)
+
+    inputs = tf.keras.Input(shape=(3 + 3*2*L_embed,))
+    outputs = inputs
+    for i in range(D):
+        outputs = dense()(outputs)
+        if i % 4 == 0 and i > 0:
+            outputs = tf.keras.layers.Lambda(lambda x: tf.concat(x, axis=-1))([outputs, inputs])
+    outputs = dense(4, act=None)(outputs)
+
+    return tf.keras.Model(inputs=inputs, outputs=outputs)
+
+
+def get_rays(H, W, focal, c2w):
+    """이미지 전체 픽셀의 ray 원점/방향 (H, W, 3) (c2w: OpenGL 좌표계 camera-to-world 4x4)"""
+    i, j = tf.meshgrid(tf.range(W, dtype=tf.float32), tf.range(H, dtype=tf.float32), indexing='xy')
+    dirs = tf.stack([(i-W*.5)/focal, -(j-H*.5)/focal, -tf.ones_like(i)], -1)
+    c2w = tf.cast(c2w, tf.float32)
+    rays_d = tf.reduce_sum(dirs[..., np.newaxis, :] * c2w[:3, :3], -1)
+    rays_o = tf.broadcast_to(c2w[:3, -1], tf.shape(rays_d))
+    return rays_o, rays_d
+
+
+def batchify(fn, chunk=1024*32):
+    """입력을 chunk 단위로 나누어 fn 실행 (메모리 제한)"""
+    return lambda inputs: tf.concat([fn(inputs[i:i+chunk]) for i in range(0, inputs.shape[0], chunk)], 0)
+
+
+def raw2outputs(raw, z_vals):
+    """network 출력 (..., N_samples, 4) → (rgb_map, depth_map, acc_map, weights)"""
+    # Compute opacities and colors
+    sigma_a = tf.nn.relu(raw[..., 3])
+    rgb = tf.math.sigmoid(raw[..., :3])
+
+    # Do volume rendering
+    dists = tf.concat([z_vals[..., 1:] - z_vals[..., :-1], tf.broadcast_to([1e10], z_vals[..., :1].shape)], -1)
+    alpha = 1.-tf.exp(-sigma_a * dists)
+    weights = alpha * tf.math.cumprod(1.-alpha + 1e-10, -1, exclusive=True)
+
+    rgb_map = tf.reduce_sum(weights[..., None] * rgb, -2)
+    depth_map = tf.reduce_sum(weights * z_vals, -1)
+    acc_map = tf.reduce_sum(weights, -1)
+    return rgb_map, depth_map, acc_map, weights
+
+
+def occupancy_mask(grid, pts):
+    """utils.occupancy.OccupancyGrid bitfield를 TF 연산으로 조회 → 점유 cell 안인지 bool (...) (bounding box 밖은 False)"""
+    R = grid.resolution
+    index = tf.cast(tf.floor((pts - tf.constant(grid.origin)) / tf.constant(grid.cell_size)), tf.int64)
+    inside = tf.reduce_all((index >= 0) & (index < R), -1)
+    index = tf.clip_by_value(index, 0, R - 1)
+    flat = (index[..., 0] * R + index[..., 1]) * R + index[..., 2]
+
+    byte = tf.cast(tf.gather(tf.constant(grid.bits), tf.bitwise.right_shift(flat, 3)), tf.int64)
+    bit = tf.bitwise.bitwise_and(tf.bitwise.right_shift(byte, 7 - tf.bitwise.bitwise_and(flat, 7)), 1)
+    return inside & tf.equal(bit, 1)
+
+
+def query_network(network_fn, rays_o, rays_d, z_vals, L_embed=L_EMBED, chunk=1024*32, occupancy=None):
+    """ray 위 z_vals 위치의 점들을 network에 통과 → (..., N_samples, 4)
+
+    occupancy(OccupancyGrid)가 있으면 빈 cell의 샘플은 network에 넣지 않고 raw = 0 (density 0 → 렌더링 기여 없음)
+    """
+    pts = rays_o[..., None, :] + rays_d[..., None, :] * z_vals[..., :, None]
+    pts_flat = tf.reshape(pts, [-1, 3])
+    raw_shape = list(pts.shape[:-1]) + [4]
+    if occupancy is None:
+        raw = batchify(network_fn, chunk)(posenc(pts_flat, L_embed))
+        return tf.reshape(raw, raw_shape)
+
+    keep = tf.where(occupancy_mask(occupancy, pts_flat))
+    if keep.shape[0] == 0:
+        return tf.zeros(raw_shape)
+    raw = batchify(network_fn, chunk)(posenc(tf.gather_nd(pts_flat, keep), L_embed))
+    raw = tf.scatter_nd(keep, raw, [pts_flat.shape[0], 4])
+    return tf.reshape(raw, raw_shape)
+
+
+def density_fn(network_fn, L_embed=L_EMBED, chunk=1024*32):
+    """OccupancyGrid.update에 넘길 함수: (M, 3) world 좌표 → (M,) density (NumPy)"""
+    def fn(pts):
+        raw = batchify(network_fn, chunk)(posenc(tf.cast(pts, tf.float32), L_embed))
+        return tf.nn.relu(raw[..., 3]).numpy()
+    return fn
+
+
+def sample_pdf(bins, weights, N_samples, det=False):
+    """bins 구간별 weights로 만든 piecewise-constant PDF에서 역 CDF 샘플링 (모든 ray를 한 번에)
+
+    bins: (..., M+1) 구간 경계, weights: (..., M), 반환: (..., N_samples)
+    """
+    weights = weights + 1e-5  # NaN 방지
+    pdf = weights / tf.reduce_sum(weights, -1, keepdims=True)
+    cdf = tf.concat([tf.zeros_like(pdf[..., :1]), tf.cumsum(pdf, -1)], -1)
+
+    if det:
+        u = tf.broadcast_to(tf.linspace(0., 1., N_samples), list(cdf.shape[:-1]) + [N_samples])
+    else:
+        u = tf.random.uniform(list(cdf.shape[:-1]) + [N_samples])
+
+    # u가 속한 CDF 구간 [below, above]에서 선형 보간
+    inds = tf.searchsorted(cdf, u, side='right')
+    below = tf.maximum(0, inds-1)
+    above = tf.minimum(cdf.shape[-1]-1, inds)
+    inds_g = tf.stack([below, above], -1)
+    cdf_g = tf.gather(cdf, inds_g, axis=-1, batch_dims=len(inds_g.shape)-2)
+    bins_g = tf.gather(bins, inds_g, axis=-1, batch_dims=len(inds_g.shape)-2)
+
+    denom = cdf_g[..., 1] - cdf_g[..., 0]
+    denom = tf.where(denom < 1e-5, tf.ones_like(denom), denom)
+    t = (u - cdf_g[..., 0]) / denom
+    return bins_g[..., 0] + t * (bins_g[..., 1] - bins_g[..., 0])
+
+
+def render_rays_hierarchical(network_fn, rays_o, rays_d, near, far, N_samples, N_importance, rand=False,
+                             network_fine=None, L_embed=L_EMBED, chunk=1024*32, occupancy=None):
+    """coarse N_samples개 → weights로 만든 PDF에서 fine N_importance개를 더 뽑아 합친 N_samples + N_importance개로 렌더링
+
+    network_fine이 없으면 network_fn을 fine 단계에도 사용 (더 작은 init_model(D, W)을 fine용으로 쓸 수 있음)
+    반환: (rgb_map, depth_map, acc_map, rgb_map_coarse)
+    """
+    rays_o = tf.cast(rays_o, tf.float32)
+    rays_d = tf.cast(rays_d, tf.float32)
+    ray_shape = list(rays_o.shape[:-1])
+
+    # 1. coarse: near~far 균등(계층) 샘플링
+    z_vals = tf.linspace(tf.cast(near, tf.float32), tf.cast(far, tf.float32), N_samples)
+    z_vals = tf.broadcast_to(z_vals, ray_shape + [N_samples])
+    if rand:
+        z_vals += tf.random.uniform(ray_shape + [N_samples]) * (far-near)/N_samples
+    raw = query_network(network_fn, rays_o, rays_d, z_vals, L_embed, chunk, occupancy)
+    rgb_map_coarse, _, _, weights = raw2outputs(raw, z_vals)
+
+    # 2. fine: coarse 샘플 사이 중점을 구간 경계로, 양 끝을 제외한 weights에서 샘플링 (gradient는 coarse로 흐르지 않음)
+    z_mid = .5 * (z_vals[..., 1:] + z_vals[..., :-1])
+    z_fine = tf.stop_gradient(sample_pdf(z_mid, weights[..., 1:-1], N_importance, det=not rand))
+    z_vals = tf.sort(tf.concat([z_vals, z_fine], -1), -1)
+    network_fine = network_fine if network_fine is not None else network_fn
+    raw = query_network(network_fine, rays_o, rays_d, z_vals, L_embed, chunk, occupancy)
+    rgb_map, depth_map, acc_map, _ = raw2outputs(raw, z_vals)
+
+    return rgb_map, depth_map, acc_map, rgb_map_coarse
+
+
+def render_rays(network_fn, rays_o, rays_d, near, far, N_samples, rand=False, L_embed=L_EMBED, chunk=1024*32,
+                N_importance=0, network_fine=None, occupancy=None):
+    """ray마다 N_samples개 점을 샘플링해 volume rendering → (rgb_map, depth_map, acc_map)
+
+    N_importance > 0이면 coarse-to-fine (render_rays_hierarchical), occupancy가 있으면 빈 공간 샘플은 network 질의 생략
+    """
+    if N_importance > 0:
+        return render_rays_hierarchical(network_fn, rays_o, rays_d, near, far, N_samples, N_importance, rand=rand,
+                                        network_fine=network_fine, L_embed=L_embed, chunk=chunk, occupancy=occupancy)[:3]
+
+    rays_o = tf.cast(rays_o, tf.float32)
+    rays_d = tf.cast(rays_d, tf.float32)
+
+    # Compute 3D query points
+    z_vals = tf.linspace(tf.cast(near, tf.float32), tf.cast(far, tf.float32), N_samples)
+    if rand:
+        z_vals += tf.random.uniform(list(rays_o.shape[:-1]) + [N_samples]) * (far-near)/N_samples
+
+    # Run network
+    raw = query_network(network_fn, rays_o, rays_d, z_vals, L_embed, chunk, occupancy)
+    rgb_map, depth_map, acc_map, _ = raw2outputs(raw, z_vals)
+    return rgb_map, depth_map, acc_map
+
+
+def train_step(model, optimizer, target, rays_o, rays_d, near, far, N_samples, L_embed=L_EMBED,
+               N_importance=0, model_fine=None, occupancy=None):
+    """한 번의 gradient step, MSE loss 반환 (N_importance > 0이면 fine + coarse loss로 두 network 모두 학습)"""
+    variables = list(model.trainable_variables)
+    if model_fine is not None and model_fine is not model:
+        variables += model_fine.trainable_variables
+
+    with tf.GradientTape() as tape:
+        if N_importance > 0:
+            rgb, depth, acc, rgb_coarse = render_rays_hierarchical(model, rays_o, rays_d, near, far, N_samples, N_importance,
+                                                                   rand=True, network_fine=model_fine, L_embed=L_embed,
+                                                                   occupancy=occupancy)
+            loss = tf.reduce_mean(tf.square(rgb - target))
+            total_loss = loss + tf.reduce_mean(tf.square(rgb_coarse - target))
+        else:
+            rgb, depth, acc = render_rays(model, rays_o, rays_d, near, far, N_samples, rand=True, L_embed=L_embed,
+                                          occupancy=occupancy)
+            loss = total_loss = tf.reduce_mean(tf.square(rgb - target))
+    gradients = tape.gradient(total_loss, variables)
+    optimizer.apply_gradients(zip(gradients, variables))
+    return loss
+
+
+def psnr(loss):
+    return -10. * tf.math.log(loss) / tf.math.log(10.)
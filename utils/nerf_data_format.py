@@ -1,7 +1,10 @@
 import os
-import cv2
-import pycolmap
 import numpy as np
+from utils.instrument import timed
+from utils.image_cache import cached_images, load_images
+from utils.colmap_model import read_images
+from utils.pose import cam_from_world
+from utils.registered_images import DEFAULT_MANIFEST_PATH, load_registered_manifest, registered_names
 
 def qvec2rotmat(q):
     """
@@ -16,40 +19,27 @@ def qvec2rotmat(q):
     ],)
     return R
 
-def get_poses(path):
-    reconstruction = pycolmap.Reconstruction(path)
-    # print(reconstruction.summary())
-    
-    image_files = []
-    transformations = []
-    
-    for _, image in reconstruction.images.items():
-        rigid = image.cam_from_world
-        q = rigid.rotation.quat
-        t = np.array(rigid.translation,)
-        
-        # 쿼터니언을 회전 행렬로 변환
-        R = qvec2rotmat(q)
+@timed("nerf_data.get_poses")
+def get_poses(path=None, manifest_path=DEFAULT_MANIFEST_PATH):
+    # path가 없으면 sparse 단계가 선택한 모델 사용
+    if path is None:
+        path = load_registered_manifest(manifest_path)["sparse_model"]
+    # pycolmap.Reconstruction 대신 images.bin만 읽음 (2D 점 / 3D 점은 읽지 않음)
+    images = read_images(os.path.join(str(path), "images.bin"))
 
-        # 4x4 동차 변환 행렬 구성 (상단 좌측 3x3: 회전, 상단 우측: translation)
-        T = np.eye(4,)
-        T[:3, :3] = R
-        T[:3, 3] = t
+    # 모든 이미지의 쿼터니언 / translation을 모아 한 번에 4x4 world-to-camera 행렬로 변환
+    return images["name"], cam_from_world(images["quat"], images["translation"], order="wxyz")
 
-        image_files.append(image.name)
-        transformations.append(T)
-    
-    return image_files, np.array(transformations,)
+@timed("nerf_data.get_images")
+def get_images(image_files=None, dir="images/fg150_bg0_erode1_mask0/", manifest_path=DEFAULT_MANIFEST_PATH,
+               spec=1, cache_dir=None, num_workers=8):
+    # image_files가 없으면 등록된 이미지 manifest에 있는 파일만 읽음 (폴더 스캔/파일 이동 없음)
+    if image_files is None:
+        image_files = registered_names(load_registered_manifest(manifest_path))
+    paths = [os.path.join(dir, image_file) for image_file in image_files]
 
-def get_images(image_files):
-    dir = "images/fg150_bg0_erode1_mask0/"
-    images = []
-    
-    for image_file in image_files:
-        image = cv2.imread(dir+image_file)
-        if image is None:
-            print(f"fail to load: {image_file}")
-            continue
-        images.append(np.array(image))
-    
-    return np.array(images)
\ No newline at end of file
+    # 병렬 디코딩 + 미리 할당한 배열 (spec: 축소 배율 또는 (W, H))
+    # cache_dir를 주면 .npy 캐시 재사용 (utils.image_cache.DEFAULT_CACHE_DIR 등), 이때 반환값은 읽기 전용 memmap
+    if cache_dir is None:
+        return load_images(paths, spec, num_workers=num_workers)[0]
+    return cached_images(paths, spec, cache_dir=cache_dir, num_workers=num_workers)
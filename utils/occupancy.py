@@ -0,0 +1,103 @@
+import numpy as np
+
+# ✅ NeRF 빈 공간 건너뛰기용 occupancy grid (world 좌표계 bounding box를 R^3 cell로 나눈 bitfield)
+#   - COLMAP points3D가 있는 cell을 dilation해서 초기화
+#   - 학습 중 주기적으로 network density를 질의해 갱신 (cell별 density EMA > threshold → 점유)
+#   - render_rays(occupancy=...)는 빈 cell의 샘플을 network에 넣지 않음 (utils.nerf.occupancy_mask)
+DEFAULT_RESOLUTION = 64
+DEFAULT_THRESHOLD = 0.01
+
+
+def dilate(occupied, radius=1):
+    """3D binary dilation (한 변 2*radius+1 정육면체, 축마다 나누어 처리)"""
+    out = occupied.copy()
+    for axis in range(3):
+        source = out.copy()
+        for shift in range(1, radius + 1):
+            lo = [slice(None)] * 3
+            hi = [slice(None)] * 3
+            lo[axis], hi[axis] = slice(None, -shift), slice(shift, None)
+            out[tuple(hi)] |= source[tuple(lo)]
+            out[tuple(lo)] |= source[tuple(hi)]
+    return out
+
+
+class OccupancyGrid:
+    """bounding box [origin, origin + resolution * cell_size)를 나눈 점유 bitfield (np.packbits, cell당 1bit)"""
+
+    def __init__(self, origin, cell_size, resolution=DEFAULT_RESOLUTION, density=None, threshold=DEFAULT_THRESHOLD):
+        self.origin = np.asarray(origin, dtype=np.float32)
+        self.cell_size = np.asarray(cell_size, dtype=np.float32)
+        self.resolution = int(resolution)
+        self.threshold = threshold
+        shape = (self.resolution,) * 3
+        self.density = np.zeros(shape, dtype=np.float32) if density is None else np.asarray(density, dtype=np.float32)
+        self.bits = np.packbits(self.density > threshold)
+
+    @classmethod
+    def from_points(cls, xyz, resolution=DEFAULT_RESOLUTION, padding=0.1, dilation=2, percentiles=(0.5, 99.5),
+                    threshold=DEFAULT_THRESHOLD):
+        """sparse 점군으로 초기화: 백분위수로 outlier를 뺀 bounding box + padding 비율, 점이 있는 cell을 dilation칸 확장"""
+        xyz = np.asarray(xyz, dtype=np.float64)
+        lo, hi = np.percentile(xyz, percentiles, axis=0)
+        margin = (hi - lo) * padding
+        lo, hi = lo - margin, hi + margin
+        cell_size = (hi - lo) / resolution
+
+        grid = cls(lo, cell_size, resolution, threshold=threshold)
+        index, inside = grid.cell_index(xyz)
+        occupied = np.zeros((resolution,) * 3, dtype=bool)
+        occupied[tuple(index[inside].T)] = True
+        occupied = dilate(occupied, dilation)
+
+        # 초기 점유 cell은 density 1 (갱신 때마다 decay되므로 network가 density를 내지 않으면 점차 비워짐)
+        grid.density[occupied] = 1.0
+        grid.bits = np.packbits(occupied)
+        return grid
+
+    def cell_index(self, pts):
+        """world 좌표 (..., 3) → (cell 인덱스 (..., 3) int64, bounding box 안인지 (...))"""
+        index = np.floor((np.asarray(pts, dtype=np.float32) - self.origin) / self.cell_size).astype(np.int64)
+        inside = np.all((index >= 0) & (index < self.resolution), axis=-1)
+        return np.clip(index, 0, self.resolution - 1), inside
+
+    def occupied(self, pts):
+        """world 좌표 (..., 3) → 점유 cell 안인지 bool (...) (bounding box 밖은 빈 공간)"""
+        index, inside = self.cell_index(pts)
+        flat = np.ravel_multi_index(np.moveaxis(index, -1, 0), (self.resolution,) * 3)
+        bit = (self.bits[flat >> 3] >> (7 - (flat & 7))) & 1  # packbits는 큰 자리 bit부터 채움
+        return inside & (bit == 1)
+
+    def occupied_fraction(self):
+        return float(np.unpackbits(self.bits).mean())
+
+    def update(self, density_fn, decay=0.95, fraction=1.0, rng=None, chunk=1 << 16):
+        """density_fn((M, 3) world 좌표) → (M,) density 로 cell을 다시 평가
+
+        모든 cell density에 decay를 곱한 뒤 (fraction 비율의) cell마다 무작위 점 하나의 density와 비교해 큰 값을 유지
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        num_cells = self.resolution ** 3
+        if fraction >= 1:
+            cells = np.arange(num_cells)
+        else:
+            cells = rng.choice(num_cells, max(1, int(num_cells * fraction)), replace=False)
+        index = np.stack(np.unravel_index(cells, (self.resolution,) * 3), -1)
+        pts = self.origin + (index + rng.random(index.shape)) * self.cell_size
+
+        sigma = np.concatenate([np.asarray(density_fn(pts[i:i + chunk]), dtype=np.float32).reshape(-1)
+                                for i in range(0, len(pts), chunk)])
+        density = self.density.reshape(-1)
+        density *= decay
+        density[cells] = np.maximum(density[cells], sigma)
+        self.bits = np.packbits(self.density > self.threshold)
+        return self.occupied_fraction()
+
+    def save(self, path):
+        np.savez(path, origin=self.origin, cell_size=self.cell_size, resolution=self.resolution,
+                 density=self.density, threshold=self.threshold)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        return cls(data["origin"], data["cell_size"], int(data["resolution"]), data["density"], float(data["threshold"]))
@@ -0,0 +1,85 @@
+import os
+import concurrent.futures
+import cv2
+import numpy as np
+
+
+def sequential_pairs(names, window=10):
+    """파일 이름 순서(imageNNNN.png = 시간 순서) 기준으로 window 프레임 이내의 쌍"""
+    names = sorted(names)
+    return [(names[i], names[j]) for i in range(len(names)) for j in range(i + 1, min(i + 1 + window, len(names)))]
+
+
+def _thumbnail(path, size):
+    image = cv2.imread(path, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    if image is None:
+        return np.zeros(size * size, dtype=np.float32)
+    return cv2.resize(image, (size, size), interpolation=cv2.INTER_AREA).astype(np.float32).ravel()
+
+
+def global_descriptors(image_dir, names, size=32, max_workers=8):
+    """이미지 전체를 나타내는 전역 디스크립터 (평균 0, L2 정규화된 흑백 축소 이미지) (N, size*size)"""
+    paths = [os.path.join(str(image_dir), name) for name in names]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        desc = np.stack(list(executor.map(lambda p: _thumbnail(p, size), paths)))
+    desc -= desc.mean(axis=1, keepdims=True)
+    desc /= np.linalg.norm(desc, axis=1, keepdims=True) + 1e-8
+    return desc
+
+
+def loop_closure_pairs(names, descriptors, window=10, period=10, top_k=3, min_similarity=0.5):
+    """period 프레임마다 시간적으로 먼(window 밖) 프레임 중 전역 디스크립터가 가장 비슷한 top_k개와 쌍 생성"""
+    order = np.argsort(names)
+    names = [names[i] for i in order]
+    descriptors = descriptors[order]
+
+    queries = np.arange(0, len(names), period)
+    similarity = descriptors[queries] @ descriptors.T  # (Q, N)
+
+    # 시간적으로 가까운 프레임(순차 매칭이 이미 처리)은 제외
+    frame = np.arange(len(names))
+    similarity[np.abs(queries[:, None] - frame[None, :]) <= window] = -np.inf
+
+    k = min(top_k, len(names))
+    candidates = np.argpartition(-similarity, k - 1, axis=1)[:, :k] if k > 0 else np.zeros((len(queries), 0), dtype=int)
+
+    pairs = set()
+    for row, (q, cands) in enumerate(zip(queries, candidates)):
+        for c in cands:
+            if similarity[row, c] >= min_similarity:
+                pairs.add((names[min(q, c)], names[max(q, c)]))
+    return sorted(pairs)
+
+
+def retrieval_pairs(queries, names, descriptors, top_k=5, min_similarity=0.5, exclude=()):
+    """queries 각각에 대해 names 중 전역 디스크립터가 가장 비슷한 top_k개와 쌍 생성 (exclude 쌍은 제외)
+
+    descriptors: names 순서의 (N, D) 전역 디스크립터
+    """
+    index = {name: k for k, name in enumerate(names)}
+    queries = [q for q in queries if q in index]
+    if not queries or top_k <= 0:
+        return []
+
+    similarity = descriptors[[index[q] for q in queries]] @ descriptors.T  # (Q, N)
+    similarity[np.arange(len(queries)), [index[q] for q in queries]] = -np.inf
+    exclude = {tuple(sorted(p)) for p in exclude}
+
+    k = min(top_k, len(names))
+    candidates = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+
+    pairs = set()
+    for row, (q, cands) in enumerate(zip(queries, candidates)):
+        for c in cands:
+            pair = tuple(sorted((q, names[c])))
+            if similarity[row, c] >= min_similarity and pair not in exclude:
+                pairs.add(pair)
+    return sorted(pairs)
+
+
+def write_pairs_file(pairs, path):
+    """COLMAP 형식의 pair 목록 파일 (한 줄에 'name1 name2')"""
+    with open(path, "w") as f:
+        for name1, name2 in pairs:
+            f.write(f"{name1} {name2}\n")
+    return path
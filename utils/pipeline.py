@@ -0,0 +1,204 @@
+import os
+import sys
+import glob
+import json
+import fnmatch
+import hashlib
+import inspect
+import pathlib
+import threading
+import subprocess
+import concurrent.futures
+from utils.feature_cache import file_hash
+from utils.instrument import stage as instrument_stage
+
+# ✅ 단계별 fingerprint / 출력 해시 기록 (output 폴더가 삭제되어도 유지되도록 별도 폴더에 저장)
+STATE_PATH = pathlib.Path(".pipeline") / "state.json"
+
+
+class Stage:
+    """파이프라인의 한 단계
+
+    run     : 함수 (run(**params) 호출) 또는 명령어 목록 (예: [sys.executable, "feature_important.py"])
+    inputs  : 읽는 파일/폴더 경로 (glob 가능, 코드 파일도 포함하면 코드 변경 시 다시 실행)
+    outputs : 쓰는 파일/폴더 경로 (다른 단계의 inputs와 겹치면 그 단계보다 먼저 실행)
+    after   : 경로로 드러나지 않는 선행 단계 이름
+    """
+
+    def __init__(self, name, run, inputs=(), outputs=(), params=None, after=()):
+        self.name = name
+        self.run = run
+        self.inputs = [str(p) for p in inputs]
+        self.outputs = [str(p) for p in outputs]
+        self.params = params or {}
+        self.after = list(after)
+
+    def describe(self):
+        """실행 내용을 나타내는 문자열 (함수면 소스 코드 포함)"""
+        if callable(self.run):
+            try:
+                source = inspect.getsource(self.run)
+            except (OSError, TypeError):
+                source = ""
+            return f"{self.run.__module__}.{self.run.__qualname__}\n{source}"
+        return json.dumps([str(arg) for arg in self.run])
+
+    def execute(self):
+        if callable(self.run):
+            return self.run(**self.params)
+        subprocess.run([str(arg) for arg in self.run], check=True)
+
+
+def _normalize(path):
+    return os.path.normpath(str(path)).replace(os.sep, "/")
+
+
+def _overlaps(a, b):
+    """두 경로(glob 가능)가 같은 파일을 가리키거나 한쪽이 다른 쪽의 하위 경로인지"""
+    a, b = _normalize(a), _normalize(b)
+    return (a == b or a.startswith(b + "/") or b.startswith(a + "/")
+            or fnmatch.fnmatch(a, b) or fnmatch.fnmatch(b, a))
+
+
+def expand_paths(patterns):
+    """경로/glob 목록 → 실제 파일 목록 (폴더는 하위 파일 전체, 이름 순)"""
+    files = set()
+    for pattern in patterns:
+        for match in glob.glob(str(pattern)):
+            if os.path.isdir(match):
+                files.update(str(p) for p in pathlib.Path(match).rglob("*") if p.is_file())
+            else:
+                files.add(match)
+    return sorted(_normalize(f) for f in files)
+
+
+class Pipeline:
+    """입력/출력 경로로 연결된 단계들을 DAG로 실행
+
+    - fingerprint = 단계 이름 + params + 실행 코드 + 입력 파일 내용 해시
+    - fingerprint가 이전 실행과 같고 출력도 그대로면 건너뜀
+    - 선행 단계가 끝난 단계들은 max_workers개까지 동시에 실행
+    """
+
+    def __init__(self, stages, state_path=STATE_PATH, max_workers=2):
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_path = pathlib.Path(state_path)
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self.state = self._load_state()
+
+    def _load_state(self):
+        if not self.state_path.exists():
+            return {"stages": {}, "files": {}}
+        with open(self.state_path) as f:
+            return json.load(f)
+
+    def _save_state(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix(".tmp")
+        with self._lock:
+            with open(tmp_path, "w") as f:
+                json.dump(self.state, f, indent=1)
+        os.replace(tmp_path, self.state_path)
+
+    def dependencies(self):
+        """{단계 이름: 선행 단계 이름 집합}"""
+        deps = {}
+        for name, stage in self.stages.items():
+            deps[name] = set(stage.after)
+            for other_name, other in self.stages.items():
+                if other_name != name and any(_overlaps(i, o) for i in stage.inputs for o in other.outputs):
+                    deps[name].add(other_name)
+        return deps
+
+    def _file_digest(self, path):
+        """파일 내용 해시 ((크기, 수정 시각)이 같으면 이전에 계산한 값 재사용)"""
+        st = os.stat(path)
+        key = f"{st.st_size}:{st.st_mtime_ns}"
+        with self._lock:
+            cached = self.state["files"].get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+        digest = file_hash(path)
+        with self._lock:
+            self.state["files"][path] = [key, digest]
+        return digest
+
+    def digest_paths(self, patterns):
+        h = hashlib.blake2b(digest_size=16)
+        for path in expand_paths(patterns):
+            h.update(path.encode())
+            h.update(self._file_digest(path).encode())
+        return h.hexdigest()
+
+    def fingerprint(self, stage):
+        h = hashlib.blake2b(digest_size=16)
+        h.update(stage.name.encode())
+        h.update(json.dumps(stage.params, sort_keys=True, default=str).encode())
+        h.update(stage.describe().encode())
+        h.update(self.digest_paths(stage.inputs).encode())
+        return h.hexdigest()
+
+    def is_fresh(self, stage, fingerprint):
+        previous = self.state["stages"].get(stage.name)
+        return (previous is not None and previous["fingerprint"] == fingerprint
+                and previous["outputs"] == self.digest_paths(stage.outputs))
+
+    def _run_stage(self, stage, force):
+        fingerprint = self.fingerprint(stage)
+        if not force and self.is_fresh(stage, fingerprint):
+            print(f"⏭️ [{stage.name}] unchanged, skipped")
+            return False
+
+        print(f"▶️ [{stage.name}] running")
+        with instrument_stage(f"pipeline.{stage.name}", params=stage.params):
+            stage.execute()
+        with self._lock:
+            self.state["stages"][stage.name] = {"fingerprint": fingerprint, "outputs": None}
+        outputs = self.digest_paths(stage.outputs)
+        with self._lock:
+            self.state["stages"][stage.name]["outputs"] = outputs
+        self._save_state()
+        print(f"✅ [{stage.name}] done")
+        return True
+
+    def run(self, targets=None, force=()):
+        """targets(기본: 전체)와 그 선행 단계를 실행, force에 있는 단계는 항상 다시 실행
+
+        반환: {단계 이름: True(실행) / False(건너뜀)}
+        """
+        deps = self.dependencies()
+        needed, stack = set(), list(targets or self.stages)
+        while stack:
+            name = stack.pop()
+            if name not in needed:
+                needed.add(name)
+                stack.extend(deps[name])
+
+        ran, running = {}, {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while len(ran) < len(needed):
+                for name in sorted(needed - set(ran) - set(running.values())):
+                    if deps[name] <= set(ran):
+                        running[executor.submit(self._run_stage, self.stages[name], name in force)] = name
+                if not running:
+                    raise RuntimeError(f"Cycle in pipeline stages: {sorted(needed - set(ran))}")
+
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        ran[name] = future.result()
+                    except Exception as e:
+                        print(f"❌ [{name}] failed: {e}")
+                        for other in running:
+                            other.cancel()
+                        raise
+
+        self._save_state()
+        return ran
+
+
+def python_stage(script):
+    """스크립트를 현재 파이썬 인터프리터로 실행하는 명령어"""
+    return [sys.executable, str(script)]
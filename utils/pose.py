@@ -0,0 +1,134 @@
+import sys
+import time
+import numpy as np
+
+# ✅ 쿼터니언 성분 순서
+#   xyzw : pycolmap Rotation3d.quat (nerf_data_format.qvec2rotmat)
+#   wxyz : COLMAP images.txt/images.bin qvec (utils/matrix.qvec_to_rotmat, 노트북)
+QUAT_ORDERS = ("xyzw", "wxyz")
+
+# ✅ COLMAP/OpenCV 카메라 축(x 오른쪽, y 아래, z 앞) → OpenGL/LLFF(NeRF) 축(y 위, z 뒤)
+OPENGL_FLIP = np.diag([1., -1., -1., 1.])
+
+
+def to_xyzw(quats, order="xyzw"):
+    """(N, 4) 쿼터니언을 xyzw 순서로 변환"""
+    if order not in QUAT_ORDERS:
+        raise ValueError(f"Unknown quaternion order: {order} (choose from {QUAT_ORDERS})")
+    quats = np.asarray(quats, dtype=np.float64)
+    return quats if order == "xyzw" else quats[..., [1, 2, 3, 0]]
+
+
+def quat_to_rotmat(quats, order="xyzw"):
+    """(N, 4) 쿼터니언 → (N, 3, 3) 회전 행렬 (정규화 후 한 번에 계산)"""
+    q = to_xyzw(quats, order)
+    q = q / np.linalg.norm(q, axis=-1, keepdims=True)
+    x, y, z, w = np.moveaxis(q, -1, 0)
+
+    R = np.empty(q.shape[:-1] + (3, 3))
+    R[..., 0, 0] = 1 - 2 * (y * y + z * z)
+    R[..., 0, 1] = 2 * (x * y - z * w)
+    R[..., 0, 2] = 2 * (x * z + y * w)
+    R[..., 1, 0] = 2 * (x * y + z * w)
+    R[..., 1, 1] = 1 - 2 * (x * x + z * z)
+    R[..., 1, 2] = 2 * (y * z - x * w)
+    R[..., 2, 0] = 2 * (x * z - y * w)
+    R[..., 2, 1] = 2 * (y * z + x * w)
+    R[..., 2, 2] = 1 - 2 * (x * x + y * y)
+    return R
+
+
+def rotmat_to_quat(R, order="xyzw"):
+    """(N, 3, 3) 회전 행렬 → (N, 4) 쿼터니언 (w >= 0)"""
+    R = np.asarray(R, dtype=np.float64)
+    # 4x4 대칭 행렬의 최대 고유벡터 (Bar-Itzhack), 수치적으로 안정적
+    Rxx, Rxy, Rxz = R[..., 0, 0], R[..., 0, 1], R[..., 0, 2]
+    Ryx, Ryy, Ryz = R[..., 1, 0], R[..., 1, 1], R[..., 1, 2]
+    Rzx, Rzy, Rzz = R[..., 2, 0], R[..., 2, 1], R[..., 2, 2]
+    K = np.stack([
+        np.stack([Rxx - Ryy - Rzz, Ryx + Rxy, Rzx + Rxz, Rzy - Ryz], -1),
+        np.stack([Ryx + Rxy, Ryy - Rxx - Rzz, Rzy + Ryz, Rxz - Rzx], -1),
+        np.stack([Rzx + Rxz, Rzy + Ryz, Rzz - Rxx - Ryy, Ryx - Rxy], -1),
+        np.stack([Rzy - Ryz, Rxz - Rzx, Ryx - Rxy, Rxx + Ryy + Rzz], -1),
+    ], -2) / 3.0
+    _, vecs = np.linalg.eigh(K)
+    q = vecs[..., :, -1]  # xyzw
+    q = q * np.where(q[..., 3:] < 0, -1.0, 1.0)
+    return q if order == "xyzw" else q[..., [3, 0, 1, 2]]
+
+
+def cam_from_world(quats, translations, order="xyzw"):
+    """(N, 4) 쿼터니언 + (N, 3) translation → (N, 4, 4) world-to-camera 행렬"""
+    translations = np.asarray(translations, dtype=np.float64)
+    T = np.zeros(translations.shape[:-1] + (4, 4))
+    T[..., :3, :3] = quat_to_rotmat(quats, order)
+    T[..., :3, 3] = translations
+    T[..., 3, 3] = 1.0
+    return T
+
+
+def cam_to_world(quats, translations, order="xyzw", opengl=False):
+    """(N, 4, 4) camera-to-world 행렬 ([R^T | -R^T t], 역행렬 계산 없이), opengl=True면 y/z 축 반전"""
+    R = quat_to_rotmat(quats, order)
+    Rt = np.swapaxes(R, -1, -2)
+    t = np.asarray(translations, dtype=np.float64)
+
+    T = np.zeros(t.shape[:-1] + (4, 4))
+    T[..., :3, :3] = Rt
+    T[..., :3, 3] = -np.einsum("...ij,...j->...i", Rt, t)
+    T[..., 3, 3] = 1.0
+    if opengl:
+        T[..., :3, 1:3] *= -1  # T @ OPENGL_FLIP
+    return T
+
+
+def reconstruction_arrays(reconstruction, sort_by_name=False):
+    """pycolmap.Reconstruction → (이미지 이름 목록, (N, 4) xyzw 쿼터니언, (N, 3) translation)"""
+    images = list(reconstruction.images.values())
+    if sort_by_name:
+        images.sort(key=lambda image: image.name)
+    names = [image.name for image in images]
+    quats = np.array([image.cam_from_world.rotation.quat for image in images], dtype=np.float64).reshape(-1, 4)
+    translations = np.array([image.cam_from_world.translation for image in images], dtype=np.float64).reshape(-1, 3)
+    return names, quats, translations
+
+
+def _self_check(n=100_000, seed=0):
+    """두 성분 순서 / 역행렬 / OpenGL 반전 경로가 서로 일치하는지 확인하고 처리 시간 출력 (테스트: tests/test_pose.py)"""
+    from utils.matrix import qvec_to_rotmat
+
+    rng = np.random.default_rng(seed)
+    xyzw = rng.normal(size=(n, 4))
+    xyzw /= np.linalg.norm(xyzw, axis=1, keepdims=True)
+    wxyz = xyzw[:, [3, 0, 1, 2]]
+    t = rng.normal(size=(n, 3))
+
+    # 1. 두 순서 경로가 같은 회전을 만들고, 기존 scalar 함수와 일치
+    R = quat_to_rotmat(xyzw, "xyzw")
+    assert np.allclose(R, quat_to_rotmat(wxyz, "wxyz"))
+    for k in range(0, n, n // 100):
+        assert np.allclose(R[k], qvec_to_rotmat(wxyz[k]))
+
+    # 2. 회전 행렬: 직교 + det 1, 쿼터니언 왕복 (q와 -q는 같은 회전)
+    assert np.allclose(R @ np.swapaxes(R, 1, 2), np.eye(3), atol=1e-10)
+    assert np.allclose(np.linalg.det(R), 1.0)
+    for order, q in (("xyzw", xyzw), ("wxyz", wxyz)):
+        back = rotmat_to_quat(R, order)
+        assert np.allclose(np.abs(np.sum(back * q, axis=1)), 1.0)
+
+    # 3. cam_to_world = cam_from_world의 역행렬, OpenGL 반전 = 오른쪽에 diag(1, -1, -1, 1)
+    w2c = cam_from_world(wxyz, t, "wxyz")
+    c2w = cam_to_world(xyzw, t, "xyzw")
+    assert np.allclose(c2w, np.linalg.inv(w2c))
+    assert np.allclose(cam_to_world(wxyz, t, "wxyz", opengl=True), c2w @ OPENGL_FLIP)
+
+    start = time.perf_counter()
+    cam_from_world(xyzw, t)
+    cam_to_world(xyzw, t, opengl=True)
+    elapsed = time.perf_counter() - start
+    print(f"✅ pose self-check passed ({n} poses, w2c + c2w in {1000 * elapsed:.1f} ms)")
+
+
+if __name__ == "__main__":
+    # 사용법: python -m utils.pose [포즈 수]
+    _self_check(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,119 @@
+import os
+import json
+import pathlib
+import numpy as np
+
+# ✅ NeRF 학습용 ray bank: 모든 학습 ray의 방향/색을 한 번만 계산해 두고, 전체 이미지에서 무작위로 고른 ray 묶음으로 학습
+#   directions.npy : (N, H*W, 3) float16 world 좌표계 ray 방향
+#   colors.npy     : (N, H*W, 3) uint8 RGB
+#   origins.npy    : (N, 3) float32 카메라 중심 (같은 이미지의 ray는 원점이 같으므로 이미지마다 하나만 저장)
+BANK_META_NAME = "ray_bank.json"
+
+
+def pixel_directions(H, W, focal):
+    """카메라 좌표계 픽셀 방향 (H*W, 3), utils.nerf.get_rays와 같은 규약 (x 오른쪽, y 위, -z 앞)"""
+    i, j = np.meshgrid(np.arange(W, dtype=np.float32), np.arange(H, dtype=np.float32), indexing="xy")
+    dirs = np.stack([(i - W * .5) / focal, -(j - H * .5) / focal, -np.ones_like(i)], -1)
+    return dirs.reshape(-1, 3)
+
+
+def _to_uint8(image):
+    image = np.asarray(image)[..., :3]
+    if image.dtype == np.uint8:
+        return image
+    return np.clip(np.round(image * 255.), 0, 255).astype(np.uint8)
+
+
+class RayBank:
+    """이미지 N장 × H*W 픽셀의 ray를 미리 계산해 둔 저장소 (path가 있으면 .npy memmap에 바로 기록)
+
+    bank = RayBank.build(images, poses, focal)   # poses: (N, 4, 4) OpenGL camera-to-world
+    rays_o, rays_d, target = bank.batch(4096, rng)
+    """
+
+    def __init__(self, origins, directions, colors, H, W):
+        self.origins = origins
+        self.directions = directions
+        self.colors = colors
+        self.H, self.W = H, W
+
+    @property
+    def num_images(self):
+        return len(self.origins)
+
+    @property
+    def num_rays(self):
+        return self.num_images * self.H * self.W
+
+    @classmethod
+    def build(cls, images, poses, focal, path=None, dtype=np.float16):
+        """images: (N, H, W, C) uint8 또는 [0, 1] float (utils.dataset.Dataset도 가능), focal: 값 하나 또는 이미지별 (N,)
+
+        모든 이미지의 focal이 같으면 픽셀 방향 grid를 한 번만 만들고 이미지마다 회전만 적용
+        """
+        num_images = len(images)
+        H, W = images[0].shape[:2]
+        poses = np.asarray(poses, dtype=np.float32)
+        focals = np.broadcast_to(np.asarray(focal, dtype=np.float32), (num_images,))
+
+        shape = (num_images, H * W, 3)
+        if path is not None:
+            path = pathlib.Path(path)
+            path.mkdir(parents=True, exist_ok=True)
+            (path / BANK_META_NAME).unlink(missing_ok=True)  # 다시 만드는 도중 중단되면 이전 meta가 새 데이터를 가리키지 않도록
+            directions =np.lib.format.open_memmap(str(path / "directions.npy"), mode="w+", dtype=dtype, shape=shape)
+            colors = np.lib.format.open_memmap(str(path / "colors.npy"), mode="w+", dtype=np.uint8, shape=shape)
+        else:
+            directions = np.empty(shape, dtype=dtype)
+            colors = np.empty(shape, dtype=np.uint8)
+
+        grid, grid_focal = None, None
+        for k in range(num_images):
+            if grid is None or focals[k] != grid_focal:
+                grid, grid_focal = pixel_directions(H, W, focals[k]), focals[k]
+            directions[k] = grid @ poses[k, :3, :3].T
+            colors[k] = _to_uint8(images[k]).reshape(-1, 3)
+        origins = np.ascontiguousarray(poses[:, :3, 3])
+
+        bank = cls(origins, directions, colors, H, W)
+        if path is not None:
+            directions.flush()
+            colors.flush()
+            np.save(path / "origins.npy", origins)
+            tmp_path = path / (BANK_META_NAME + ".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({"num_images": num_images, "height": H, "width": W, "direction_dtype": np.dtype(dtype).str}, f, indent=1)
+            os.replace(tmp_path, path / BANK_META_NAME)
+        return bank
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        """build(path=...)로 저장한 ray bank를 memmap으로 열기 (ray는 batch로 고를 때만 디스크에서 읽음)"""
+        path = pathlib.Path(path)
+        with open(path / BANK_META_NAME) as f:
+            meta = json.load(f)
+        return cls(np.load(path / "origins.npy"), np.load(path / "directions.npy", mmap_mode=mmap_mode),
+                   np.load(path / "colors.npy", mmap_mode=mmap_mode), meta["height"], meta["width"])
+
+    def gather(self, indices):
+        """전체 ray 번호 → (rays_o, rays_d, target) float32 (B, 3), target은 [0, 1]"""
+        indices = np.sort(np.asarray(indices, dtype=np.int64))  # memmap에서 순서대로 읽도록 정렬
+        image_index, pixel_index = np.divmod(indices, self.H * self.W)
+        rays_o = self.origins[image_index]
+        rays_d = self.directions[image_index, pixel_index].astype(np.float32)
+        target = self.colors[image_index, pixel_index].astype(np.float32) / 255.
+        return rays_o, rays_d, target
+
+    def batch(self, batch_size, rng=None):
+        """모든 이미지에서 무작위로 고른 batch_size개의 ray (step당 비용이 H*W와 무관)"""
+        rng = rng if rng is not None else np.random.default_rng()
+        return self.gather(rng.integers(0, self.num_rays, batch_size))
+
+    def batches(self, batch_size, seed=0):
+        """epoch마다 전체 ray를 섞어서 batch_size개씩 끝없이 반환"""
+        rng = np.random.default_rng(seed)
+        batch_size = min(batch_size, self.num_rays)
+        while True:
+            order = rng.permutation(self.num_rays)
+            for start in range(0, self.num_rays - batch_size + 1, batch_size):
+                yield self.gather(order[start:start + batch_size])
@@ -0,0 +1,46 @@
+import os
+import json
+import pathlib
+
+# ✅ sparse 단계가 기록하는 등록 이미지 목록 (이미지 파일은 이동하지 않음)
+DEFAULT_MANIFEST_PATH = pathlib.Path("output") / "sparse" / "registered_images.json"
+
+
+def write_registered_manifest(model_path, image_dir, manifest_path=DEFAULT_MANIFEST_PATH, reconstruction=None):
+    """sparse 모델에 등록된 이미지 목록을 JSON으로 저장 (임시 파일에 쓴 뒤 교체하므로 중간에 멈춰도 깨지지 않음)
+
+    {"sparse_model": 모델 경로, "image_dir": 이미지 폴더, "images": [{"image_id", "name"}, ...] (이름 순)}
+    """
+    if reconstruction is None:
+        from utils.colmap_model import read_images
+        model_images = read_images(os.path.join(str(model_path), "images.bin"))
+        items = zip(model_images["image_id"], model_images["name"])
+    else:
+        items = ((image_id, image.name) for image_id, image in reconstruction.images.items())
+
+    images = sorted(({"image_id": int(image_id), "name": name} for image_id, name in items), key=lambda item: item["name"])
+    manifest = {"sparse_model": str(model_path), "image_dir": str(image_dir), "images": images}
+
+    manifest_path = pathlib.Path(manifest_path)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = manifest_path.with_suffix(manifest_path.suffix + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, manifest_path)
+    return manifest
+
+
+def load_registered_manifest(manifest_path=DEFAULT_MANIFEST_PATH):
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def registered_names(manifest):
+    """등록된 이미지 이름 목록 (이름 순)"""
+    return [item["name"] for item in manifest["images"]]
+
+
+def registered_paths(manifest, image_dir=None):
+    """등록된 이미지 파일 경로 목록 (image_dir을 주면 같은 이름의 다른 폴더 이미지, 예: 축소본)"""
+    image_dir = pathlib.Path(image_dir or manifest["image_dir"])
+    return [image_dir / name for name in registered_names(manifest)]
@@ -0,0 +1,90 @@
+import os
+import time
+import resource
+import multiprocessing
+
+# ✅ pycolmap 내부 스레드는 이미지 단위로 작업을 나누므로,
+#    스레드 하나당 최소 이 정도 이미지가 있어야 스레드를 늘리는 효과가 있음
+MIN_IMAGES_PER_THREAD = 8
+
+_db_slots = None
+
+
+def plan_core_budget(num_jobs, num_images, total_cores=None, max_open_dbs=None,
+                     min_images_per_thread=MIN_IMAGES_PER_THREAD):
+    """고정된 코어 수를 (프로세스 수 × 프로세스당 pycolmap 스레드 수)로 분배
+
+    - 실험(config)이 많으면 프로세스 단위 병렬화를 우선 (동기화 비용 없음)
+    - 실험이 적으면 남는 코어를 pycolmap 내부 스레드로 배분 (이미지 수로 상한)
+    - 동시에 기록하는 SQLite DB 수는 max_open_dbs로 제한
+    """
+    total_cores = total_cores or multiprocessing.cpu_count()
+    max_open_dbs = max_open_dbs or total_cores
+
+    useful_threads = max(1, min(total_cores, num_images // min_images_per_thread))
+    processes = max(1, min(num_jobs, total_cores, max_open_dbs))
+    threads = max(1, min(useful_threads, total_cores // processes))
+
+    return {"total_cores": total_cores, "processes": processes, "threads": threads, "max_open_dbs": max_open_dbs}
+
+
+def _init_worker(db_slots):
+    global _db_slots
+    _db_slots = db_slots
+
+
+def _cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _run_job(fn, index, args, num_threads):
+    """DB 슬롯을 얻은 뒤 작업을 실행하고 wall/CPU 시간을 측정"""
+    with _db_slots:
+        start_wall, start_cpu = time.perf_counter(), _cpu_seconds()
+        result = fn(*args, num_threads=num_threads)
+        wall, cpu = time.perf_counter() - start_wall, _cpu_seconds() - start_cpu
+
+    stats = {
+        "job": index,
+        "pid": os.getpid(),
+        "threads": num_threads,
+        "wall_time": wall,
+        "cpu_time": cpu,
+        # 할당된 스레드를 모두 사용했을 때 1.0
+        "cpu_utilisation": cpu / (wall * num_threads) if wall > 0 else 0.0,
+    }
+    return result, stats
+
+
+def run_jobs(fn, args_list, plan, report=True):
+    """plan에 따라 fn(*args, num_threads=...)을 프로세스 풀에서 실행
+
+    반환: (결과 목록 (args_list 순서), 작업별 CPU 통계 목록)
+    """
+    db_slots = multiprocessing.BoundedSemaphore(plan["max_open_dbs"])
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes=plan["processes"], initializer=_init_worker, initargs=(db_slots,)) as pool:
+        outputs = pool.starmap(_run_job, [(fn, i, args, plan["threads"]) for i, args in enumerate(args_list)])
+    elapsed = time.perf_counter() - start
+
+    results = [result for result, _ in outputs]
+    stats = [job_stats for _, job_stats in outputs]
+
+    if report:
+        print_report(stats, plan, elapsed)
+
+    return results, stats
+
+
+def print_report(stats, plan, elapsed):
+    """작업별 CPU 사용률 출력"""
+    print(f"🧮 Core budget: {plan['total_cores']} cores = {plan['processes']} processes x {plan['threads']} threads "
+          f"(max {plan['max_open_dbs']} open DBs)")
+    for s in stats:
+        print(f"   job {s['job']:>3}: wall {s['wall_time']:8.1f}s, cpu {s['cpu_time']:8.1f}s, "
+              f"utilisation {100 * s['cpu_utilisation']:5.1f}% of {s['threads']} threads")
+    total_cpu = sum(s["cpu_time"] for s in stats)
+    if elapsed > 0:
+        print(f"✅ Total: wall {elapsed:.1f}s, cpu {total_cpu:.1f}s, "
+              f"{100 * total_cpu / (elapsed * plan['total_cores']):.1f}% of the core budget")
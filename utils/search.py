@@ -0,0 +1,158 @@
+import os
+import math
+import time
+import random
+import pathlib
+import resource
+import itertools
+
+# ✅ 부분 집합 크기 단계: 전체 이미지의 1/eta^k → ... → 전체
+DEFAULT_ETA = 3
+
+
+def cpu_time_used():
+    """현재 프로세스 + 종료된 자식 프로세스의 CPU 시간"""
+    usage = [resource.getrusage(who) for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)]
+    return sum(u.ru_utime + u.ru_stime for u in usage)
+
+
+class Budget:
+    """wall-clock / CPU 시간 예산 (None이면 제한 없음)"""
+
+    def __init__(self, wall_seconds=None, cpu_seconds=None):
+        self.wall_seconds = wall_seconds
+        self.cpu_seconds = cpu_seconds
+        self.start_wall = time.perf_counter()
+        self.start_cpu = cpu_time_used()
+
+    def used(self):
+        return time.perf_counter() - self.start_wall, cpu_time_used() - self.start_cpu
+
+    def exhausted(self):
+        wall, cpu = self.used()
+        return ((self.wall_seconds is not None and wall >= self.wall_seconds)
+                or (self.cpu_seconds is not None and cpu >= self.cpu_seconds))
+
+
+def grid(space):
+    """{이름: 후보 목록} → 모든 조합 dict 목록 (itertools.product)"""
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+
+def subset_sizes(num_images, eta=DEFAULT_ETA, min_images=10):
+    """successive halving 단계별 이미지 수 (작은 것부터, 마지막은 전체)"""
+    sizes = [num_images]
+    while sizes[-1] // eta >= min_images:
+        sizes.append(sizes[-1] // eta)
+    return sizes[::-1]
+
+
+def subsample_images(image_dir, num_images, output_dir):
+    """시간 순서(파일 이름 순)를 유지하며 고르게 num_images장을 골라 output_dir에 심볼릭 링크로 구성
+
+    이미지 이름이 그대로이므로 특징점 캐시(내용 해시)와 순차 매칭을 그대로 사용할 수 있습니다.
+    """
+    image_dir, output_dir = pathlib.Path(image_dir), pathlib.Path(output_dir)
+    names = sorted(p.name for p in image_dir.iterdir() if p.suffix.lower() in (".png", ".jpg", ".jpeg"))
+    picks = [names[k] for k in sorted({round(x) for x in
+                                       (i * (len(names) - 1) / max(1, num_images - 1) for i in range(num_images))})]
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for stale in output_dir.iterdir():
+        if stale.name not in picks:
+            stale.unlink()
+    for name in picks:
+        link = output_dir / name
+        if not link.exists():
+            os.symlink((image_dir / name).resolve(), link)
+    return output_dir
+
+
+def _evaluate(evaluate, config, num_images, history):
+    start_wall, start_cpu = time.perf_counter(), cpu_time_used()
+    try:
+        score = evaluate(config, num_images)
+    except Exception as e:
+        print(f"❌ {config} @ {num_images} images failed: {e}")
+        score = -math.inf
+    entry = {"config": config, "num_images": num_images, "score": score,
+             "wall_time": time.perf_counter() - start_wall, "cpu_time": cpu_time_used() - start_cpu}
+    history.append(entry)
+    print(f"📈 {config} @ {num_images} images → score {score:.4g} ({entry['cpu_time']:.1f} cpu-s)")
+    return score
+
+
+def successive_halving(configs, evaluate, sizes, eta=DEFAULT_ETA, budget=None):
+    """모든 config를 가장 작은 부분 집합에서 평가하고, 단계마다 상위 1/eta만 다음(더 큰) 부분 집합으로 승급
+
+    evaluate(config, num_images) → score (클수록 좋음)
+    반환: (최고 config, 평가 기록 목록) — 예산이 끝나면 그때까지 가장 큰 단계의 최고 config
+    """
+    budget = budget or Budget()
+    history = []
+    survivors = list(configs)
+    best = None
+
+    for rung, num_images in enumerate(sizes):
+        print(f"\n🪜 Rung {rung}: {len(survivors)} configs x {num_images} images")
+        scored = []
+        for config in survivors:
+            if budget.exhausted():
+                print("⏹️ Budget exhausted")
+                break
+            scored.append((_evaluate(evaluate, config, num_images, history), config))
+        if not scored:
+            break
+
+        scored.sort(key=lambda item: item[0], reverse=True)
+        best = scored[0][1]
+        if budget.exhausted():
+            break
+        survivors = [config for _, config in scored[:max(1, len(scored) // eta)]]
+
+    return best, history
+
+
+def tpe_search(space, evaluate, sizes, n_trials=50, budget=None, seed=0):
+    """optuna TPE sampler + successive halving pruner (optuna가 설치된 경우)
+
+    trial마다 작은 부분 집합부터 평가하고, 같은 단계의 다른 trial보다 뒤처지면 더 큰 부분 집합으로 가지 않음
+    """
+    try:
+        import optuna
+    except ImportError as e:
+        raise ImportError("tpe_search requires optuna (pip install optuna); use successive_halving instead") from e
+
+    budget = budget or Budget()
+    history = []
+
+    def objective(trial):
+        config = {name: trial.suggest_categorical(name, list(values)) for name, values in space.items()}
+        score = -math.inf
+        for step, num_images in enumerate(sizes):
+            score = _evaluate(evaluate, config, num_images, history)
+            trial.report(score, step)
+            if step < len(sizes) - 1 and trial.should_prune():
+                raise optuna.TrialPruned()
+        return score
+
+    def stop_on_budget(study, trial):
+        if budget.exhausted():
+            study.stop()
+
+    study = optuna.create_study(direction="maximize", sampler=optuna.samplers.TPESampler(seed=seed),
+                                pruner=optuna.pruners.SuccessiveHalvingPruner())
+    study.optimize(objective, n_trials=n_trials, timeout=budget.wall_seconds, callbacks=[stop_on_budget])
+
+    completed = [t for t in study.trials if t.state == optuna.trial.TrialState.COMPLETE]
+    best = study.best_params if completed else None
+    return best, history
+
+
+def random_configs(space, n, seed=0):
+    """grid가 너무 크면 그중 n개만 무작위로 선택"""
+    configs = grid(space)
+    if len(configs) <= n:
+        return configs
+    return random.Random(seed).sample(configs, n)
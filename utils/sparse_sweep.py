@@ -0,0 +1,140 @@
+import math
+import time
+import multiprocessing
+import multiprocessing.connection
+
+# ✅ successive halving 기준 시점 (초): 이 시점마다 등록된 이미지 수가 상위 1/eta 안에 들지 못한 config는 중단
+DEFAULT_RUNGS = (60, 180, 540, 1620)
+
+# ✅ 중단 요청 후 worker가 스스로 끝나기를 기다리는 시간 (초), 지나면 terminate()
+DEFAULT_ABORT_GRACE = 5.0
+
+
+class SweepStopped(Exception):
+    """부모 프로세스가 중단을 요청함 (fn 안에서 잡지 말고 그대로 전달해야 함)"""
+
+
+def _worker(fn, index, args, num_threads, conn, stop):
+    """별도 프로세스에서 fn 실행, 진행 상황(등록된 이미지 수)을 이 worker 전용 pipe로 전달
+
+    stop이 설정되면 다음 progress_callback에서 SweepStopped를 발생시켜 스스로 종료
+    """
+    start = time.perf_counter()
+
+    def on_progress(num_registered):
+        if stop.is_set():
+            raise SweepStopped()
+        conn.send(("progress", index, time.perf_counter() - start, num_registered))
+
+    try:
+        result = fn(*args, num_threads=num_threads, progress_callback=on_progress)
+        if not stop.is_set():
+            conn.send(("done", index, time.perf_counter() - start, result))
+    except SweepStopped:
+        pass
+    except Exception as e:
+        if not stop.is_set():
+            conn.send(("error", index, time.perf_counter() - start, repr(e)))
+    finally:
+        conn.close()
+
+
+def count_at(history, t):
+    """시각 t까지 등록된 이미지 수"""
+    count = 0
+    for time_, n in history:
+        if time_ > t:
+            break
+        count = n
+    return count
+
+
+def run_sweep(fn, args_list, plan, rungs=DEFAULT_RUNGS, eta=3, min_configs=3, poll_interval=1.0,
+              abort_grace=DEFAULT_ABORT_GRACE):
+    """config마다 fn(*args, num_threads=..., progress_callback=...)을 plan["processes"]개씩 병렬 실행
+
+    같은 경과 시간에서 비교했을 때 등록된 이미지 수가 다른 config들의 상위 1/eta보다 뒤처지는
+    config는 중단합니다 (비교 대상이 min_configs개 이상일 때만).
+    중단은 progress_callback에서 SweepStopped를 발생시켜 요청하므로 fn은 이 예외를 삼키지 말고 다시 발생시켜야 합니다.
+    worker마다 전용 pipe를 쓰므로 중단된 worker가 메시지를 쓰던 중 종료되어도 다른 config에는 영향이 없습니다.
+    반환: args_list 순서의 dict 목록 {index, status(done/aborted/error), result, wall_time, registered}
+    """
+    pending = list(enumerate(args_list))
+    running = {}  # index → (process, start_time, 수신 pipe, 중단 event)
+    history = {i: [(0.0, 0)] for i in range(len(args_list))}
+    outcome = {}
+    checked = {i: set() for i in range(len(args_list))}
+
+    def elapsed_of(j, now):
+        if j in outcome:
+            return math.inf if outcome[j]["status"] == "done" else outcome[j]["wall_time"]
+        if j in running:
+            return now - running[j][1]
+        return -1.0
+
+    def finish(index, status, wall_time, result=None):
+        process, _, conn, stop = running.pop(index)
+        if status == "aborted":
+            # 먼저 스스로 끝나도록 요청하고, abort_grace 안에 끝나지 않을 때만 강제 종료
+            stop.set()
+            process.join(abort_grace)
+            if process.is_alive():
+                process.terminate()
+        process.join()
+        conn.close()  # 중단된 worker의 pipe는 (반쯤 쓰인 메시지가 있어도) 그대로 버림
+        outcome[index] = {"index": index, "status": status, "result": result, "wall_time": wall_time,
+                          "registered": history[index][-1][1]}
+
+    while pending or running:
+        while pending and len(running) < plan["processes"]:
+            index, args = pending.pop(0)
+            conn, child_conn = multiprocessing.Pipe(duplex=False)
+            stop = multiprocessing.Event()
+            process = multiprocessing.Process(target=_worker, args=(fn, index, args, plan["threads"], child_conn, stop))
+            process.start()
+            child_conn.close()  # 부모 쪽 송신 끝을 닫아야 worker 종료 시 EOF를 받음
+            running[index] = (process, time.perf_counter(), conn, stop)
+
+        # ✅ 쌓인 메시지를 모두 처리 (진행 기록이 밀리지 않도록)
+        ready = multiprocessing.connection.wait([entry[2] for entry in running.values()], timeout=poll_interval)
+        for index in [i for i, entry in running.items() if entry[2] in ready]:
+            conn = running[index][2]
+            while index in running and conn.poll():
+                try:
+                    kind, _, t, payload = conn.recv()
+                except (EOFError, OSError):
+                    start = running[index][1]
+                    finish(index, "error", time.perf_counter() - start, "process exited without result")
+                    print(f"❌ [{index+1}] exited without result")
+                    break
+                if kind == "progress":
+                    history[index].append((t, payload))
+                elif kind == "done":
+                    finish(index, "done", t, payload)
+                    print(f"✅ [{index+1}] finished in {t:.1f}s")
+                else:
+                    finish(index, "error", t, payload)
+                    print(f"❌ [{index+1}] failed after {t:.1f}s: {payload}")
+
+        now = time.perf_counter()
+        for index, (process, start, conn, _) in list(running.items()):
+            if not process.is_alive() and not conn.poll():
+                finish(index, "error", now - start, "process exited without result")
+                continue
+
+            elapsed = now - start
+            for rung in rungs:
+                if rung > elapsed or rung in checked[index]:
+                    continue
+                checked[index].add(rung)
+                peers = [count_at(history[j], rung) for j in history if elapsed_of(j, now) >= rung]
+                if len(peers) < min_configs:
+                    continue
+                threshold = sorted(peers, reverse=True)[math.ceil(len(peers) / eta) - 1]
+                mine = count_at(history[index], rung)
+                if mine < threshold:
+                    finish(index, "aborted", elapsed)
+                    print(f"✂️ [{index+1}] aborted at {rung}s: {mine} images registered (top 1/{eta} needs {threshold})")
+                    break
+
+    return [outcome[i] for i in range(len(args_list))]
@@ -1,77 +1,489 @@
-import cv2
-import numpy as np
 import os
-
+import sys
+import time
+import concurrent.futures
 import cv2
 import numpy as np
-import os
+from utils.image_writer import ImageWriterPool, load_manifest, save_manifest
+
+# ✅ 프레임 샘플링 모드
+#   read : 모든 프레임을 cap.read()로 디코딩한 뒤 필요한 프레임만 사용 (기존 방식, 벤치마크 기준)
+#   grab : 건너뛸 프레임은 cap.grab()만 호출 (색 변환/복사 생략), 저장할 프레임만 디코딩
+#   seek : 다음 프레임까지의 간격이 seek_threshold 이상이면 CAP_PROP_POS_FRAMES로 탐색
+#          (직전 키프레임부터만 디코딩), 간격이 짧으면 grab으로 건너뜀
+SAMPLING_MODES = ("read", "grab", "seek")
+
+# ✅ 일반적인 폰 영상의 GOP 길이 (이보다 가까운 프레임은 탐색보다 grab이 빠름)
+DEFAULT_SEEK_THRESHOLD = 60
+
 
-def save_video2images(video_path, output_folder="images_origin", target_frames=350):
-    """비디오를 프레임으로 변환하여 `output_folder`에 저장"""
-    i = 0
+def get_frame_count(video_path):
+    """비디오의 전체 프레임 개수 (열 수 없으면 None)"""
     cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return None
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    return total_frames
+
+
+def sample_indices(total_frames, target_frames):
+    """고정 간격(total_frames // target_frames)으로 사용할 프레임 번호 목록"""
+    frame_skip = max(1, total_frames // target_frames)
+    return list(range(0, total_frames, frame_skip))
 
+
+def iter_frames(video_path, indices, mode="grab", seek_threshold=DEFAULT_SEEK_THRESHOLD):
+    """indices(오름차순)에 해당하는 프레임만 디코딩하여 (frame_index, frame)으로 반환"""
+    if mode not in SAMPLING_MODES:
+        raise ValueError(f"Unknown sampling mode: {mode} (choose from {SAMPLING_MODES})")
+
+    cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
         print("Error: Cannot open video file.")
         return
-    
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))  # 전체 프레임 개수
-    frame_skip = max(1, total_frames // target_frames)  # 프레임 건너뛰기 간격 계산
+
+    try:
+        pos = 0  # 다음에 읽힐 프레임 번호
+        for idx in indices:
+            # ✅ 구간 시작 위치로 이동 (병렬 구간 처리) 또는 키프레임 기준 탐색
+            if idx > pos and ((pos == 0 and mode != "read") or (mode == "seek" and idx - pos >= seek_threshold)):
+                cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
+                pos = idx
+
+            while pos < idx:
+                ok = cap.read()[0] if mode == "read" else cap.grab()
+                if not ok:
+                    return
+                pos += 1
+
+            ret, frame = cap.read()
+            if not ret:
+                return
+            pos += 1
+            yield idx, frame
+    finally:
+        cap.release()
+
+
+def split_segments(items, num_segments):
+    """items를 시간 순서를 유지한 연속 구간 num_segments개로 분할"""
+    num_segments = max(1, min(num_segments, len(items)))
+    size, rest = divmod(len(items), num_segments)
+    segments, start = [], 0
+    for s in range(num_segments):
+        end = start + size + (1 if s < rest else 0)
+        segments.append(items[start:end])
+        start = end
+    return segments
+
+
+def _save_segment(video_path, output_folder, jobs, mode, seek_threshold):
+    """(저장 번호, 프레임 번호) 목록에 해당하는 프레임을 이미지로 저장"""
+    numbers = {idx: i for i, idx in jobs}
+    saved = 0
+    for idx, frame in iter_frames(video_path, [idx for _, idx in jobs], mode, seek_threshold):
+        save_path = os.path.join(output_folder, f"image{numbers[idx]:04d}.png")
+        cv2.imwrite(save_path, frame)
+        print(f"🖼 Saved: {save_path}")
+        saved += 1
+    return saved
+
+
+def save_video2images(video_path, output_folder="images_origin", target_frames=350,
+                      mode="grab", num_workers=1, indices=None, seek_threshold=DEFAULT_SEEK_THRESHOLD):
+    """비디오를 프레임으로 변환하여 `output_folder`에 저장
+
+    mode로 디코딩 방식을 고르고, num_workers > 1이면 영상을 시간 구간으로 나누어
+    구간마다 별도 프로세스에서 디코딩합니다. indices를 주면 해당 프레임만 저장합니다.
+    """
+    total_frames = get_frame_count(video_path)
+    if total_frames is None:
+        print("Error: Cannot open video file.")
+        return
+
+    if indices is None:
+        indices = sample_indices(total_frames, target_frames)
 
     print(f"Total frames in video: {total_frames}")
-    print(f"Saving every {frame_skip} frames to get approximately {target_frames} images.")
+    print(f"Saving {len(indices)} frames (mode={mode}, workers={num_workers}) to get approximately {target_frames} images.")
 
     # ✅ 저장 폴더 확인 및 생성
     os.makedirs(output_folder, exist_ok=True)
 
-    frame_count = 0
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break  # 영상 끝에 도달하면 종료
+    segments = split_segments(list(enumerate(indices)), num_workers)
+    if len(segments) == 1:
+        saved = _save_segment(video_path, output_folder, segments[0], mode, seek_threshold)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=len(segments)) as executor:
+            futures = [executor.submit(_save_segment, video_path, output_folder, seg, mode, seek_threshold) for seg in segments]
+            saved = sum(f.result() for f in futures)
+
+    print(f"✅ Images saved: {saved}")
+    print("✅ Video to image conversion completed.")
+
+
+def resize_to_level(frame, spec):
+    """해상도 단계 spec에 맞게 축소 (float: 배율, (w, h): 고정 크기)"""
+    if isinstance(spec, (tuple, list)):
+        size = (int(spec[0]), int(spec[1]))
+    else:
+        if spec == 1:
+            return frame
+        h, w = frame.shape[:2]
+        size = (max(1, round(w * spec)), max(1, round(h * spec)))
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+
+def _save_pyramid_segment(video_path, jobs, levels, codec, level, mode, seek_threshold, max_writers, manifests):
+    """구간의 프레임을 한 번만 디코딩하여 모든 해상도 단계로 저장"""
+    numbers = {idx: i for i, idx in jobs}
+    with ImageWriterPool(codec, level, max_workers=max_writers, max_pending=4 * max_writers, manifests=manifests) as pool:
+        for idx, frame in iter_frames(video_path, [idx for _, idx in jobs], mode, seek_threshold):
+            stem = f"image{numbers[idx]:04d}"
+            for folder, spec in levels.items():
+                pool.submit(folder, stem, resize_to_level(frame, spec))
+    return pool.records, pool.written, pool.skipped
+
+
+def save_video_pyramid(video_path, levels, target_frames=350, codec="png", level=None, mode="grab",
+                       num_workers=1, max_writers=4, indices=None, seek_threshold=DEFAULT_SEEK_THRESHOLD):
+    """비디오 프레임을 한 번 디코딩하여 여러 해상도 폴더에 동시에 저장
+
+    levels: {output_folder: 1.0 | 0.5 | (128, 128), ...}
+    codec/level: "png"(zlib 0~9), "jpg"(품질 0~100), "npy"
+    인코딩은 크기가 제한된 스레드 풀에서 비동기로 수행되고, 내용이 같은 기존 파일은 다시 쓰지 않습니다.
+    반환: 실제로 저장한 프레임 수 (해상도 단계 하나 기준)
+    """
+    total_frames = get_frame_count(video_path)
+    if total_frames is None:
+        print("Error: Cannot open video file.")
+        return 0
+
+    if indices is None:
+        indices = sample_indices(total_frames, target_frames)
+
+    print(f"Total frames in video: {total_frames}")
+    print(f"Saving {len(indices)} frames x {len(levels)} levels (codec={codec}, mode={mode}, workers={num_workers}).")
+
+    levels = {str(folder): spec for folder, spec in levels.items()}
+    for folder in levels:
+        os.makedirs(folder, exist_ok=True)
+    manifests = {folder: load_manifest(folder) for folder in levels}
+
+    segments = split_segments(list(enumerate(indices)), num_workers)
+    args = (levels, codec, level, mode, seek_threshold, max_writers, manifests)
+    if len(segments) == 1:
+        results = [_save_pyramid_segment(video_path, segments[0], *args)]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=len(segments)) as executor:
+            futures = [executor.submit(_save_pyramid_segment, video_path, seg, *args) for seg in segments]
+            results = [f.result() for f in futures]
+
+    # ✅ 구간별 기록을 합쳐 폴더마다 manifest 저장 (이전 실행에만 있던 파일은 삭제)
+    num_frames = 0
+    for folder in levels:
+        records = {}
+        for seg_records, _, _ in results:
+            records.update(seg_records.get(folder, {}))
+        save_manifest(folder, records)
+        num_frames = max(num_frames, len(records))
+
+    written = sum(r[1] for r in results)
+    skipped = sum(r[2] for r in results)
+    print(f"✅ Images written: {written}, unchanged (skipped): {skipped}")
+    print("✅ Video to image pyramid conversion completed.")
+    return num_frames
+
+
+def resize_folder(input_folder, output_folder, spec, codec="png", level=None, max_writers=4):
+    """이미 저장된 프레임 폴더를 spec(비율 또는 (W, H)) 해상도로 축소 저장 (변경 없는 파일은 건너뜀)"""
+    names = sorted(name for name in os.listdir(input_folder) if os.path.splitext(name)[1].lower() in (".png", ".jpg"))
+    os.makedirs(output_folder, exist_ok=True)
+    manifests = {str(output_folder): load_manifest(output_folder)}
+
+    with ImageWriterPool(codec, level, max_workers=max_writers, max_pending=4 * max_writers, manifests=manifests) as pool:
+        for name in names:
+            frame = cv2.imread(os.path.join(input_folder, name))
+            if frame is not None:
+                pool.submit(str(output_folder), os.path.splitext(name)[0], resize_to_level(frame, spec))
+    save_manifest(output_folder, pool.records.get(str(output_folder), {}))
 
-        if frame_count % frame_skip == 0:  # 일정 간격마다 저장
-            save_path = os.path.join(output_folder, f"image{i:04d}.png")
-            cv2.imwrite(save_path, frame)
-            print(f"🖼 Saved: {save_path}")
-            i += 1
+    print(f"✅ Resized {len(names)} images → {output_folder} (written: {pool.written}, unchanged: {pool.skipped})")
 
-        frame_count += 1
 
-    cap.release()
-    print(f"✅ Images saved: {i}")
-    print("✅ Video to image conversion completed.")
+def _shrink_npy(path, num_frames):
+    """미리 할당한 .npy의 첫 번째 차원을 실제 저장된 프레임 수로 줄임 (헤더 길이는 유지)"""
+    with open(path, "r+b") as f:
+        version = np.lib.format.read_magic(f)
+        header_start = f.tell() + (2 if version == (1, 0) else 4)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        data_start = f.tell()
 
+        new_shape = (num_frames,) + tuple(shape[1:])
+        header = repr({"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": fortran_order, "shape": new_shape})
+        f.seek(header_start)
+        f.write((header.ljust(data_start - header_start - 1) + "\n").encode("latin1"))
+        f.truncate(data_start + int(np.prod(new_shape)) * dtype.itemsize)
 
-def video2array(video_path, target_frames=150):
-    cap = cv2.VideoCapture(video_path)
-    frames = []
 
-    if not cap.isOpened():
+def video2memmap(video_path, output_path, target_frames=150, mode="grab", seek_threshold=DEFAULT_SEEK_THRESHOLD):
+    """프레임을 CAP_PROP_FRAME_COUNT 기준으로 미리 할당한 .npy(memmap)에 바로 기록
+
+    프레임 리스트를 만들지 않으므로 최대 메모리 사용량이 영상 길이와 무관합니다.
+    결과는 np.load(output_path, mmap_mode="r")로 복사 없이 열어서 반환합니다.
+    """
+    total_frames = get_frame_count(video_path)
+    if total_frames is None:
         print("Error: Cannot open video file.")
-        return np.array([])
+        return None
 
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))  # 전체 프레임 개수
-    frame_skip = max(1, total_frames // target_frames)  # 프레임 건너뛰기 간격 계산
+    indices = sample_indices(total_frames, target_frames)
 
     print(f"Total frames in video: {total_frames}")
-    print(f"Saving every {frame_skip} frames to get approximately {target_frames} images.")
+    print(f"Writing {len(indices)} frames (mode={mode}) to {output_path}")
 
-    frame_count = 0
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break  # 영상 끝에 도달하면 종료
+    frames_array = None
+    count = 0
+    for _, frame in iter_frames(video_path, indices, mode, seek_threshold):
+        if frames_array is None:
+            # ✅ 첫 프레임으로 해상도 확인 후 (N, H, W, C) 크기로 할당 (회전 메타데이터 대응)
+            frames_array = np.lib.format.open_memmap(output_path, mode="w+", dtype=np.uint8,
+                                                     shape=(len(indices),) + frame.shape)
+        frames_array[count] = frame
+        count += 1
 
-        if frame_count % frame_skip == 0:  # 일정 간격마다 저장
-            frames.append(frame)
+    if frames_array is None:
+        print("Error: No frames decoded.")
+        return None
 
-        frame_count += 1
+    frames_array.flush()
+    del frames_array
 
-    cap.release()
+    # ✅ 실제 프레임 수가 CAP_PROP_FRAME_COUNT 추정치보다 적으면 파일 크기 조정
+    if count < len(indices):
+        _shrink_npy(output_path, count)
+
+    frames_array = load_frames(output_path)
+    print("Frames shape:", frames_array.shape)
+
+    return frames_array
+
+
+def load_frames(path):
+    """video2memmap 결과를 memmap으로 열기 (복사 없음)"""
+    return np.load(path, mmap_mode="r")
+
+
+def iter_frame_chunks(video_path, target_frames=150, chunk_size=16, mode="grab", seek_threshold=DEFAULT_SEEK_THRESHOLD):
+    """프레임을 chunk_size개씩 (frame_indices, (n, H, W, C) 배열)로 반환하는 제너레이터"""
+    total_frames = get_frame_count(video_path)
+    if total_frames is None:
+        print("Error: Cannot open video file.")
+        return
+
+    chunk, chunk_indices = None, []
+    for idx, frame in iter_frames(video_path, sample_indices(total_frames, target_frames), mode, seek_threshold):
+        if chunk is None:
+            chunk = np.empty((chunk_size,) + frame.shape, dtype=np.uint8)
+        chunk[len(chunk_indices)] = frame
+        chunk_indices.append(idx)
+        if len(chunk_indices) == chunk_size:
+            yield chunk_indices, chunk
+            chunk, chunk_indices = None, []
+
+    if chunk_indices:
+        yield chunk_indices, chunk[:len(chunk_indices)]
+
+
+def video2array(video_path, target_frames=150, mode="grab", seek_threshold=DEFAULT_SEEK_THRESHOLD, output_path=None):
+    """프레임 배열 반환 (output_path를 주면 .npy memmap으로 기록 후 memmap 반환)"""
+    if output_path is not None:
+        return video2memmap(video_path, output_path, target_frames, mode, seek_threshold)
+
+    total_frames = get_frame_count(video_path)
+    if total_frames is None:
+        print("Error: Cannot open video file.")
+        return np.array([])
 
-    frames_array = np.array(frames, dtype=np.uint8)
+    indices = sample_indices(total_frames, target_frames)
+
+    print(f"Total frames in video: {total_frames}")
+    print(f"Saving {len(indices)} frames (mode={mode}) to get approximately {target_frames} images.")
+
+    # ✅ 리스트 + np.array 복사 대신 미리 할당한 배열에 바로 채움
+    frames_array = None
+    count = 0
+    for _, frame in iter_frames(video_path, indices, mode, seek_threshold):
+        if frames_array is None:
+            frames_array = np.empty((len(indices),) + frame.shape, dtype=np.uint8)
+        frames_array[count] = frame
+        count += 1
+
+    if frames_array is None:
+        return np.array([])
+    if count < len(indices):
+        frames_array.resize((count,) + frames_array.shape[1:], refcheck=False)
     print("Frames shape:", frames_array.shape)
 
     return frames_array
 
+
+def laplacian_variance(gray):
+    """(N, h, w) 흑백 배치의 라플라시안 분산 (값이 작을수록 흐림)"""
+    g = gray.astype(np.float32)
+    lap = g[:, :-2, 1:-1] + g[:, 2:, 1:-1] + g[:, 1:-1, :-2] + g[:, 1:-1, 2:] - 4.0 * g[:, 1:-1, 1:-1]
+    return lap.reshape(len(g), -1).var(axis=1)
+
+
+def difference_hash(gray, hash_size=8):
+    """(N, h, w) 흑백 배치의 difference hash → (N, hash_size * hash_size) bool"""
+    small = np.stack([cv2.resize(g, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA) for g in gray])
+    return (small[:, :, 1:] > small[:, :, :-1]).reshape(len(gray), -1)
+
+
+def _to_thumbnail(frame, score_width):
+    """점수 계산용 흑백 축소 이미지"""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    h, w = gray.shape
+    if w > score_width:
+        gray = cv2.resize(gray, (score_width, max(1, h * score_width // w)), interpolation=cv2.INTER_AREA)
+    return gray
+
+
+def score_frames(video_path, indices, batch_size=64, score_width=256, mode="grab", seek_threshold=DEFAULT_SEEK_THRESHOLD):
+    """후보 프레임의 선명도(라플라시안 분산)와 dHash를 배치 단위로 계산
+
+    반환: (frame_indices, sharpness (N,), hashes (N, 64) bool)
+    """
+    frame_indices, sharpness, hashes = [], [], []
+    batch = []
+
+    def flush():
+        thumbs = np.stack(batch)
+        sharpness.append(laplacian_variance(thumbs))
+        hashes.append(difference_hash(thumbs))
+        batch.clear()
+
+    for idx, frame in iter_frames(video_path, indices, mode, seek_threshold):
+        frame_indices.append(idx)
+        batch.append(_to_thumbnail(frame, score_width))
+        if len(batch) == batch_size:
+            flush()
+    if batch:
+        flush()
+
+    if not frame_indices:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.float32), np.zeros((0, 64), dtype=bool)
+    return np.array(frame_indices), np.concatenate(sharpness), np.concatenate(hashes)
+
+
+def select_keyframes(video_path, target_frames=150, candidates_per_window=4, min_hamming=6, blur_ratio=0.3,
+                     batch_size=64, score_width=256, mode="grab", seek_threshold=DEFAULT_SEEK_THRESHOLD):
+    """고정 간격 대신 선명도 + 중복도 기반으로 키프레임 선택
+
+    - 영상을 target_frames개의 구간(window)으로 나누고 구간마다 candidates_per_window개 후보를 평가
+    - 전체 중앙값 대비 blur_ratio 미만의 선명도를 가진 흐린 후보는 제외
+    - 마지막으로 선택된 프레임과 dHash 해밍 거리가 min_hamming 미만인 (거의 같은) 후보는 제외
+    - 남은 후보 중 가장 선명한 프레임을 선택 (모두 제외되면 해당 구간은 건너뜀)
+    """
+    total_frames = get_frame_count(video_path)
+    if total_frames is None:
+        print("Error: Cannot open video file.")
+        return []
+    if total_frames <= 0:
+        # 일부 컨테이너/스트림은 CAP_PROP_FRAME_COUNT가 0 → 구간을 나눌 수 없음
+        print("Error: Cannot read frame count of video file.")
+        return []
+
+    # 프레임 f는 구간 f * target_frames // total_frames에 속함 → 정확히 target_frames개 구간이 영상 끝까지 덮음
+    num_windows = min(target_frames, total_frames)
+    starts = (np.arange(num_windows + 1) * total_frames + num_windows - 1) // num_windows
+    candidates = sorted({int(start + k * (end - start) // candidates_per_window)
+                         for start, end in zip(starts[:-1], starts[1:]) for k in range(candidates_per_window)})
+
+    print(f"Total frames in video: {total_frames}")
+    print(f"Scoring {len(candidates)} candidate frames in {num_windows} windows of ~{total_frames / num_windows:.1f} frames.")
+
+    frame_indices, sharpness, hashes = score_frames(video_path, candidates, batch_size, score_width, mode, seek_threshold)
+    if len(frame_indices) == 0:
+        return []
+
+    sharp_enough = sharpness >= blur_ratio * np.median(sharpness)
+    window_ids = frame_indices * num_windows // total_frames
+    boundaries = np.flatnonzero(np.diff(window_ids)) + 1
+
+    selected = []
+    last_hash = None
+    skipped_blur = skipped_dup = 0
+    for members in np.split(np.arange(len(frame_indices)), boundaries):
+        keep = members[sharp_enough[members]]
+        skipped_blur += len(members) - len(keep)
+        if last_hash is not None and len(keep):
+            novel = np.count_nonzero(hashes[keep] != last_hash, axis=1) >= min_hamming
+            skipped_dup += len(keep) - np.count_nonzero(novel)
+            keep = keep[novel]
+        if len(keep) == 0:
+            continue
+
+        best = keep[np.argmax(sharpness[keep])]
+        selected.append(int(frame_indices[best]))
+        last_hash = hashes[best]
+
+    print(f"✅ Selected {len(selected)} keyframes (blurry candidates: {skipped_blur}, near-duplicates: {skipped_dup})")
+    return selected
+
+
+def _count_segment(video_path, indices, mode, seek_threshold):
+    """벤치마크용: 구간의 프레임을 디코딩만 하고 개수 반환"""
+    return sum(1 for _ in iter_frames(video_path, indices, mode, seek_threshold))
+
+
+def benchmark_sampling(video_path, target_frames=150, modes=SAMPLING_MODES, workers_list=(1, 4),
+                       seek_threshold=DEFAULT_SEEK_THRESHOLD):
+    """기존 read 루프 대비 각 샘플링 모드의 디코딩 속도(frames/sec)와 전체 소요 시간 비교"""
+    total_frames = get_frame_count(video_path)
+    if total_frames is None:
+        print("Error: Cannot open video file.")
+        return []
+
+    indices = sample_indices(total_frames, target_frames)
+    results = []
+    for mode in modes:
+        for num_workers in workers_list:
+            # read 모드는 구간 탐색을 하지 않으므로 병렬 비교에서 제외
+            if mode == "read" and num_workers > 1:
+                continue
+
+            segments = split_segments(indices, num_workers)
+            start = time.perf_counter()
+            if len(segments) == 1:
+                decoded = _count_segment(video_path, indices, mode, seek_threshold)
+            else:
+                with concurrent.futures.ProcessPoolExecutor(max_workers=len(segments)) as executor:
+                    decoded = sum(executor.map(_count_segment, [video_path] * len(segments), segments,
+                                               [mode] * len(segments), [seek_threshold] * len(segments)))
+            elapsed = time.perf_counter() - start
+
+            results.append({"mode": mode, "workers": len(segments), "frames": decoded,
+                            "wall_time": elapsed, "fps": decoded / elapsed if elapsed > 0 else 0.0})
+
+    baseline = next((r["wall_time"] for r in results if r["mode"] == "read"), None)
+    print(f"📊 {video_path}: {total_frames} frames, keeping {len(indices)}")
+    print(f"{'mode':<6} {'workers':>7} {'frames':>7} {'wall(s)':>9} {'fps':>9} {'speedup':>8}")
+    for r in results:
+        speedup = baseline / r["wall_time"] if baseline and r["wall_time"] > 0 else float("nan")
+        print(f"{r['mode']:<6} {r['workers']:>7} {r['frames']:>7} {r['wall_time']:>9.2f} {r['fps']:>9.1f} {speedup:>7.2f}x")
+
+    return results
+
+
+if __name__ == "__main__":
+    # 사용법: python -m utils.video <video_path> [target_frames]
+    if len(sys.argv) < 2:
+        print("Usage: python -m utils.video <video_path> [target_frames]")
+        sys.exit(1)
+    benchmark_sampling(sys.argv[1], target_frames=int(sys.argv[2]) if len(sys.argv) > 2 else 150)